@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Response compression benchmark
+
+For each snapshot-backed body (the whole portfolio, each section and a
+filtered project list) reports its size per content coding and the time to
+build a response three ways:
+
+- identity: the pre-encoded body as-is
+- cached: the snapshot's compressed variant, compressed once and reused
+- per request: compressing the body again for every response, as a generic
+  compression middleware would
+
+Run from the backend directory:
+    python -m benchmarks.compression --iterations 5000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from starlette.requests import Request
+
+from database.seed_data import get_portfolio_seed_data
+from routes.responses import cached_json_response
+from services.compression import ENCODINGS, compress
+from services.portfolio_cache import PortfolioSnapshot
+
+def request(accept_encoding: str) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]})
+
+def per_call(call, iterations: int) -> float:
+    """Mean seconds per call, best of three runs"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            call()
+        best = min(best, (time.perf_counter() - start) / iterations)
+    return best
+
+def main(args):
+    snapshot = PortfolioSnapshot.from_portfolio(get_portfolio_seed_data())
+    bodies = {section: snapshot.section_json(section) for section in ("portfolio", "personal", "projects", "experience")}
+    bodies["projects?technology=python"] = snapshot.projects_json(technologies=["Python"])
+    identity = request("identity")
+
+    for name, body in bodies.items():
+        sizes = " ".join(f"{encoding}={len(compress(body, encoding))}" for encoding in ENCODINGS)
+        print(f"{name:28} identity={len(body)} {sizes}")
+        bare = per_call(lambda: cached_json_response(identity, snapshot, body), args.iterations)
+        print(f"{'':28} identity      {bare * 1e6:8.2f}us/response")
+        for encoding in ENCODINGS:
+            accepting = request(encoding)
+            cached = per_call(lambda: cached_json_response(accepting, snapshot, body), args.iterations)
+            uncached = per_call(lambda: compress(body, encoding), max(args.iterations // 10, 1))
+            print(f"{'':28} {encoding:5} cached {cached * 1e6:8.2f}us/response, per request +{uncached * 1e6:8.2f}us")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    main(parser.parse_args())
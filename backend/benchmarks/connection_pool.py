@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Connection pool benchmark for the portfolio API
+
+Drives GET /api/portfolio/ concurrently through the ASGI app and compares the
+shared, lifespan-managed Motor client with the old client-per-request
+dependency. Reports latency percentiles and the server-side connection count
+(serverStatus.connections.current) before and after each run.
+
+Run from the backend directory against a local MongoDB:
+    python -m benchmarks.connection_pool --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+load_dotenv(Path(__file__).resolve().parent.parent / '.env')
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from server import app
+from routes.portfolio_routes import get_portfolio_service
+from services.portfolio_service import PortfolioService
+from database.mongo import get_client
+
+async def client_per_request_service():
+    """The pre-lifespan dependency: a brand new client for every request"""
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    return PortfolioService(client[os.environ['DB_NAME']])
+
+async def current_connections() -> int:
+    status = await get_client().admin.command("serverStatus")
+    return status["connections"]["current"]
+
+async def drive(total: int, concurrency: int) -> list:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await http.get("/api/portfolio/")
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+        await asyncio.gather(*(one() for _ in range(total)))
+    return latencies
+
+def summarize(label: str, latencies: list, elapsed: float, before: int, after: int):
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    print(f"{label:<20} rps={len(ordered) / elapsed:8.1f} "
+          f"p50={pick(0.50):7.2f}ms p95={pick(0.95):7.2f}ms p99={pick(0.99):7.2f}ms "
+          f"mean={statistics.mean(ordered) * 1000:7.2f}ms connections {before} -> {after}")
+
+async def run_mode(label: str, total: int, concurrency: int):
+    before = await current_connections()
+    start = time.perf_counter()
+    latencies = await drive(total, concurrency)
+    elapsed = time.perf_counter() - start
+    after = await current_connections()
+    summarize(label, latencies, elapsed, before, after)
+
+async def main(args):
+    async with app.router.lifespan_context(app):
+        # Warm up so the seed document exists before measuring
+        await drive(10, 1)
+        await run_mode("shared client", args.requests, args.concurrency)
+        if not args.skip_legacy:
+            app.dependency_overrides[get_portfolio_service] = client_per_request_service
+            try:
+                await run_mode("client per request", args.requests, args.concurrency)
+            finally:
+                app.dependency_overrides.pop(get_portfolio_service, None)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--skip-legacy", action="store_true", help="Only measure the shared client")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Contact form ingestion throughput benchmark
+
+Submits contact messages concurrently through PortfolioService in direct
+(insert_one per message) and buffered (write-behind insert_many) mode and
+reports accepted messages per second, acknowledgement latency, and the time
+until every message is durable in MongoDB.
+
+Run from the backend directory against a local MongoDB:
+    python -m benchmarks.contact_ingest --messages 20000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+load_dotenv(Path(__file__).resolve().parent.parent / '.env')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from models.portfolio import ContactMessageCreate
+from services.portfolio_service import PortfolioService
+
+async def run_mode(mode: str, client, total: int, concurrency: int):
+    os.environ["CONTACT_WRITE_MODE"] = mode
+    db = client[f"bench_contact_{uuid.uuid4().hex[:8]}"]
+    service = PortfolioService(db)
+    await service.start()
+    message = ContactMessageCreate(name="Load Test", email="load@example.com", message="Hello " * 20)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def submit():
+        async with semaphore:
+            start = time.perf_counter()
+            await service.create_contact_message(message)
+            latencies.append(time.perf_counter() - start)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(submit() for _ in range(total)))
+        acknowledged = time.perf_counter() - start
+        await service.close()
+        durable = time.perf_counter() - start
+        stored = await db.contact_messages.count_documents({})
+    finally:
+        await client.drop_database(db.name)
+
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(f"{mode:<9} accepted/s={total / acknowledged:9.1f} durable/s={total / durable:9.1f} "
+          f"ack p50={pick(0.5):6.2f}ms p99={pick(0.99):6.2f}ms stored={stored}")
+
+async def main(args):
+    logging_off()
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        for mode in ("direct", "buffered"):
+            await run_mode(mode, client, args.messages, args.concurrency)
+    finally:
+        client.close()
+
+def logging_off():
+    # Per-message INFO lines would dominate the measurement
+    import logging
+    logging.disable(logging.INFO)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
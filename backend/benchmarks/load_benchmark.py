@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Local load test for every API route
+
+Boots the FastAPI app against a throwaway database and drives each endpoint
+(portfolio reads, conditional requests, search, edits, contact form, status
+checks, exports) at one or more concurrency levels. Reports requests per
+second and p50/p95/p99 latency per endpoint, and can save the results as JSON
+and compare them with a previous run to spot regressions between commits.
+
+By default requests go through the ASGI app in-process (no network); with
+--transport http the app is served by uvicorn on a local port. Storage is a
+throwaway database on a local MongoDB (MONGO_URL) or, with --storage, the
+in-memory or SQLite backend (--in-process is short for --storage memory).
+
+Run from the backend directory:
+    python -m benchmarks.load_benchmark --requests 500 --concurrency 1 10 50 --output results.json
+    python -m benchmarks.load_benchmark --compare results.json --output new.json
+    python -m benchmarks.load_benchmark --storage sqlite --concurrency 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+load_dotenv(Path(__file__).resolve().parent.parent / '.env')
+
+import httpx
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    path: str
+    expect: int = 200
+    body: Optional[Callable[[int], dict]] = None
+    headers: Optional[dict] = None
+
+def contact_body(i: int) -> dict:
+    return {"name": f"Load Test {i}", "email": f"load{i}@example.com", "message": "Hello from the load test " * 4}
+
+def status_body(i: int) -> dict:
+    return {"client_name": f"load-test-{i}"}
+
+def endpoints(etag: str) -> list:
+    """Every route, in the order they are driven (writes before the reads that list them)"""
+    return [
+        Endpoint("root", "GET", "/api/"),
+        Endpoint("health", "GET", "/api/health"),
+        Endpoint("readiness", "GET", "/api/health/ready"),
+        Endpoint("metrics", "GET", "/api/metrics"),
+        Endpoint("portfolio", "GET", "/api/portfolio/"),
+        Endpoint("portfolio_not_modified", "GET", "/api/portfolio/", 304, headers={"If-None-Match": etag}),
+        Endpoint("portfolio_fields", "GET", "/api/portfolio/?fields=personal.name,projects.title,projects.category"),
+        Endpoint("personal", "GET", "/api/portfolio/personal"),
+        Endpoint("projects", "GET", "/api/portfolio/projects"),
+        Endpoint("projects_filtered", "GET", "/api/portfolio/projects?technology=python&category=machine%20learning"),
+        Endpoint("projects_page", "GET", "/api/portfolio/projects?limit=2"),
+        Endpoint("experience", "GET", "/api/portfolio/experience"),
+        Endpoint("batch", "GET", "/api/portfolio/batch?section=personal&section=projects&section=experience"),
+        Endpoint("search", "GET", "/api/portfolio/search?q=data%20analytics&limit=10"),
+        Endpoint("cache_stats", "GET", "/api/portfolio/cache/stats"),
+        Endpoint("project_patch", "PATCH", "/api/portfolio/projects/1", body=lambda i: {"title": f"Sales Insights Dashboard {i}"}),
+        Endpoint("contact_create", "POST", "/api/portfolio/contact", body=contact_body),
+        Endpoint("contact_list", "GET", "/api/portfolio/contact?limit=50"),
+        Endpoint("contact_export", "GET", "/api/portfolio/contact/export?format=ndjson"),
+        Endpoint("status_create", "POST", "/api/status", body=status_body),
+        Endpoint("status_list", "GET", "/api/status?limit=100"),
+        Endpoint("status_stream", "GET", "/api/status?limit=100&format=ndjson"),
+        Endpoint("view_record", "POST", "/api/analytics/views", 202, body=lambda i: {"project_id": 1 + i % 5}),
+        Endpoint("views_report", "GET", "/api/analytics/views?granularity=hour"),
+    ]
+
+def percentile(ordered: list, q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def summarize(endpoint: Endpoint, concurrency: int, latencies: list, errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "endpoint": endpoint.name,
+        "method": endpoint.method,
+        "path": endpoint.path,
+        "concurrency": concurrency,
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": ms(percentile(ordered, 0.50)),
+        "p95_ms": ms(percentile(ordered, 0.95)),
+        "p99_ms": ms(percentile(ordered, 0.99)),
+        "mean_ms": ms(statistics.mean(ordered)),
+        "max_ms": ms(ordered[-1]),
+    }
+
+async def drive(http: httpx.AsyncClient, endpoint: Endpoint, total: int, concurrency: int) -> dict:
+    """Send total requests from concurrency workers and summarize them"""
+    latencies = []
+    errors = 0
+    issued = 0
+
+    async def worker():
+        nonlocal errors, issued
+        while issued < total:
+            i = issued
+            issued += 1
+            start = time.perf_counter()
+            response = await http.request(
+                endpoint.method, endpoint.path,
+                json=endpoint.body(i) if endpoint.body else None,
+                headers=endpoint.headers
+            )
+            await response.aread()
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != endpoint.expect:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(endpoint, concurrency, latencies, errors, time.perf_counter() - start)
+
+def compare(results: list, baseline: dict) -> list:
+    """Relative change in rps and p95 against a previous run, per endpoint and concurrency"""
+    previous = {(r["endpoint"], r["concurrency"]): r for r in baseline["results"]}
+    changes = []
+    for result in results:
+        before = previous.get((result["endpoint"], result["concurrency"]))
+        if before and before["rps"] and before["p95_ms"]:
+            changes.append({
+                "endpoint": result["endpoint"],
+                "concurrency": result["concurrency"],
+                "rps_change": round(result["rps"] / before["rps"] - 1, 3),
+                "p95_change": round(result["p95_ms"] / before["p95_ms"] - 1, 3),
+            })
+    return changes
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+class ServedApp:
+    """Serve the app with uvicorn on a free local port for the duration of the block"""
+
+    def __init__(self, app):
+        import uvicorn
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+
+    async def __aenter__(self) -> str:
+        self.task = asyncio.create_task(self.server.serve())
+        while not self.server.started:
+            if self.task.done():
+                self.task.result()
+            await asyncio.sleep(0.01)
+        port = self.server.servers[0].sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def __aexit__(self, *exc):
+        self.server.should_exit = True
+        await self.task
+
+class BootedApp:
+    """Run the app's lifespan and talk to it through the ASGI transport"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __aenter__(self):
+        self.lifespan = self.app.router.lifespan_context(self.app)
+        await self.lifespan.__aenter__()
+        return None
+
+    async def __aexit__(self, *exc):
+        await self.lifespan.__aexit__(*exc)
+
+async def run_suite(args) -> dict:
+    from server import app
+
+    selected = set(args.endpoints or ())
+    results = []
+    boot = ServedApp(app) if args.transport == "http" else BootedApp(app)
+    async with boot as base_url:
+        transport = None if base_url else httpx.ASGITransport(app=app)
+        limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+        async with httpx.AsyncClient(transport=transport, base_url=base_url or "http://loadtest", limits=limits, timeout=60) as http:
+            # Seed the portfolio and learn its ETag for the conditional request
+            etag = (await http.get("/api/portfolio/")).headers.get("etag", '"none"')
+            for endpoint in endpoints(etag):
+                if selected and endpoint.name not in selected:
+                    continue
+                if endpoint.name == "portfolio_not_modified":
+                    # Earlier edits changed the version; refresh the validator
+                    endpoint.headers = {"If-None-Match": (await http.get("/api/portfolio/")).headers.get("etag", '"none"')}
+                await drive(http, endpoint, args.warmup, 1)
+                for concurrency in args.concurrency:
+                    result = await drive(http, endpoint, args.requests, concurrency)
+                    results.append(result)
+                    print(f"{result['endpoint']:<24} c={concurrency:<4} rps={result['rps']:9.1f} "
+                          f"p50={result['p50_ms']:8.2f}ms p95={result['p95_ms']:8.2f}ms p99={result['p99_ms']:8.2f}ms "
+                          f"errors={result['errors']}")
+        if args.storage == "mongo" and not args.keep_database:
+            from database.mongo import get_client
+            await get_client().drop_database(os.environ["DB_NAME"])
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "transport": args.transport,
+            "storage": args.storage,
+            "storage_layout": os.environ.get("PORTFOLIO_STORAGE_LAYOUT", "embedded"),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--endpoints", nargs="+", help="only drive these endpoints (by name)")
+    parser.add_argument("--transport", choices=("asgi", "http"), default="asgi")
+    parser.add_argument("--storage", choices=("mongo", "memory", "sqlite"), default="mongo")
+    parser.add_argument("--in-process", action="store_true", help="same as --storage memory")
+    parser.add_argument("--keep-database", action="store_true")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="previous JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    import logging
+    logging.disable(logging.INFO)
+    if args.in_process:
+        args.storage = "memory"
+    os.environ["STORAGE_BACKEND"] = args.storage
+    os.environ["DB_NAME"] = f"loadtest_{uuid.uuid4().hex[:8]}"
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["SQLITE_PATH"] = str(Path(directory) / "loadtest.sqlite3")
+        report = asyncio.run(run_suite(args))
+    if args.compare:
+        report["comparison"] = compare(report["results"], json.loads(Path(args.compare).read_text()))
+        for change in report["comparison"]:
+            print(f"{change['endpoint']:<24} c={change['concurrency']:<4} "
+                  f"rps {change['rps_change']:+7.1%} p95 {change['p95_change']:+7.1%}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    return report
+
+if __name__ == "__main__":
+    main()
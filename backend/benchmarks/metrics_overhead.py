@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Instrumentation overhead benchmark
+
+Measures what the metrics add to a request, in isolation from the work the
+request does:
+
+- middleware: a trivial ASGI app called directly, with and without
+  MetricsMiddleware in front of it
+- storage timing: an in-memory repository read, with and without the
+  TimedRepository proxy
+- exposition: rendering /api/metrics once every route and storage operation
+  has series
+
+Run from the backend directory:
+    python -m benchmarks.metrics_overhead --iterations 200000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.seed_data import get_portfolio_seed_data
+from middleware.metrics import MetricsMiddleware
+from repositories.memory import MemoryRepositories
+from services.metrics import MetricsRegistry, instrument_repositories
+
+class Route:
+    path = "/api/portfolio/projects/{project_id}"
+
+ROUTE = Route()
+
+async def plain_app(scope, receive, send):
+    scope["route"] = ROUTE
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+async def send(message):
+    pass
+
+async def per_call(call, iterations: int) -> float:
+    """Mean seconds per call, best of three runs"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await call()
+        best = min(best, (time.perf_counter() - start) / iterations)
+    return best
+
+async def main(args):
+    scope = {"type": "http", "method": "GET", "path": "/api/portfolio/projects/1"}
+    registry = MetricsRegistry()
+    instrumented = MetricsMiddleware(plain_app, registry)
+    bare = await per_call(lambda: plain_app(dict(scope), receive, send), args.iterations)
+    timed = await per_call(lambda: instrumented(dict(scope), receive, send), args.iterations)
+    print(f"middleware        bare={bare * 1e6:8.2f}us instrumented={timed * 1e6:8.2f}us overhead={(timed - bare) * 1e6:6.2f}us/request")
+
+    plain = MemoryRepositories()
+    await plain.portfolio.create(get_portfolio_seed_data().model_dump())
+    wrapped = instrument_repositories(MemoryRepositories(), registry)
+    await wrapped.portfolio.create(get_portfolio_seed_data().model_dump())
+    bare = await per_call(lambda: plain.portfolio.read(("personal",)), args.iterations // 10)
+    timed = await per_call(lambda: wrapped.portfolio.read(("personal",)), args.iterations // 10)
+    print(f"storage timing    bare={bare * 1e6:8.2f}us instrumented={timed * 1e6:8.2f}us overhead={(timed - bare) * 1e6:6.2f}us/operation")
+
+    # Fill in one series per route and storage operation, as a busy process would have
+    for n in range(40):
+        for status in (200, 304, 404):
+            registry.metrics["http_requests_total"].labels("GET", f"/api/route/{n}", status).inc()
+        registry.metrics["http_request_duration_seconds"].labels("GET", f"/api/route/{n}").observe(0.001)
+    size = len(registry.expose())
+    start = time.perf_counter()
+    for _ in range(100):
+        registry.expose()
+    print(f"exposition        {(time.perf_counter() - start) / 100 * 1e3:8.3f}ms per scrape ({size} bytes)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000)
+    asyncio.run(main(parser.parse_args()))
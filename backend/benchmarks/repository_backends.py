@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Storage backend comparison benchmark
+
+Runs the same repository operations against each storage backend (in-memory,
+SQLite in WAL mode, MongoDB) and reports operations per second and p50/p99
+latency: cold portfolio reads, entry edits, contact inserts (single and
+batched), keyset pages and full scans, and status check inserts and pages.
+These are the calls the service makes on a cache miss or a write, so the
+numbers bound what each backend adds to an uncached request.
+
+Run from the backend directory (MongoDB is skipped unless MONGO_URL is set):
+    python -m benchmarks.repository_backends --operations 2000 --backends memory sqlite mongo
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+load_dotenv(Path(__file__).resolve().parent.parent / '.env')
+
+from database.seed_data import get_portfolio_seed_data
+from repositories.base import utc_now
+from services.pagination import encode_cursor
+from services.portfolio_cache import SECTIONS
+
+def contact(i: int, start) -> dict:
+    return {
+        "id": uuid.uuid4().hex, "name": f"Sender {i}", "email": f"sender{i}@example.com",
+        "message": "Hello from the benchmark " * 4, "created_at": start + timedelta(milliseconds=i), "read": i % 3 == 0,
+    }
+
+async def timed(operation, count: int) -> list:
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        await operation(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def report(backend: str, name: str, latencies: list, items: int = None):
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    rate = (items or len(ordered)) / sum(ordered)
+    unit = "items/s" if items else "ops/s"
+    print(f"{backend:<7} {name:<22} {unit}={rate:11.1f} p50={pick(0.5):8.3f}ms p99={pick(0.99):8.3f}ms")
+
+async def run_backend(backend: str, repositories, operations: int):
+    await repositories.prepare()
+    portfolio = repositories.portfolio
+    await portfolio.create(get_portfolio_seed_data().model_dump())
+
+    report(backend, "portfolio read", await timed(lambda i: portfolio.read(SECTIONS), operations))
+    report(backend, "personal read", await timed(lambda i: portfolio.read(("personal",)), operations))
+    report(backend, "entry update", await timed(
+        lambda i: portfolio.update_entry("projects", 1, {"title": f"Edit {i}"}), operations
+    ))
+
+    start = utc_now()
+    report(backend, "contact insert", await timed(lambda i: repositories.contacts.insert(contact(i, start)), operations))
+    batch = 500
+    batches = max(1, operations // 100)
+    report(backend, "contact insert_many", await timed(
+        lambda i: repositories.contacts.insert_many([contact(operations + i * batch + n, start) for n in range(batch)]),
+        batches
+    ), items=batch * batches)
+
+    cursors = [None]
+    async def next_page(i):
+        page = await repositories.contacts.page(50, cursors[-1])
+        cursors.append(encode_cursor(page[-1]["created_at"], page[-1]["id"]) if len(page) == 50 else None)
+    report(backend, "contact page (50)", await timed(next_page, operations))
+
+    started = time.perf_counter()
+    scanned = len([message async for message in repositories.contacts.scan(read=False)])
+    report(backend, "contact scan", [time.perf_counter() - started], items=scanned)
+
+    report(backend, "status insert", await timed(
+        lambda i: repositories.status_checks.insert({"id": uuid.uuid4().hex, "client_name": f"c{i}", "timestamp": utc_now()}),
+        operations
+    ))
+    report(backend, "status page (100)", await timed(lambda i: repositories.status_checks.page(100), operations))
+
+async def main(args):
+    import logging
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in args.backends:
+            if backend == "memory":
+                from repositories.memory import MemoryRepositories
+                repositories = MemoryRepositories()
+            elif backend == "sqlite":
+                from repositories.sqlite import SQLiteRepositories
+                repositories = SQLiteRepositories(str(Path(directory) / "bench.sqlite3"))
+            else:
+                if "MONGO_URL" not in os.environ:
+                    print("mongo   skipped: MONGO_URL is not set")
+                    continue
+                from motor.motor_asyncio import AsyncIOMotorClient
+                from repositories.mongo import MongoRepositories
+                client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+                repositories = MongoRepositories(client[f"bench_repositories_{uuid.uuid4().hex[:8]}"])
+            try:
+                await run_backend(backend, repositories, args.operations)
+            finally:
+                if backend == "mongo":
+                    await client.drop_database(repositories.db.name)
+                    client.close()
+                await repositories.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--backends", nargs="+", choices=("memory", "sqlite", "mongo"), default=["memory", "sqlite", "mongo"])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Search index micro-benchmark
+
+Builds a SearchIndex over synthetic portfolios with thousands of projects and
+experience entries, then reports full build time, incremental sync time after
+editing a handful of entries, and per-query latency percentiles.
+
+Run from the backend directory (no database needed):
+    python -m benchmarks.search_index --sizes 1000 5000 20000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models.portfolio import Project, Experience
+from services.search_index import SearchIndex
+
+TOPICAL = (
+    "data analytics machine learning dashboard power bi python sql tensorflow cnn "
+    "anomaly detection forecasting visualization pipeline spark pandas regression "
+    "classification clustering nlp transformer etl warehouse kpi sales hr finance "
+    "network intrusion image processing random forest svm gdp economic trends"
+).split()
+# Synthetic long tail so term frequencies follow a realistic skew
+WORDS = TOPICAL + [f"term{i}" for i in range(5000)]
+COMPANIES = ["Infosys", "ONGC", "TCS", "Wipro", "Accenture", "Deloitte", "IBM", "Capgemini"]
+CATEGORIES = ["Data Analytics", "Machine Learning", "Data Engineering", "Visualization"]
+
+def word(rng):
+    # Zipf-like: low ranks (the topical vocabulary) are far more common
+    return WORDS[min(len(WORDS) - 1, int(rng.paretovariate(1.1)) - 1)]
+
+def phrase(rng, n):
+    return " ".join(word(rng) for _ in range(n))
+
+def make_entries(size, rng):
+    projects = [
+        Project(
+            id=i, title=phrase(rng, 3).title(), description=phrase(rng, 25),
+            image="https://images.unsplash.com/photo", github="https://github.com/example",
+            technologies=rng.sample(TOPICAL, 4), category=rng.choice(CATEGORIES)
+        )
+        for i in range(size)
+    ]
+    experience = [
+        Experience(
+            id=i, title=phrase(rng, 2).title() + " Intern", company=rng.choice(COMPANIES),
+            duration="2024", description=phrase(rng, 30), technologies=rng.sample(TOPICAL, 3)
+        )
+        for i in range(max(1, size // 10))
+    ]
+    return projects, experience
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e6
+
+def run(size, queries, rng):
+    projects, experience = make_entries(size, rng)
+    index = SearchIndex()
+
+    start = time.perf_counter()
+    index.sync(projects, experience, version=1)
+    build = time.perf_counter() - start
+
+    for i in rng.sample(range(size), 5):
+        projects[i] = projects[i].model_copy(update={"description": phrase(rng, 25)})
+    start = time.perf_counter()
+    changes = index.sync(projects, experience, version=2)
+    incremental = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(queries):
+        query = phrase(rng, rng.randint(1, 3))
+        start = time.perf_counter()
+        index.search(query, limit=20)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    print(f"entries={len(index):6d} build={build * 1000:8.1f}ms "
+          f"incremental={incremental * 1000:7.1f}ms ({changes['updated']} updated) "
+          f"query p50={percentile(latencies, 0.5):7.0f}us p95={percentile(latencies, 0.95):7.0f}us "
+          f"p99={percentile(latencies, 0.99):7.0f}us")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    for size in args.sizes:
+        run(size, args.queries, rng)
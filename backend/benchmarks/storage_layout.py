@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Portfolio storage layout benchmark
+
+Stores the same synthetic portfolio (thousands of projects) in the embedded
+layout (arrays inside one document) and the normalized layout (one document
+per entry in indexed collections), then reports for each: stored size, a cold
+full-portfolio load, a filtered first page of /projects, a deep page, and a
+single-project update. The snapshot cache is disabled so every call reaches
+MongoDB.
+
+Run from the backend directory against a local MongoDB:
+    python -m benchmarks.storage_layout --sizes 10000 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+load_dotenv(Path(__file__).resolve().parent.parent / '.env')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmarks.search_index import TOPICAL, make_entries
+from database.indexes import apply_indexes
+from database.seed_data import get_portfolio_seed_data
+from models.portfolio import ProjectUpdate
+from services.normalized_layout import LAYOUTS
+from services.portfolio_service import PortfolioService
+
+# The embedded layout must stay under MongoDB's 16 MB document limit
+DESCRIPTION_WORDS = 12
+
+async def timed(repeat, call):
+    """Latencies in milliseconds, sorted"""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sorted(latencies)
+
+def pick(latencies, q):
+    return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+async def stored_bytes(db) -> int:
+    total = 0
+    for collection in ("portfolio", "projects", "experience"):
+        async for row in db[collection].aggregate([{"$group": {"_id": None, "bytes": {"$sum": {"$bsonSize": "$$ROOT"}}}}]):
+            total += row["bytes"]
+    return total
+
+async def run_layout(client, layout, portfolio, repeat, rng):
+    db = client[f"bench_layout_{uuid.uuid4().hex[:8]}"]
+    try:
+        await apply_indexes(db)
+        service = PortfolioService(db, cache_ttl=0, layout=layout)
+        await service.update_portfolio(portfolio)
+        size = await stored_bytes(db)
+        technology = rng.choice(TOPICAL)
+
+        load = await timed(max(3, repeat // 10), service.get_snapshot)
+        first_page = await timed(repeat, lambda: service.get_projects_page(technologies=[technology], limit=20))
+        _, _, cursor = await service.get_projects_page(limit=20)
+        for _ in range(len(portfolio.projects) // 40):
+            _, _, cursor = await service.get_projects_page(limit=20, cursor=cursor)
+        deep_page = await timed(repeat, lambda: service.get_projects_page(limit=20, cursor=cursor))
+        ids = [project.id for project in portfolio.projects]
+        update = await timed(max(3, repeat // 10), lambda: service.update_entry(
+            "projects", rng.choice(ids), ProjectUpdate(title=f"Renamed {rng.random():.6f}")
+        ))
+    finally:
+        await client.drop_database(db.name)
+
+    print(f"  {layout:<10} stored={size / 2**20:6.1f}MB "
+          f"full load p50={pick(load, 0.5):8.1f}ms "
+          f"filtered page p50={pick(first_page, 0.5):7.2f}ms p95={pick(first_page, 0.95):7.2f}ms "
+          f"deep page p50={pick(deep_page, 0.5):7.2f}ms "
+          f"update p50={pick(update, 0.5):8.2f}ms")
+
+async def main(args):
+    logging.disable(logging.INFO)
+    rng = random.Random(args.seed)
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        for size in args.sizes:
+            projects, experience = make_entries(size, rng)
+            projects = [p.model_copy(update={"description": " ".join(p.description.split()[:DESCRIPTION_WORDS])}) for p in projects]
+            portfolio = get_portfolio_seed_data().model_copy(update={"projects": projects, "experience": experience})
+            print(f"projects={size}")
+            for layout in LAYOUTS:
+                await run_layout(client, layout, portfolio, args.repeat, rng)
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 20000])
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,102 @@
+from pymongo import IndexModel
+from models.portfolio import PORTFOLIO_ID
+from services.pagination import keyset_filter, keyset_sort, encode_cursor
+from datetime import datetime
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Every index the application relies on, by collection. apply_indexes() makes
+# the database match this registry; index_report() shows any drift.
+INDEXES = {
+    "portfolio": [
+        IndexModel([("id", 1)], name="id_unique", unique=True),
+        # Covers the version polls of cache coherence
+        IndexModel([("id", 1), ("version", 1)], name="id_version"),
+    ],
+    # Entry collections used by the normalized storage layout
+    "projects": [
+        IndexModel([("id", 1)], name="id_unique", unique=True),
+        IndexModel([("position", 1)], name="position"),
+        IndexModel([("category_key", 1), ("position", 1)], name="category_position"),
+        IndexModel([("technology_keys", 1), ("position", 1)], name="technology_position"),
+    ],
+    "experience": [
+        IndexModel([("id", 1)], name="id_unique", unique=True),
+        IndexModel([("position", 1)], name="position"),
+    ],
+    "contact_messages": [
+        IndexModel([("created_at", -1), ("id", -1)], name="created_at_id"),
+        IndexModel([("read", 1), ("created_at", -1), ("id", -1)], name="read_created_at_id"),
+    ],
+    "status_checks": [
+        IndexModel([("timestamp", -1), ("id", -1)], name="timestamp_id"),
+    ],
+    "view_counts": [
+        IndexModel([("granularity", 1), ("start", 1)], name="granularity_start_unique", unique=True),
+    ],
+}
+
+def _sample_cursor() -> str:
+    return encode_cursor(datetime(2024, 1, 1), "00000000")
+
+# Query shapes issued by the services, checked against the registry with explain()
+QUERY_SHAPES = [
+    ("portfolio by id", "portfolio", {"id": PORTFOLIO_ID}, None),
+    ("projects page", "projects", {"position": {"$gt": 0}}, [("position", 1)]),
+    ("projects by category", "projects", {"category_key": {"$in": ["data analytics"]}}, [("position", 1)]),
+    ("projects by technology", "projects", {"technology_keys": {"$in": ["python"]}}, [("position", 1)]),
+    ("experience in order", "experience", {}, [("position", 1)]),
+    ("contact page", "contact_messages", {}, keyset_sort("created_at")),
+    ("contact next page", "contact_messages", lambda: keyset_filter("created_at", _sample_cursor()), keyset_sort("created_at")),
+    ("contact unread page", "contact_messages", {"read": False}, keyset_sort("created_at")),
+    ("status page", "status_checks", {}, keyset_sort("timestamp")),
+    ("view buckets", "view_counts", {"granularity": "day", "start": {"$gte": datetime(2024, 1, 1)}}, [("start", 1)]),
+]
+
+async def apply_indexes(db) -> float:
+    """Create every registered index (a no-op for ones that already exist)"""
+    started = time.perf_counter()
+    for collection, indexes in INDEXES.items():
+        await db[collection].create_indexes(indexes)
+    elapsed = time.perf_counter() - started
+    logger.info(f"Indexes ensured on {len(INDEXES)} collections in {elapsed * 1000:.1f}ms")
+    return elapsed
+
+async def index_report(db) -> dict:
+    """Registered indexes missing from the database, and unregistered ones present in it"""
+    report = {}
+    for collection, indexes in INDEXES.items():
+        expected = {index.document["name"] for index in indexes}
+        existing = set(await db[collection].index_information()) - {"_id_"}
+        report[collection] = {
+            "missing": sorted(expected - existing),
+            "extra": sorted(existing - expected),
+        }
+    return report
+
+def plan_stages(plan: dict) -> set:
+    """All stage names in an explain() plan tree"""
+    stages = {plan.get("stage")}
+    children = plan.get("inputStages", []) + [plan[key] for key in ("inputStage", "queryPlan") if key in plan]
+    for child in children:
+        stages |= plan_stages(child)
+    return stages - {None}
+
+async def check_query_plans(db) -> list:
+    """Explain each known query shape and report whether it is index-backed"""
+    results = []
+    for name, collection, query, sort in QUERY_SHAPES:
+        cursor = db[collection].find(query() if callable(query) else query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.limit(1).explain()
+        stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+        results.append({
+            "query": name,
+            "collection": collection,
+            "stages": sorted(stages),
+            "indexed": "IXSCAN" in stages and "COLLSCAN" not in stages and "SORT" not in stages,
+        })
+    return results
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Convert the stored portfolio between the embedded and normalized layouts
+
+The embedded layout keeps projects and experience as arrays inside the
+portfolio document; the normalized layout stores one document per entry in
+the indexed `projects` and `experience` collections. Conversion happens in
+place and is safe to re-run: the target entries are written first, then the
+portfolio document is switched over (bumping its version so every worker
+reloads), and only then is the old copy removed.
+
+Run from the backend directory, then restart with PORTFOLIO_STORAGE_LAYOUT
+set to the same layout:
+    python -m database.migrate_layout --to normalized
+    python -m database.migrate_layout --to embedded
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+load_dotenv(Path(__file__).resolve().parent.parent / '.env')
+
+from database.indexes import apply_indexes
+from database.mongo import close_client, get_database
+from models.portfolio import PORTFOLIO_ID
+from services.normalized_layout import ENTRY_SECTIONS, LAYOUTS, read_entries, write_entries
+from repositories.base import utc_now
+
+logger = logging.getLogger(__name__)
+
+def _switch(layout: str, entries: dict) -> dict:
+    """Update that marks the portfolio as stored in layout and bumps its version"""
+    update = {"$set": {"updated_at": utc_now()}, "$inc": {"version": 1}}
+    if layout == "normalized":
+        update["$set"]["layout"] = layout
+        update["$unset"] = {section: "" for section in ENTRY_SECTIONS}
+    else:
+        update["$set"].update(entries)
+        update["$unset"] = {"layout": ""}
+    return update
+
+async def migrate_layout(db, layout: str) -> dict:
+    """Convert the portfolio to layout; returns entry counts per section
+
+    Raises LookupError when there is no portfolio to convert.
+    """
+    portfolio = await db.portfolio.find_one({"id": PORTFOLIO_ID}, {"_id": 0, "layout": 1, "projects": 1, "experience": 1})
+    if portfolio is None:
+        raise LookupError("No portfolio to migrate")
+    current = portfolio.get("layout", "embedded")
+
+    if layout == "normalized":
+        if current != "normalized":
+            for section in ENTRY_SECTIONS:
+                await write_entries(db[section], section, portfolio.get(section, []))
+            await db.portfolio.update_one({"id": PORTFOLIO_ID}, _switch(layout, {}))
+        counts = {section: await db[section].count_documents({}) for section in ENTRY_SECTIONS}
+    else:
+        entries = {}
+        for section in ENTRY_SECTIONS:
+            entries[section] = portfolio[section] if current != "normalized" else await read_entries(db[section])
+            for entry in entries[section]:
+                entry.pop("position", None)
+        if current == "normalized":
+            await db.portfolio.update_one({"id": PORTFOLIO_ID}, _switch(layout, entries))
+        for section in ENTRY_SECTIONS:
+            await db[section].delete_many({})
+        counts = {section: len(entries[section]) for section in ENTRY_SECTIONS}
+
+    logger.info(f"Portfolio converted from {current} to {layout} layout: {counts}")
+    return counts
+
+async def main(layout: str):
+    db = get_database()
+    try:
+        await apply_indexes(db)
+        await migrate_layout(db, layout)
+    finally:
+        close_client()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--to", dest="layout", choices=LAYOUTS, required=True)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(main(parser.parse_args().layout))
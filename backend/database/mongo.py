@@ -0,0 +1,102 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from typing import Optional
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Process-wide client shared by every router. Motor keeps its own connection
+# pool per client, so creating one per request means a new pool per request.
+_client: Optional[AsyncIOMotorClient] = None
+
+def get_client_options() -> dict:
+    """Build Motor pool/timeout options from the environment"""
+    return {
+        "maxPoolSize": int(os.environ.get("MONGO_MAX_POOL_SIZE", "100")),
+        "minPoolSize": int(os.environ.get("MONGO_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", "300000")),
+        "connectTimeoutMS": int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+        "serverSelectionTimeoutMS": int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "socketTimeoutMS": int(os.environ.get("MONGO_SOCKET_TIMEOUT_MS", "20000")),
+    }
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connection pool counters for the readiness report, summed over every server
+
+    The driver calls these from its own threads; each is a single counter
+    update, so no locking is needed for a report that is read occasionally.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checked_in = 0
+        self.check_out_failures = 0
+        self.clears = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.closed += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.check_out_failures += 1
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self.checked_in += 1
+
+    def stats(self) -> dict:
+        return {
+            "open": self.created - self.closed,
+            "in_use": self.checked_out - self.checked_in,
+            "created": self.created,
+            "check_out_failures": self.check_out_failures,
+            "clears": self.clears,
+        }
+
+pool_monitor = PoolMonitor()
+
+def get_client() -> AsyncIOMotorClient:
+    """Return the shared Motor client, creating it on first use"""
+    global _client
+    if _client is None:
+        options = get_client_options()
+        _client = AsyncIOMotorClient(os.environ['MONGO_URL'], event_listeners=[pool_monitor], **options)
+        logger.info(f"MongoDB client created (maxPoolSize={options['maxPoolSize']})")
+    return _client
+
+def get_database():
+    """Return the application database on the shared client"""
+    return get_client()[os.environ['DB_NAME']]
+
+def close_client():
+    """Close the shared client and drop its connection pool"""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+        logger.info("Database connection closed")
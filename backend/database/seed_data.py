@@ -1,5 +1,5 @@
 from datetime import datetime
-from models.portfolio import Portfolio, PersonalInfo, Project, Experience
+from models.portfolio import PORTFOLIO_ID, Portfolio, PersonalInfo, Project, Experience
 
 # Seed data based on the existing mock data
 def get_portfolio_seed_data():
@@ -82,6 +82,7 @@ def get_portfolio_seed_data():
     ]
 
     return Portfolio(
+        id=PORTFOLIO_ID,
         personal=personal_info,
         projects=projects,
         experience=experience
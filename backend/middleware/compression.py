@@ -0,0 +1,20 @@
+from services.compression import accepted_encoding
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+
+class NegotiatedGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that honours Accept-Encoding q-values
+
+    Starlette compresses whenever "gzip" appears in the header, even as
+    "gzip;q=0". This only compresses when gzip is acceptable to the client,
+    negotiated as for the pre-compressed snapshot bodies.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            accept_encoding = Headers(scope=scope).get("accept-encoding")
+            if accepted_encoding(accept_encoding, ("gzip",)) == "gzip":
+                responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -0,0 +1,72 @@
+from services.metrics import MetricsRegistry
+import time
+
+# Route label for requests no route matched (404s from scanners would
+# otherwise create one series per path)
+UNMATCHED_ROUTE = "unmatched"
+
+# Method label for anything else, since clients can send arbitrary methods
+STANDARD_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+OTHER_METHOD = "other"
+
+class MetricsMiddleware:
+    """Count and time HTTP requests per route template, method and status
+
+    A plain ASGI middleware rather than BaseHTTPMiddleware: it adds no task or
+    body buffering, so streamed responses pass through untouched and the
+    per-request cost is a few dictionary lookups. The route label is the
+    matched path template (e.g. /api/portfolio/projects/{project_id}), read
+    from the scope after routing, so label cardinality is bounded by the
+    number of routes; non-standard methods share the "other" label.
+    Durations run until the last body chunk is sent.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.requests = registry.counter(
+            "http_requests_total", "HTTP requests by route, method and status", ("method", "route", "status")
+        )
+        self.duration = registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency by route and method", ("method", "route")
+        )
+        self.in_progress = registry.gauge(
+            "http_requests_in_progress", "HTTP requests being served", ("method",)
+        )
+        # Series by (method, route[, status]), skipping label formatting per request
+        self._durations = {}
+        self._counts = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        if method not in STANDARD_METHODS:
+            method = OTHER_METHOD
+        in_progress = self.in_progress.labels(method)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_and_record(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            in_progress.dec()
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            route = route.path if route is not None else UNMATCHED_ROUTE
+            duration = self._durations.get((method, route))
+            if duration is None:
+                duration = self._durations[(method, route)] = self.duration.labels(method, route)
+            duration.observe(elapsed)
+            count = self._counts.get((method, route, status))
+            if count is None:
+                count = self._counts[(method, route, status)] = self.requests.labels(method, route, status)
+            count.inc()
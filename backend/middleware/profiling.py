@@ -0,0 +1,175 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import cProfile
+import hmac
+import logging
+import os
+import pstats
+import random
+import re
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+FORMATS = ("pstats", "collapsed", "both")
+
+# Call paths carrying less than this many microseconds are left out of collapsed stacks
+MIN_STACK_MICROSECONDS = 1
+
+def profiling_options() -> dict:
+    """Build ProfilingMiddleware options from the environment"""
+    return {
+        "directory": os.environ.get("PROFILING_DIR", "profiles"),
+        "secret": os.environ.get("PROFILING_SECRET") or None,
+        "sample_rate": float(os.environ.get("PROFILING_SAMPLE_RATE", "0")),
+        "output": os.environ.get("PROFILING_FORMAT", "both"),
+        "max_profiles": int(os.environ.get("PROFILING_MAX_PROFILES", "50")),
+    }
+
+def _label(function: Tuple[str, int, str]) -> str:
+    filename, line, name = function
+    if filename == "~":
+        # Builtins: ('~', 0, "<method 'sort' of 'list' objects>")
+        return name
+    return f"{Path(filename).stem}.py:{name}:{line}"
+
+def collapsed_stacks(stats: pstats.Stats) -> List[str]:
+    """Flame-graph input ("a;b;c <microseconds>" lines) derived from cProfile stats
+
+    cProfile records caller/callee pairs, not whole stacks, so each path's
+    time is apportioned by the share of a callee's time that came from that
+    caller, as flameprof and similar tools do. Recursive cycles are cut.
+    Coroutines resumed by the event loop often have no root above them in
+    that graph, so whatever share of a function no walk reached becomes a
+    stack of its own.
+    """
+    entries = stats.stats
+    children: Dict[tuple, List[tuple]] = {}
+    for function, (_, _, _, _, callers) in entries.items():
+        for caller in callers:
+            children.setdefault(caller, []).append(function)
+
+    totals: Dict[str, float] = {}
+    reached: Dict[tuple, float] = {}
+
+    def walk(function, stack: tuple, share: float):
+        own = entries[function][2]
+        reached[function] = reached.get(function, 0.0) + share
+        stack = stack + (_label(function),)
+        if own * share * 1e6 >= MIN_STACK_MICROSECONDS:
+            key = ";".join(stack)
+            totals[key] = totals.get(key, 0.0) + own * share
+        for child in children.get(function, ()):
+            child_total = entries[child][3]
+            from_here = entries[child][4][function][3]
+            if child_total <= 0 or _label(child) in stack:
+                continue
+            child_share = share * from_here / child_total
+            if child_total * child_share * 1e6 >= MIN_STACK_MICROSECONDS:
+                walk(child, stack, child_share)
+
+    for function in sorted(entries, key=lambda function: (bool(entries[function][4]), -entries[function][3])):
+        remaining = 1.0 - reached.get(function, 0.0)
+        if entries[function][3] * remaining * 1e6 >= MIN_STACK_MICROSECONDS:
+            walk(function, (), remaining)
+    return [f"{stack} {round(seconds * 1e6)}" for stack, seconds in sorted(totals.items()) if round(seconds * 1e6)]
+
+def _slug(path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_")[:60] or "root"
+
+class ProfilingMiddleware:
+    """Profile individual requests with cProfile, on demand
+
+    A request is profiled when it carries `X-Profile: <secret>` or is picked
+    by the sample rate. Its profile is written after the response as a
+    .pstats file (for pstats/snakeviz) and/or a .collapsed file (for
+    flamegraph.pl or speedscope), named after the time, method and path; the
+    name is returned in the X-Profile-Id header. Only the newest
+    `max_profiles` profiles are kept.
+
+    cProfile sees everything on the event loop thread while it runs, so one
+    request is profiled at a time and others that overlap it still show up;
+    profile under light traffic. Work Motor runs in its I/O threads shows as
+    time the request spent awaiting. The middleware is only installed when
+    profiling is enabled, so it costs nothing otherwise.
+    """
+
+    def __init__(
+        self,
+        app,
+        directory: str = "profiles",
+        secret: Optional[str] = None,
+        sample_rate: float = 0.0,
+        output: str = "both",
+        max_profiles: int = 50
+    ):
+        if output not in FORMATS:
+            raise ValueError(f"Profile output must be one of {', '.join(FORMATS)}, not {output!r}")
+        self.app = app
+        self.directory = Path(directory)
+        self.secret = secret.encode() if secret else None
+        self.sample_rate = sample_rate
+        self.output = output
+        self.max_profiles = max_profiles
+        self.active = False
+        self.written = 0
+        if not self.secret and sample_rate <= 0:
+            logger.warning("Profiling is enabled but neither PROFILING_SECRET nor PROFILING_SAMPLE_RATE is set")
+
+    def _requested(self, scope) -> bool:
+        if self.secret:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, self.secret)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.active or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{_slug(scope['path'])}-{uuid.uuid4().hex[:8]}"
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (PROFILE_ID_HEADER, name.encode())]}
+            await send(message)
+
+        profiler = cProfile.Profile()
+        self.active = True
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.disable()
+            self.active = False
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._save, profiler, name)
+            except Exception as e:
+                logger.error(f"Saving profile {name} failed: {e}")
+
+    def _save(self, profiler: cProfile.Profile, name: str):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stats = pstats.Stats(profiler)
+        if self.output in ("pstats", "both"):
+            stats.dump_stats(self.directory / f"{name}.pstats")
+        if self.output in ("collapsed", "both"):
+            (self.directory / f"{name}.collapsed").write_text("\n".join(collapsed_stacks(stats)) + "\n")
+        self.written += 1
+        logger.info(f"Request profile written: {self.directory / name}")
+        self._prune()
+
+    def _prune(self):
+        """Delete the oldest profiles beyond max_profiles"""
+        profiles: Dict[str, List[Path]] = {}
+        for path in self.directory.iterdir():
+            if path.suffix in (".pstats", ".collapsed"):
+                profiles.setdefault(path.stem, []).append(path)
+        newest_first = sorted(profiles, key=lambda stem: max(p.stat().st_mtime for p in profiles[stem]), reverse=True)
+        for stem in newest_first[self.max_profiles:]:
+            for path in profiles[stem]:
+                path.unlink(missing_ok=True)
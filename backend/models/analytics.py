@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List
+from datetime import datetime
+
+class ViewEvent(BaseModel):
+    """A view the client reports itself, such as opening a project"""
+    project_id: int = Field(..., ge=0)
+
+class ViewBucket(BaseModel):
+    start: datetime
+    views: int
+    sections: Dict[str, int]
+    projects: Dict[str, int]
+
+class ViewReport(BaseModel):
+    granularity: str
+    since: datetime
+    until: datetime
+    views: int
+    sections: Dict[str, int]
+    projects: Dict[str, int]
+    buckets: List[ViewBucket]
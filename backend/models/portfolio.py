@@ -1,8 +1,11 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, List, Optional
 from datetime import datetime
 import uuid
 
+# The portfolio is a single document stored under this fixed id
+PORTFOLIO_ID = "portfolio"
+
 class PersonalInfo(BaseModel):
     name: str
     title: str
@@ -38,6 +41,26 @@ class Portfolio(BaseModel):
     projects: List[Project]
     experience: List[Experience]
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Incremented on every write; used for compare-and-swap updates
+    version: int = 0
+
+class ProjectUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    image: Optional[str] = None
+    github: Optional[str] = None
+    technologies: Optional[List[str]] = None
+    category: Optional[str] = None
+
+class ExperienceUpdate(BaseModel):
+    title: Optional[str] = None
+    company: Optional[str] = None
+    duration: Optional[str] = None
+    description: Optional[str] = None
+    technologies: Optional[List[str]] = None
+
+class EntryOrder(BaseModel):
+    ids: List[int]
 
 class ContactMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -50,4 +73,20 @@ class ContactMessage(BaseModel):
 class ContactMessageCreate(BaseModel):
     name: str
     email: str
-    message: str
\ No newline at end of file
+    message: str
+
+class SearchResult(BaseModel):
+    type: str
+    id: int
+    title: str
+    score: float
+
+class BatchResult(BaseModel):
+    section: str
+    status: int
+    body: Any
+    next_cursor: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    version: int
+    results: List[BatchResult]
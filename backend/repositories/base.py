@@ -0,0 +1,186 @@
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from services.fieldsets import fieldset_sections
+
+# Documents passed to and returned by repositories are plain dicts shaped like
+# the pydantic models' .dict() output, with datetimes as naive UTC datetime
+# objects. Services validate them into models.
+
+def utc_now() -> datetime:
+    """Current UTC time at the millisecond precision MongoDB stores"""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+def naive_utc(value: datetime) -> datetime:
+    """Comparable form of a possibly timezone-aware datetime"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class PortfolioRepository(ABC):
+    """Storage for the single portfolio document
+
+    Every write bumps `version` and sets `updated_at`. Writes that take an
+    expected version raise VersionConflict unless the stored portfolio is
+    still at that version. Entry edits return the portfolio metadata plus
+    (at least) the edited section as read after the write.
+
+    Optional capabilities are flagged rather than stubbed; backends that set
+    a flag provide the matching method:
+
+    - queries_projects: `query_projects(categories, technologies, match,
+      after, limit)` filters and pages projects in storage, returning the
+      projects after a position and the last position if more follow.
+    - watches_changes: `watch()` is an async iterator yielding whenever the
+      portfolio may have changed in any process (it may still raise when
+      the deployment cannot push changes, e.g. MongoDB without a replica set).
+    """
+
+    queries_projects = False
+    watches_changes = False
+
+    @abstractmethod
+    async def read(self, sections: Iterable[str]) -> Optional[dict]:
+        """Metadata (id, updated_at, version) plus the given sections, or None"""
+
+    @abstractmethod
+    async def create(self, document: dict) -> bool:
+        """Store document unless a portfolio exists, atomically; True if it was stored"""
+
+    @abstractmethod
+    async def replace(self, document: dict, expected_version: int):
+        """Store document if the portfolio is at expected_version or does not exist yet"""
+
+    @abstractmethod
+    async def add_entry(self, section: str, entry: dict, expected_version: Optional[int] = None) -> dict:
+        """Append an entry; EntryConflict if its id is taken"""
+
+    @abstractmethod
+    async def update_entry(self, section: str, entry_id: int, fields: dict, expected_version: Optional[int] = None) -> dict:
+        """Set some fields of an entry; EntryNotFound if there is none with that id"""
+
+    @abstractmethod
+    async def delete_entry(self, section: str, entry_id: int, expected_version: Optional[int] = None) -> dict:
+        """Remove an entry; EntryNotFound if there is none with that id"""
+
+    @abstractmethod
+    async def reorder_entries(self, section: str, ids: List[int], expected_version: Optional[int] = None) -> dict:
+        """Put entries in the order of ids; EntryConflict unless ids lists each entry once"""
+
+    async def read_fields(self, fieldset) -> Optional[dict]:
+        """Metadata plus at least the fields of a fieldset (see services.fieldsets), or None
+
+        Backends that can project reads to single fields (MongoDB) return
+        only those; the rest read whole sections, which callers trim.
+        """
+        return await self.read(fieldset_sections(fieldset))
+
+    async def version(self) -> Optional[int]:
+        """Stored portfolio version, or None when there is no portfolio"""
+        document = await self.read(())
+        return document.get("version", 0) if document else None
+
+class ContactRepository(ABC):
+    """Storage for contact messages, ordered by (created_at, id)"""
+
+    @abstractmethod
+    async def insert(self, document: dict):
+        ...
+
+    @abstractmethod
+    async def insert_many(self, documents: List[dict]):
+        """Insert a batch; documents that fail must not stop the others"""
+
+    @abstractmethod
+    async def page(self, limit: int, cursor: Optional[str] = None, read: Optional[bool] = None) -> List[dict]:
+        """Up to limit messages, newest first, after a keyset cursor (InvalidCursor if malformed)"""
+
+    @abstractmethod
+    def scan(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        read: Optional[bool] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        """Every matching message, oldest first, holding one batch in memory at a time"""
+
+class StatusRepository(ABC):
+    """Storage for status checks, ordered by (timestamp, id)"""
+
+    @abstractmethod
+    async def insert(self, document: dict):
+        ...
+
+    @abstractmethod
+    async def page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[dict]:
+        """Up to limit checks, newest first, after a keyset cursor (InvalidCursor if malformed)"""
+
+    @abstractmethod
+    def scan(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[dict]:
+        """Matching checks, newest first, holding one batch in memory at a time"""
+
+class ViewRepository(ABC):
+    """Pre-aggregated view counts in time buckets
+
+    A bucket is identified by its granularity ("hour" or "day") and start
+    time, and holds a count per counter name (e.g. "section:projects",
+    "project:3"). Counts are only ever added to, so writers in several
+    processes can add to the same bucket without coordinating.
+    """
+
+    @abstractmethod
+    async def add(self, increments: List[Tuple[str, datetime, Dict[str, int]]]):
+        """Add (granularity, start, {counter: count}) increments to their buckets, as one batch"""
+
+    @abstractmethod
+    async def buckets(self, granularity: str, since: datetime, until: datetime) -> List[dict]:
+        """Buckets starting in [since, until), oldest first, as {granularity, start, counts}"""
+
+class Repositories:
+    """The repositories of one storage backend, plus its lifecycle"""
+
+    name = "base"
+
+    def __init__(
+        self,
+        portfolio: PortfolioRepository,
+        contacts: ContactRepository,
+        status_checks: StatusRepository,
+        views: ViewRepository
+    ):
+        self.portfolio = portfolio
+        self.contacts = contacts
+        self.status_checks = status_checks
+        self.views = views
+
+    async def ping(self):
+        """Raise if the backend is unreachable"""
+
+    async def connect(self, connections: int):
+        """Open up to `connections` pooled connections ahead of traffic; raise if unreachable"""
+        await self.ping()
+
+    def pool_stats(self) -> Optional[dict]:
+        """Connection pool state, or None for backends without a pool"""
+        return None
+
+    async def prepare(self):
+        """Create indexes or tables; safe to call on every start"""
+
+    async def close(self):
+        """Release connections"""
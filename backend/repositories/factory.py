@@ -0,0 +1,30 @@
+from repositories.base import Repositories
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("mongo", "memory", "sqlite")
+
+def storage_backend() -> str:
+    """Storage backend chosen by STORAGE_BACKEND (mongo by default)"""
+    backend = os.environ.get("STORAGE_BACKEND", "mongo").lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"STORAGE_BACKEND must be one of {', '.join(BACKENDS)}, not {backend!r}")
+    return backend
+
+def create_repositories(backend: str = None) -> Repositories:
+    """Build the repositories for a backend; each imports only its own driver"""
+    backend = backend or storage_backend()
+    if backend == "memory":
+        from repositories.memory import MemoryRepositories
+        repositories = MemoryRepositories()
+    elif backend == "sqlite":
+        from repositories.sqlite import SQLiteRepositories
+        repositories = SQLiteRepositories(os.environ.get("SQLITE_PATH", "portfolio.sqlite3"))
+    else:
+        from database.mongo import get_database
+        from repositories.mongo import MongoRepositories
+        repositories = MongoRepositories(get_database(), owns_client=True)
+    logger.info(f"Using the {repositories.name} storage backend")
+    return repositories
@@ -0,0 +1,205 @@
+from repositories.base import ContactRepository, PortfolioRepository, Repositories, StatusRepository, ViewRepository, naive_utc, utc_now
+from services.errors import PortfolioNotFound, EntryNotFound, EntryConflict, VersionConflict
+from services.pagination import decode_cursor
+from services.portfolio_cache import SECTIONS
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+import copy
+
+# Process-local storage for tests, demos and single-worker edge deployments.
+# Nothing is persisted. Every operation runs without awaiting, so each one is
+# atomic with respect to other requests on the event loop. Documents are
+# copied on the way in and out so callers can never alias stored state.
+
+class MemoryPortfolioRepository(PortfolioRepository):
+    def __init__(self):
+        self.document: Optional[dict] = None
+
+    async def read(self, sections: Iterable[str]) -> Optional[dict]:
+        if self.document is None:
+            return None
+        fields = ("id", "updated_at", "version", *sections)
+        return {field: copy.deepcopy(self.document[field]) for field in fields if field in self.document}
+
+    async def create(self, document: dict) -> bool:
+        if self.document is not None:
+            return False
+        self.document = copy.deepcopy(document)
+        return True
+
+    async def replace(self, document: dict, expected_version: int):
+        if self.document is not None and self.document.get("version", 0) != expected_version:
+            raise VersionConflict(expected_version, self.document.get("version", 0))
+        self.document = copy.deepcopy(document)
+
+    def _entries(self, section: str, expected_version: Optional[int]) -> list:
+        if self.document is None:
+            raise PortfolioNotFound()
+        version = self.document.get("version", 0)
+        if expected_version is not None and version != expected_version:
+            raise VersionConflict(expected_version, version)
+        return self.document[section]
+
+    async def _written(self) -> dict:
+        self.document["version"] = self.document.get("version", 0) + 1
+        self.document["updated_at"] = utc_now()
+        return await self.read(SECTIONS)
+
+    async def add_entry(self, section: str, entry: dict, expected_version: Optional[int] = None) -> dict:
+        entries = self._entries(section, expected_version)
+        if any(existing["id"] == entry["id"] for existing in entries):
+            raise EntryConflict()
+        entries.append(copy.deepcopy(entry))
+        return await self._written()
+
+    async def update_entry(self, section: str, entry_id: int, fields: dict, expected_version: Optional[int] = None) -> dict:
+        entries = self._entries(section, expected_version)
+        matches = [entry for entry in entries if entry["id"] == entry_id]
+        if not matches:
+            raise EntryNotFound()
+        for entry in matches:
+            entry.update(copy.deepcopy(fields))
+        return await self._written()
+
+    async def delete_entry(self, section: str, entry_id: int, expected_version: Optional[int] = None) -> dict:
+        entries = self._entries(section, expected_version)
+        remaining = [entry for entry in entries if entry["id"] != entry_id]
+        if len(remaining) == len(entries):
+            raise EntryNotFound()
+        self.document[section] = remaining
+        return await self._written()
+
+    async def reorder_entries(self, section: str, ids: List[int], expected_version: Optional[int] = None) -> dict:
+        entries = {entry["id"]: entry for entry in self._entries(section, expected_version)}
+        if len(ids) != len(set(ids)) or set(ids) != set(entries) or len(entries) != len(self.document[section]):
+            raise EntryConflict()
+        self.document[section] = [entries[i] for i in ids]
+        return await self._written()
+
+class _KeysetLog:
+    """Documents kept sorted by (<timestamp field>, id)"""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.keys = []
+        self.documents = {}
+
+    def add(self, document: dict):
+        key = (naive_utc(document[self.field]), document["id"])
+        if key[1] in self.documents:
+            raise ValueError(f"Duplicate id {key[1]}")
+        insort(self.keys, key)
+        self.documents[key[1]] = copy.deepcopy(document)
+
+    def newest_first(self, cursor: Optional[str], since: Optional[datetime], until: Optional[datetime]):
+        """Documents newest first, starting after the cursor and within [since, until)"""
+        bound = decode_cursor(cursor) if cursor else None
+        if until:
+            bound = min(bound, (naive_utc(until), "")) if bound else (naive_utc(until), "")
+        lower = (naive_utc(since), "") if since else None
+        i = (bisect_left(self.keys, bound) if bound else len(self.keys)) - 1
+        while i >= 0:
+            key = self.keys[i]
+            if lower and key < lower:
+                return
+            yield self.documents[key[1]]
+            # Find the next key again: inserts while the consumer awaits shift positions
+            i = bisect_left(self.keys, key) - 1
+
+    def oldest_first(self, since: Optional[datetime], until: Optional[datetime]):
+        i = bisect_left(self.keys, (naive_utc(since), "")) if since else 0
+        limit = (naive_utc(until), "") if until else None
+        while i < len(self.keys):
+            key = self.keys[i]
+            if limit and key >= limit:
+                return
+            yield self.documents[key[1]]
+            # Find the next key again: inserts while the consumer awaits shift positions
+            i = bisect_right(self.keys, key)
+
+class MemoryContactRepository(ContactRepository):
+    def __init__(self):
+        self.log = _KeysetLog("created_at")
+
+    async def insert(self, document: dict):
+        self.log.add(document)
+
+    async def insert_many(self, documents: List[dict]):
+        for document in documents:
+            try:
+                self.log.add(document)
+            except ValueError:
+                continue
+
+    async def page(self, limit: int, cursor: Optional[str] = None, read: Optional[bool] = None) -> List[dict]:
+        page = []
+        for document in self.log.newest_first(cursor, None, None):
+            if read is None or document["read"] == read:
+                page.append(dict(document))
+                if len(page) == limit:
+                    break
+        return page
+
+    async def scan(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        read: Optional[bool] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        for document in self.log.oldest_first(since, until):
+            if read is None or document["read"] == read:
+                yield dict(document)
+
+class MemoryStatusRepository(StatusRepository):
+    def __init__(self):
+        self.log = _KeysetLog("timestamp")
+
+    async def insert(self, document: dict):
+        self.log.add(document)
+
+    async def page(self, limit: int, cursor: Optional[str] = None, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        page = []
+        for document in self.log.newest_first(cursor, since, until):
+            page.append(dict(document))
+            if len(page) == limit:
+                break
+        return page
+
+    async def scan(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[dict]:
+        for count, document in enumerate(self.log.newest_first(cursor, since, until), 1):
+            yield dict(document)
+            if limit and count >= limit:
+                return
+
+class MemoryViewRepository(ViewRepository):
+    def __init__(self):
+        self.counts: Dict[Tuple[str, datetime], Dict[str, int]] = {}
+
+    async def add(self, increments: List[Tuple[str, datetime, Dict[str, int]]]):
+        for granularity, start, counts in increments:
+            bucket = self.counts.setdefault((granularity, start), {})
+            for counter, count in counts.items():
+                bucket[counter] = bucket.get(counter, 0) + count
+
+    async def buckets(self, granularity: str, since: datetime, until: datetime) -> List[dict]:
+        since, until = naive_utc(since), naive_utc(until)
+        return [
+            {"granularity": granularity, "start": start, "counts": dict(counts)}
+            for (bucket_granularity, start), counts in sorted(self.counts.items())
+            if bucket_granularity == granularity and since <= start < until
+        ]
+
+class MemoryRepositories(Repositories):
+    name = "memory"
+
+    def __init__(self):
+        super().__init__(MemoryPortfolioRepository(), MemoryContactRepository(), MemoryStatusRepository(), MemoryViewRepository())
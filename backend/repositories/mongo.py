@@ -0,0 +1,506 @@
+from models.portfolio import PORTFOLIO_ID
+from repositories.base import ContactRepository, PortfolioRepository, Repositories, StatusRepository, ViewRepository, naive_utc, utc_now
+from services.errors import PortfolioNotFound, EntryNotFound, EntryConflict, VersionConflict
+from services.normalized_layout import ENTRY_SECTIONS, ENTRY_PROJECTION, entry_document, project_filter, query_keys, read_entries, storage_layout, write_entries
+from services.pagination import keyset_filter, keyset_sort
+from services.portfolio_cache import SECTIONS, section_projection
+from services.fieldsets import fieldset_projection
+from database.indexes import apply_indexes, index_report
+from database.mongo import close_client, get_client_options, pool_monitor
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# An edit claim left behind by a writer that died mid-edit lapses after this long
+EDIT_CLAIM_TIMEOUT = timedelta(seconds=30)
+
+class MongoPortfolioRepository(PortfolioRepository):
+    """Portfolio stored in MongoDB, in the embedded or normalized layout"""
+
+    def __init__(self, db, layout: Optional[str] = None):
+        self.collection = db.portfolio
+        self.layout = layout or storage_layout()
+        self.entry_collections = {"projects": db.projects, "experience": db.experience}
+
+    @property
+    def normalized(self) -> bool:
+        return self.layout == "normalized"
+
+    @property
+    def queries_projects(self) -> bool:
+        return self.normalized
+
+    # Change streams on the portfolio collection
+    watches_changes = True
+
+    async def read(self, sections) -> Optional[dict]:
+        """Read the portfolio metadata plus the given sections, in either layout
+
+        In the normalized layout the version is read before the entries and
+        writers change entries before bumping the version, so entries can be
+        newer than the version they are cached under, but never older.
+        """
+        if not self.normalized:
+            return await self.collection.find_one({"id": PORTFOLIO_ID}, section_projection(sections))
+        document = await self.collection.find_one(
+            {"id": PORTFOLIO_ID},
+            section_projection(section for section in sections if section not in ENTRY_SECTIONS)
+        )
+        if document:
+            for section in sections:
+                if section in ENTRY_SECTIONS:
+                    document[section] = await read_entries(self.entry_collections[section])
+        return document
+
+    async def read_fields(self, fieldset) -> Optional[dict]:
+        """Read only the fields of a fieldset, projected in MongoDB, in either layout"""
+        projection = fieldset_projection(fieldset)
+        if not self.normalized:
+            return await self.collection.find_one({"id": PORTFOLIO_ID}, projection)
+        document = await self.collection.find_one(
+            {"id": PORTFOLIO_ID},
+            {path: value for path, value in projection.items() if path.partition(".")[0] not in ENTRY_SECTIONS}
+        )
+        if document:
+            for name, subfields in fieldset:
+                if name in ENTRY_SECTIONS:
+                    entry_projection = ENTRY_PROJECTION if subfields is None else {"_id": 0, **{field: 1 for field in subfields}}
+                    document[name] = await read_entries(self.entry_collections[name], entry_projection)
+        return document
+
+    async def version(self) -> Optional[int]:
+        """Stored version, answered from the (id, version) index without reading the document"""
+        document = await self.collection.find_one({"id": PORTFOLIO_ID}, {"_id": 0, "version": 1})
+        if document is None:
+            return None
+        return document.get("version", 0)
+
+    async def watch(self) -> AsyncIterator[None]:
+        """Yield on every write to the portfolio document (change streams need a replica set)
+
+        Every edit, in either layout, bumps the version on the portfolio
+        document, so watching that one collection is enough.
+        """
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}, {"$project": {"_id": 1}}]
+        async with self.collection.watch(pipeline) as stream:
+            async for _ in stream:
+                yield
+
+    async def create(self, document: dict) -> bool:
+        """Seed the portfolio with an upsert on the fixed id
+
+        The unique id index makes this safe when several processes start
+        against an empty database at once.
+        """
+        await self.upgrade_legacy_portfolio()
+        document = dict(document)
+        if self.normalized and not await self.collection.count_documents({"id": PORTFOLIO_ID}, limit=1):
+            # Entries go first: readers trust the portfolio document, so it must appear last
+            for section in ENTRY_SECTIONS:
+                await write_entries(self.entry_collections[section], section, document.pop(section))
+            document["layout"] = self.layout
+        try:
+            result = await self.collection.update_one({"id": PORTFOLIO_ID}, {"$setOnInsert": document}, upsert=True)
+            return result.upserted_id is not None
+        except DuplicateKeyError:
+            # Another process won the insert; its document is readable now
+            return False
+
+    async def upgrade_legacy_portfolio(self):
+        """Bring a portfolio written by older releases up to the current shape
+
+        Those stored it under a random id and without a version. The version
+        is backfilled as 0, the version readers already assume, because the
+        compare-and-swap filters on {"version": expected} never match a
+        missing field.
+        """
+        legacy = await self.collection.find_one({"id": {"$ne": PORTFOLIO_ID}}, {"_id": 1, "id": 1})
+        if legacy and not await self.collection.count_documents({"id": PORTFOLIO_ID}, limit=1):
+            try:
+                await self.collection.update_one({"_id": legacy["_id"]}, {"$set": {"id": PORTFOLIO_ID}})
+                logger.info(f"Adopted legacy portfolio {legacy['id']} as {PORTFOLIO_ID}")
+            except DuplicateKeyError:
+                pass
+        result = await self.collection.update_many({"version": {"$exists": False}}, {"$set": {"version": 0}})
+        if result.modified_count:
+            logger.info(f"Backfilled version 0 on {result.modified_count} unversioned portfolio document(s)")
+
+    async def replace(self, document: dict, expected_version: int):
+        document = dict(document)
+        query = {"id": document["id"], "version": expected_version}
+        if self.normalized:
+            if await self.version() is not None:
+                # The replacement document carries no claim, so writing it releases the claim
+                query = {"id": document["id"], "edit_claim.token": await self._claim_version(document["id"], expected_version)}
+            try:
+                for section in ENTRY_SECTIONS:
+                    await write_entries(self.entry_collections[section], section, document.pop(section))
+            except Exception:
+                await self._release_claim(query)
+                raise
+            document["layout"] = self.layout
+        try:
+            await self.collection.replace_one(query, document, upsert=True)
+        except DuplicateKeyError:
+            # The unique id index turned the upsert of a stale version into a conflict
+            current = await self.collection.find_one({"id": document["id"]}, {"version": 1})
+            raise VersionConflict(expected_version, current.get("version", 0) if current else 0)
+
+    async def _check_version(self, portfolio_id: str, expected_version: Optional[int], required: bool = True) -> int:
+        """Current portfolio version; raises unless it matches expected_version"""
+        current = await self.collection.find_one({"id": portfolio_id}, {"_id": 0, "version": 1})
+        if not current:
+            if required:
+                raise PortfolioNotFound()
+            return 0
+        version = current.get("version", 0)
+        if expected_version is not None and version != expected_version:
+            raise VersionConflict(expected_version, version)
+        return version
+
+    async def _claim_version(self, portfolio_id: str, expected_version: int) -> str:
+        """Atomically claim the portfolio for an edit based on expected_version
+
+        Normalized edits write other collections before bumping the version,
+        so the version alone cannot guard them. Only one writer holds the
+        claim at a time; a second edit based on the same version gets a
+        VersionConflict instead of also succeeding. Returns the claim token.
+        """
+        token = uuid.uuid4().hex
+        now = utc_now()
+        claimed = await self.collection.find_one_and_update(
+            {
+                "id": portfolio_id,
+                "version": expected_version,
+                "$or": [{"edit_claim": {"$exists": False}}, {"edit_claim.at": {"$lt": now - EDIT_CLAIM_TIMEOUT}}]
+            },
+            {"$set": {"edit_claim": {"token": token, "at": now}}},
+            projection={"_id": 1}
+        )
+        if claimed is None:
+            version = await self._check_version(portfolio_id, expected_version)
+            # At the expected version, but another edit based on it got there first
+            raise VersionConflict(expected_version, version)
+        return token
+
+    async def _release_claim(self, query: dict):
+        """Drop the edit claim held by a query's token after a failed write"""
+        if "edit_claim.token" in query:
+            await self.collection.update_one(query, {"$unset": {"edit_claim": ""}})
+
+    async def _edit(self, query: dict, update: dict, expected_version: Optional[int], array_filters=None) -> Optional[dict]:
+        """Apply a targeted update to the portfolio document, bumping the version"""
+        query = {"id": PORTFOLIO_ID, **query}
+        if expected_version is not None:
+            query["version"] = expected_version
+        update.setdefault("$set", {})["updated_at"] = utc_now()
+        update["$inc"] = {"version": 1}
+        return await self.collection.find_one_and_update(
+            query,
+            update,
+            projection=section_projection(SECTIONS),
+            return_document=ReturnDocument.AFTER,
+            array_filters=array_filters
+        )
+
+    async def _explain_failed_edit(self, section: str, entry_id: int, expected_version: Optional[int], must_exist: bool):
+        """Raise the error that explains why an edit matched no document"""
+        current = await self.collection.find_one({"id": PORTFOLIO_ID}, {"_id": 0, "version": 1, f"{section}.id": 1})
+        if not current:
+            raise PortfolioNotFound()
+        version = current.get("version", 0)
+        if expected_version is not None and version != expected_version:
+            raise VersionConflict(expected_version, version)
+        exists = any(entry.get("id") == entry_id for entry in current.get(section, []))
+        if must_exist and not exists:
+            raise EntryNotFound()
+        if not must_exist and exists:
+            raise EntryConflict()
+        # Changed between the edit and this read
+        raise VersionConflict(expected_version if expected_version is not None else version, version)
+
+    async def _edit_entries(self, section: str, expected_version: Optional[int], write) -> dict:
+        """Apply a write to a normalized entry collection, then bump the portfolio version
+
+        A standalone MongoDB has no multi-document transactions, so an edit
+        based on expected_version first claims that version (see
+        _claim_version) and releases the claim with the version bump. The
+        version only changes once the entries have, as read() relies on.
+        """
+        query = {"id": PORTFOLIO_ID}
+        update = {"$inc": {"version": 1}}
+        if expected_version is None:
+            await self._check_version(PORTFOLIO_ID, None)
+        else:
+            query["edit_claim.token"] = await self._claim_version(PORTFOLIO_ID, expected_version)
+            update["$unset"] = {"edit_claim": ""}
+        try:
+            await write(self.entry_collections[section])
+        except Exception:
+            await self._release_claim(query)
+            raise
+        update["$set"] = {"updated_at": utc_now()}
+        await self.collection.update_one(query, update)
+        return await self.read((section,))
+
+    async def add_entry(self, section: str, entry: dict, expected_version: Optional[int] = None) -> dict:
+        """Append an entry with $push (or an insert in the normalized layout)"""
+        if self.normalized:
+            async def insert(collection):
+                last = await collection.find_one({}, {"_id": 0, "position": 1}, sort=[("position", -1)])
+                try:
+                    await collection.insert_one(entry_document(section, entry, last["position"] + 1 if last else 0))
+                except DuplicateKeyError:
+                    raise EntryConflict()
+
+            return await self._edit_entries(section, expected_version, insert)
+
+        document = await self._edit({f"{section}.id": {"$ne": entry["id"]}}, {"$push": {section: entry}}, expected_version)
+        if document is None:
+            await self._explain_failed_edit(section, entry["id"], expected_version, must_exist=False)
+        return document
+
+    async def update_entry(self, section: str, entry_id: int, fields: dict, expected_version: Optional[int] = None) -> dict:
+        """Change some fields of one entry with a positional $set"""
+        if self.normalized:
+            async def update(collection):
+                if fields:
+                    result = await collection.update_one({"id": entry_id}, {"$set": {**fields, **query_keys(section, fields)}})
+                    found = result.matched_count
+                else:
+                    found = await collection.count_documents({"id": entry_id}, limit=1)
+                if not found:
+                    raise EntryNotFound()
+
+            return await self._edit_entries(section, expected_version, update)
+
+        document = await self._edit(
+            {f"{section}.id": entry_id},
+            {"$set": {f"{section}.$[entry].{field}": value for field, value in fields.items()}},
+            expected_version,
+            array_filters=[{"entry.id": entry_id}]
+        )
+        if document is None:
+            await self._explain_failed_edit(section, entry_id, expected_version, must_exist=True)
+        return document
+
+    async def delete_entry(self, section: str, entry_id: int, expected_version: Optional[int] = None) -> dict:
+        """Remove one entry with $pull"""
+        if self.normalized:
+            async def delete(collection):
+                result = await collection.delete_one({"id": entry_id})
+                if not result.deleted_count:
+                    raise EntryNotFound()
+
+            return await self._edit_entries(section, expected_version, delete)
+
+        document = await self._edit({f"{section}.id": entry_id}, {"$pull": {section: {"id": entry_id}}}, expected_version)
+        if document is None:
+            await self._explain_failed_edit(section, entry_id, expected_version, must_exist=True)
+        return document
+
+    async def reorder_entries(self, section: str, ids: List[int], expected_version: Optional[int] = None) -> dict:
+        """Reorder a section's entries
+
+        MongoDB cannot move array elements in place, so the array is rewritten,
+        guarded by the version it was read at. In the normalized layout only
+        the positions of entries that moved are rewritten.
+        """
+        if self.normalized:
+            async def reorder(collection):
+                current = await collection.find({}, {"_id": 0, "id": 1, "position": 1}).to_list(None)
+                positions = {entry["id"]: entry["position"] for entry in current}
+                if len(ids) != len(set(ids)) or set(ids) != set(positions):
+                    raise EntryConflict()
+                moves = [UpdateOne({"id": i}, {"$set": {"position": n}}) for n, i in enumerate(ids) if positions[i] != n]
+                if moves:
+                    await collection.bulk_write(moves, ordered=False)
+
+            return await self._edit_entries(section, expected_version, reorder)
+
+        current = await self.collection.find_one({"id": PORTFOLIO_ID}, {"_id": 0, "version": 1, section: 1})
+        if not current:
+            raise PortfolioNotFound()
+        version = current.get("version", 0)
+        if expected_version is not None and version != expected_version:
+            raise VersionConflict(expected_version, version)
+        entries = {entry["id"]: entry for entry in current.get(section, [])}
+        if len(ids) != len(set(ids)) or set(ids) != set(entries) or len(entries) != len(current.get(section, [])):
+            raise EntryConflict()
+        document = await self._edit({}, {"$set": {section: [entries[i] for i in ids]}}, version)
+        if document is None:
+            current = await self.collection.find_one({"id": PORTFOLIO_ID}, {"version": 1})
+            raise VersionConflict(version, current.get("version", 0) if current else 0)
+        return document
+
+    async def query_projects(self, categories, technologies, match: str, after: int, limit: Optional[int]) -> Tuple[List[dict], Optional[int]]:
+        """Filter and page the projects collection on its (key, position) indexes"""
+        query = project_filter(categories, technologies, match)
+        if after >= 0:
+            query["position"] = {"$gt": after}
+        cursor = self.entry_collections["projects"].find(query, ENTRY_PROJECTION).sort("position", 1)
+        if limit:
+            cursor = cursor.limit(limit + 1)
+        documents = await cursor.to_list(None)
+        more = limit is not None and len(documents) > limit
+        documents = documents[:limit] if limit else documents
+        return documents, documents[-1]["position"] if more else None
+
+class MongoContactRepository(ContactRepository):
+    def __init__(self, db):
+        self.collection = db.contact_messages
+
+    async def insert(self, document: dict):
+        await self.collection.insert_one({"_id": document["id"], **document})
+
+    async def insert_many(self, documents: List[dict]):
+        """Unordered insert keyed by message id, so a retried batch stores each message once"""
+        try:
+            await self.collection.insert_many([{"_id": document["id"], **document} for document in documents], ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys are messages an earlier attempt already stored
+            if e.details.get("writeConcernErrors") or any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+
+    async def page(self, limit: int, cursor: Optional[str] = None, read: Optional[bool] = None) -> List[dict]:
+        """Keyset page on (created_at, id), served by the contact message indexes"""
+        query = {}
+        if read is not None:
+            query["read"] = read
+        if cursor:
+            query.update(keyset_filter("created_at", cursor))
+        return await self.collection.find(query, {"_id": 0}).sort(keyset_sort("created_at")).limit(limit).to_list(limit)
+
+    def scan(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        read: Optional[bool] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        query = {}
+        if read is not None:
+            query["read"] = read
+        if since or until:
+            query["created_at"] = {}
+            if since:
+                query["created_at"]["$gte"] = since
+            if until:
+                query["created_at"]["$lt"] = until
+        # Walks the (created_at, id) indexes backwards; no in-memory sort
+        return self.collection.find(query, {"_id": 0}).sort([("created_at", 1), ("id", 1)]).batch_size(batch_size)
+
+class MongoStatusRepository(StatusRepository):
+    def __init__(self, db):
+        self.collection = db.status_checks
+
+    async def insert(self, document: dict):
+        await self.collection.insert_one(dict(document))
+
+    @staticmethod
+    def _query(since: Optional[datetime], until: Optional[datetime], cursor: Optional[str]) -> dict:
+        query = {}
+        if since or until:
+            query["timestamp"] = {}
+            if since:
+                query["timestamp"]["$gte"] = since
+            if until:
+                query["timestamp"]["$lt"] = until
+        if cursor:
+            query.update(keyset_filter("timestamp", cursor))
+        return query
+
+    async def page(self, limit: int, cursor: Optional[str] = None, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        return await self.collection.find(self._query(since, until, cursor), {"_id": 0}) \
+            .sort(keyset_sort("timestamp")).limit(limit).to_list(limit)
+
+    def scan(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[dict]:
+        documents = self.collection.find(self._query(since, until, cursor), {"_id": 0}) \
+            .sort(keyset_sort("timestamp")).batch_size(batch_size)
+        if limit:
+            documents = documents.limit(limit)
+        return documents
+
+class MongoViewRepository(ViewRepository):
+    """One document per bucket, {granularity, start, counts: {counter: count}}"""
+
+    def __init__(self, db):
+        self.collection = db.view_counts
+
+    async def add(self, increments: List[Tuple[str, datetime, Dict[str, int]]]):
+        # One round trip for every bucket; upserts on the unique (granularity,
+        # start) index are retried by the server if two workers create a bucket at once
+        operations = [
+            UpdateOne(
+                {"granularity": granularity, "start": start},
+                {"$inc": {f"counts.{counter}": count for counter, count in counts.items()}},
+                upsert=True
+            )
+            for granularity, start, counts in increments
+        ]
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    async def buckets(self, granularity: str, since: datetime, until: datetime) -> List[dict]:
+        query = {"granularity": granularity, "start": {"$gte": naive_utc(since), "$lt": naive_utc(until)}}
+        return await self.collection.find(query, {"_id": 0}).sort("start", 1).to_list(None)
+
+class MongoRepositories(Repositories):
+    """Repositories on one Motor database"""
+
+    name = "mongo"
+
+    def __init__(self, db, layout: Optional[str] = None, owns_client: bool = False):
+        super().__init__(
+            MongoPortfolioRepository(db, layout),
+            MongoContactRepository(db),
+            MongoStatusRepository(db),
+            MongoViewRepository(db)
+        )
+        self.db = db
+        self.owns_client = owns_client
+
+    async def ping(self):
+        await self.db.command("ping")
+
+    async def connect(self, connections: int):
+        """Concurrent pings, each checking out its own connection, grow the pool"""
+        await asyncio.gather(*(self.ping() for _ in range(max(connections, 1))))
+
+    def pool_stats(self) -> Optional[dict]:
+        if not self.owns_client:
+            return None
+        options = get_client_options()
+        return {"max_size": options["maxPoolSize"], "min_size": options["minPoolSize"], **pool_monitor.stats()}
+
+    async def prepare(self):
+        """Apply the index registry and warn about drift or a layout mismatch"""
+        await apply_indexes(self.db)
+        await self.portfolio.upgrade_legacy_portfolio()
+        for collection, drift in (await index_report(self.db)).items():
+            if drift["missing"] or drift["extra"]:
+                logger.warning(f"Index drift on {collection}: missing={drift['missing']} extra={drift['extra']}")
+        stored = await self.db.portfolio.find_one({"id": PORTFOLIO_ID}, {"_id": 0, "layout": 1})
+        layout = self.portfolio.layout
+        if stored and stored.get("layout", "embedded") != layout:
+            logger.warning(
+                f"Portfolio is stored in the {stored.get('layout', 'embedded')} layout but "
+                f"PORTFOLIO_STORAGE_LAYOUT is {layout}; run python -m database.migrate_layout --to {layout}"
+            )
+
+    async def close(self):
+        if self.owns_client:
+            close_client()
@@ -0,0 +1,397 @@
+from models.portfolio import PORTFOLIO_ID
+from repositories.base import ContactRepository, PortfolioRepository, Repositories, StatusRepository, ViewRepository, naive_utc, utc_now
+from services.errors import PortfolioNotFound, EntryNotFound, EntryConflict, VersionConflict
+from services.pagination import decode_cursor, encode_cursor
+from services.portfolio_cache import SECTIONS
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS portfolio (
+    id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    personal TEXT NOT NULL,
+    projects TEXT NOT NULL,
+    experience TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contact_messages (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    read INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contact_created_at_id ON contact_messages (created_at, id);
+CREATE INDEX IF NOT EXISTS contact_read_created_at_id ON contact_messages (read, created_at, id);
+CREATE TABLE IF NOT EXISTS status_checks (
+    id TEXT PRIMARY KEY,
+    client_name TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS status_timestamp_id ON status_checks (timestamp, id);
+CREATE TABLE IF NOT EXISTS view_counts (
+    granularity TEXT NOT NULL,
+    start TEXT NOT NULL,
+    counter TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (granularity, start, counter)
+);
+"""
+
+def _time(value: datetime) -> str:
+    # Fixed width, so text order is time order
+    return naive_utc(value).isoformat(timespec="microseconds")
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=_json_default, separators=(",", ":"))
+
+class SQLiteDatabase:
+    """One SQLite connection in WAL mode, used from a single worker thread
+
+    Calls are queued on the thread, so the event loop never blocks on disk.
+    WAL lets other processes read while one writes; writes take the lock up
+    front with BEGIN IMMEDIATE so read-modify-write cycles are atomic across
+    processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self.connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=5000")
+            self.connection = connection
+        return self.connection
+
+    async def run(self, function, *args):
+        """Run function(connection, *args) on the database thread"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, lambda: function(self._connect(), *args)
+        )
+
+    async def transaction(self, function, *args):
+        """Run function(connection, *args) inside a write transaction"""
+        def wrapped(connection):
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = function(connection, *args)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+        return await self.run(wrapped)
+
+    async def close(self):
+        def close_connection():
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+        # On the database thread, after queued calls, without blocking the event loop
+        await asyncio.get_running_loop().run_in_executor(self.executor, close_connection)
+        self.executor.shutdown(wait=False)
+
+def _read_portfolio(connection, sections) -> Optional[dict]:
+    sections = [section for section in SECTIONS if section in sections]
+    row = connection.execute(
+        f"SELECT {', '.join(['id', 'version', 'updated_at', *sections])} FROM portfolio WHERE id = ?", (PORTFOLIO_ID,)
+    ).fetchone()
+    if row is None:
+        return None
+    document = {"id": row["id"], "version": row["version"], "updated_at": datetime.fromisoformat(row["updated_at"])}
+    for section in sections:
+        document[section] = json.loads(row[section])
+    return document
+
+class SQLitePortfolioRepository(PortfolioRepository):
+    """The portfolio as one row under the fixed id, each section a JSON column"""
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def read(self, sections: Iterable[str]) -> Optional[dict]:
+        return await self.database.run(_read_portfolio, tuple(sections))
+
+    @staticmethod
+    def _row(document: dict) -> tuple:
+        return (
+            document["id"], document.get("version", 0), _time(document["updated_at"]),
+            _dumps(document["personal"]), _dumps(document["projects"]), _dumps(document["experience"])
+        )
+
+    async def create(self, document: dict) -> bool:
+        def insert(connection):
+            if connection.execute("SELECT 1 FROM portfolio WHERE id = ?", (PORTFOLIO_ID,)).fetchone():
+                return False
+            connection.execute("INSERT INTO portfolio VALUES (?, ?, ?, ?, ?, ?)", self._row(document))
+            return True
+        return await self.database.transaction(insert)
+
+    async def replace(self, document: dict, expected_version: int):
+        def store(connection):
+            current = connection.execute("SELECT version FROM portfolio WHERE id = ?", (document["id"],)).fetchone()
+            if current and current["version"] != expected_version:
+                raise VersionConflict(expected_version, current["version"])
+            connection.execute("INSERT OR REPLACE INTO portfolio VALUES (?, ?, ?, ?, ?, ?)", self._row(document))
+        await self.database.transaction(store)
+
+    async def _edit(self, section: str, expected_version: Optional[int], change) -> dict:
+        """Read a section, let change() rewrite its entries, and store it with the next version"""
+        if section not in SECTIONS:
+            raise KeyError(section)
+
+        def edit(connection):
+            row = connection.execute(f"SELECT version, {section} FROM portfolio WHERE id = ?", (PORTFOLIO_ID,)).fetchone()
+            if row is None:
+                raise PortfolioNotFound()
+            if expected_version is not None and row["version"] != expected_version:
+                raise VersionConflict(expected_version, row["version"])
+            entries = change(json.loads(row[section]))
+            connection.execute(
+                f"UPDATE portfolio SET {section} = ?, version = version + 1, updated_at = ? WHERE id = ?",
+                (_dumps(entries), _time(utc_now()), PORTFOLIO_ID)
+            )
+            return _read_portfolio(connection, SECTIONS)
+        return await self.database.transaction(edit)
+
+    async def add_entry(self, section: str, entry: dict, expected_version: Optional[int] = None) -> dict:
+        def change(entries):
+            if any(existing["id"] == entry["id"] for existing in entries):
+                raise EntryConflict()
+            return entries + [entry]
+        return await self._edit(section, expected_version, change)
+
+    async def update_entry(self, section: str, entry_id: int, fields: dict, expected_version: Optional[int] = None) -> dict:
+        def change(entries):
+            if not any(entry["id"] == entry_id for entry in entries):
+                raise EntryNotFound()
+            return [{**entry, **fields} if entry["id"] == entry_id else entry for entry in entries]
+        return await self._edit(section, expected_version, change)
+
+    async def delete_entry(self, section: str, entry_id: int, expected_version: Optional[int] = None) -> dict:
+        def change(entries):
+            remaining = [entry for entry in entries if entry["id"] != entry_id]
+            if len(remaining) == len(entries):
+                raise EntryNotFound()
+            return remaining
+        return await self._edit(section, expected_version, change)
+
+    async def reorder_entries(self, section: str, ids: List[int], expected_version: Optional[int] = None) -> dict:
+        def change(entries):
+            by_id = {entry["id"]: entry for entry in entries}
+            if len(ids) != len(set(ids)) or set(ids) != set(by_id) or len(by_id) != len(entries):
+                raise EntryConflict()
+            return [by_id[i] for i in ids]
+        return await self._edit(section, expected_version, change)
+
+def _keyset(column: str, cursor: Optional[str], newest_first: bool = True) -> tuple:
+    """SQL condition and parameters for the rows after a cursor in keyset order"""
+    if not cursor:
+        return None, ()
+    timestamp, item_id = decode_cursor(cursor)
+    return f"({column}, id) {'<' if newest_first else '>'} (?, ?)", (_time(timestamp), item_id)
+
+def _where(conditions: list) -> str:
+    conditions = [condition for condition in conditions if condition]
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+def _contact(row) -> dict:
+    return {
+        "id": row["id"], "name": row["name"], "email": row["email"], "message": row["message"],
+        "created_at": datetime.fromisoformat(row["created_at"]), "read": bool(row["read"]),
+    }
+
+def _status(row) -> dict:
+    return {"id": row["id"], "client_name": row["client_name"], "timestamp": datetime.fromisoformat(row["timestamp"])}
+
+class SQLiteContactRepository(ContactRepository):
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    @staticmethod
+    def _row(document: dict) -> tuple:
+        return (
+            document["id"], document["name"], document["email"], document["message"],
+            _time(document["created_at"]), int(document.get("read", False))
+        )
+
+    async def insert(self, document: dict):
+        await self.database.run(lambda connection: connection.execute(
+            "INSERT INTO contact_messages VALUES (?, ?, ?, ?, ?, ?)", self._row(document)
+        ))
+
+    async def insert_many(self, documents: List[dict]):
+        rows = [self._row(document) for document in documents]
+        # Like an unordered insert_many: a duplicate id skips that row only
+        await self.database.transaction(lambda connection: connection.executemany(
+            "INSERT OR IGNORE INTO contact_messages VALUES (?, ?, ?, ?, ?, ?)", rows
+        ))
+
+    async def page(self, limit: int, cursor: Optional[str] = None, read: Optional[bool] = None) -> List[dict]:
+        after, params = _keyset("created_at", cursor)
+        conditions = [after]
+        if read is not None:
+            conditions.append("read = ?")
+            params += (int(read),)
+        sql = f"SELECT * FROM contact_messages {_where(conditions)} ORDER BY created_at DESC, id DESC LIMIT ?"
+        rows = await self.database.run(lambda connection: connection.execute(sql, params + (limit,)).fetchall())
+        return [_contact(row) for row in rows]
+
+    async def scan(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        read: Optional[bool] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        conditions, params = [], ()
+        if read is not None:
+            conditions.append("read = ?")
+            params += (int(read),)
+        if since:
+            conditions.append("created_at >= ?")
+            params += (_time(since),)
+        if until:
+            conditions.append("created_at < ?")
+            params += (_time(until),)
+        last = None
+        while True:
+            page_conditions, page_params = list(conditions), params
+            if last:
+                page_conditions.append("(created_at, id) > (?, ?)")
+                page_params += last
+            sql = f"SELECT * FROM contact_messages {_where(page_conditions)} ORDER BY created_at, id LIMIT ?"
+            rows = await self.database.run(lambda connection: connection.execute(sql, page_params + (batch_size,)).fetchall())
+            for row in rows:
+                yield _contact(row)
+            if len(rows) < batch_size:
+                return
+            last = (rows[-1]["created_at"], rows[-1]["id"])
+
+class SQLiteStatusRepository(StatusRepository):
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def insert(self, document: dict):
+        await self.database.run(lambda connection: connection.execute(
+            "INSERT INTO status_checks VALUES (?, ?, ?)",
+            (document["id"], document["client_name"], _time(document["timestamp"]))
+        ))
+
+    @staticmethod
+    def _conditions(since: Optional[datetime], until: Optional[datetime]) -> tuple:
+        conditions, params = [], ()
+        if since:
+            conditions.append("timestamp >= ?")
+            params += (_time(since),)
+        if until:
+            conditions.append("timestamp < ?")
+            params += (_time(until),)
+        return conditions, params
+
+    async def page(self, limit: int, cursor: Optional[str] = None, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[dict]:
+        conditions, params = self._conditions(since, until)
+        after, after_params = _keyset("timestamp", cursor)
+        sql = f"SELECT * FROM status_checks {_where(conditions + [after])} ORDER BY timestamp DESC, id DESC LIMIT ?"
+        rows = await self.database.run(lambda connection: connection.execute(sql, params + after_params + (limit,)).fetchall())
+        return [_status(row) for row in rows]
+
+    async def scan(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[dict]:
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            page = await self.page(size, cursor, since, until)
+            for document in page:
+                yield document
+            if len(page) < size:
+                return
+            if remaining is not None:
+                remaining -= len(page)
+            last = page[-1]
+            cursor = encode_cursor(last["timestamp"], last["id"])
+
+class SQLiteViewRepository(ViewRepository):
+    """One row per bucket and counter, added to with upserts"""
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def add(self, increments: List[Tuple[str, datetime, Dict[str, int]]]):
+        rows = [
+            (granularity, _time(start), counter, count)
+            for granularity, start, counts in increments
+            for counter, count in counts.items()
+        ]
+        await self.database.transaction(lambda connection: connection.executemany(
+            "INSERT INTO view_counts VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (granularity, start, counter) DO UPDATE SET count = count + excluded.count",
+            rows
+        ))
+
+    async def buckets(self, granularity: str, since: datetime, until: datetime) -> List[dict]:
+        rows = await self.database.run(lambda connection: connection.execute(
+            "SELECT start, counter, count FROM view_counts WHERE granularity = ? AND start >= ? AND start < ? ORDER BY start",
+            (granularity, _time(since), _time(until))
+        ).fetchall())
+        buckets = {}
+        for row in rows:
+            bucket = buckets.get(row["start"])
+            if bucket is None:
+                bucket = buckets[row["start"]] = {
+                    "granularity": granularity, "start": datetime.fromisoformat(row["start"]), "counts": {}
+                }
+            bucket["counts"][row["counter"]] = row["count"]
+        return list(buckets.values())
+
+class SQLiteRepositories(Repositories):
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.database = SQLiteDatabase(path)
+        super().__init__(
+            SQLitePortfolioRepository(self.database),
+            SQLiteContactRepository(self.database),
+            SQLiteStatusRepository(self.database),
+            SQLiteViewRepository(self.database)
+        )
+
+    async def ping(self):
+        await self.database.run(lambda connection: connection.execute("SELECT 1").fetchone())
+
+    def pool_stats(self) -> Optional[dict]:
+        # One connection, used from one thread
+        return {"max_size": 1, "open": int(self.database.connection is not None)}
+
+    async def prepare(self):
+        await self.database.run(lambda connection: connection.executescript(SCHEMA))
+        logger.info(f"SQLite schema ensured at {self.database.path}")
+
+    async def close(self):
+        await self.database.close()
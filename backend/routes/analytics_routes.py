@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from datetime import datetime, timedelta
+from typing import Optional
+from models.analytics import ViewEvent, ViewReport
+from repositories.base import naive_utc, utc_now
+from routes.portfolio_routes import get_portfolio_service
+from services.portfolio_service import PortfolioService
+from services.view_counter import bucket_start
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+# Period reported when no `since` is given
+DEFAULT_PERIOD = {"hour": timedelta(hours=48), "day": timedelta(days=30)}
+
+@router.get("/views", response_model=ViewReport)
+async def get_views(
+    granularity: str = Query("day", pattern="^(hour|day)$", description="Bucket size"),
+    since: Optional[datetime] = Query(None, description="Start of the period (default: 48 hours or 30 days ago)"),
+    until: Optional[datetime] = Query(None, description="End of the period (default: now)"),
+    service: PortfolioService = Depends(get_portfolio_service)
+):
+    """View counts per section and project, per hourly or daily bucket
+
+    Counts are written in batches, so the newest views can take up to the
+    flush interval (VIEW_FLUSH_INTERVAL seconds) to appear.
+    """
+    until = naive_utc(until) if until else utc_now()
+    since = naive_utc(since) if since else bucket_start(granularity, until - DEFAULT_PERIOD[granularity])
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    try:
+        return await service.views.report(granularity, since, until)
+    except Exception as e:
+        logger.error(f"Error in get_views: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/views", status_code=202)
+async def record_view(event: ViewEvent, service: PortfolioService = Depends(get_portfolio_service)):
+    """Count a view of one project, reported by the client"""
+    try:
+        snapshot = await service.get_snapshot(("projects",))
+    except Exception as e:
+        logger.error(f"Error in record_view: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    # Only known projects are counted, so clients cannot create counters at will
+    if not snapshot or not any(project.id == event.project_id for project in snapshot.projects):
+        raise HTTPException(status_code=404, detail="Project not found")
+    service.views.record_project(event.project_id)
+    return Response(status_code=202)
@@ -1,43 +1,72 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from models.portfolio import Portfolio, Project, Experience, ContactMessage, ContactMessageCreate
+from datetime import datetime
+from models.portfolio import (
+    Portfolio, Project, Experience, ContactMessage, ContactMessageCreate, SearchResult,
+    ProjectUpdate, ExperienceUpdate, EntryOrder, BatchResponse
+)
 from services.portfolio_service import PortfolioService
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from services.contact_buffer import ContactBufferFull
+from services.errors import PortfolioNotFound, EntryNotFound, EntryConflict, InvalidCursor, VersionConflict
+from services.export import export_contact_messages as export_contact_stream
+from services.fieldsets import parse_fields
+from routes.responses import json_bytes_response, cached_json_response
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
 
-# Database dependency
-async def get_portfolio_service():
-    mongo_url = os.environ['MONGO_URL']
-    client = AsyncIOMotorClient(mongo_url)
-    db = client[os.environ['DB_NAME']]
-    return PortfolioService(db)
+# Service dependency: the process-wide service is created in the app lifespan
+async def get_portfolio_service(request: Request) -> PortfolioService:
+    return request.app.state.portfolio_service
 
 @router.get("/", response_model=Portfolio)
-async def get_portfolio(service: PortfolioService = Depends(get_portfolio_service)):
-    """Get complete portfolio data"""
+async def get_portfolio(
+    request: Request,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. projects.title,projects.category,personal.name; every field when omitted"
+    ),
+    service: PortfolioService = Depends(get_portfolio_service)
+):
+    """Get complete portfolio data, or only some of its fields"""
     try:
-        portfolio = await service.get_portfolio()
-        if not portfolio:
-            # Initialize with seed data if no portfolio exists
-            portfolio = await service.initialize_portfolio()
-        return portfolio
+        if fields is not None:
+            try:
+                fieldset = parse_fields(fields)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            snapshot, body = await service.get_portfolio_fields(fieldset)
+            if not snapshot:
+                await service.initialize_snapshot()
+                snapshot, body = await service.get_portfolio_fields(fieldset)
+        else:
+            snapshot = await service.get_snapshot()
+            if not snapshot:
+                # Initialize with seed data if no portfolio exists
+                snapshot = await service.initialize_snapshot()
+            body = snapshot.section_json("portfolio")
+        response = cached_json_response(request, snapshot, body)
+        service.views.record_section("portfolio")
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_portfolio: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/personal")
-async def get_personal_info(service: PortfolioService = Depends(get_portfolio_service)):
+async def get_personal_info(request: Request, service: PortfolioService = Depends(get_portfolio_service)):
     """Get personal information"""
     try:
-        personal_info = await service.get_personal_info()
-        if not personal_info:
+        snapshot = await service.get_snapshot(("personal",))
+        if not snapshot:
             raise HTTPException(status_code=404, detail="Personal information not found")
-        return personal_info
+        response = cached_json_response(request, snapshot, snapshot.section_json("personal"))
+        service.views.record_section("personal")
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -46,27 +75,207 @@ async def get_personal_info(service: PortfolioService = Depends(get_portfolio_se
 
 @router.get("/projects", response_model=List[Project])
 async def get_projects(
-    category: Optional[str] = Query(None, description="Filter projects by category"),
+    request: Request,
+    category: Optional[List[str]] = Query(None, description="Filter projects by category; repeat to match any of several"),
+    technology: Optional[List[str]] = Query(None, description="Filter projects by technology; repeat for several"),
+    match: str = Query("any", pattern="^(any|all)$", description="Whether projects need any or all of the technologies"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; every matching project when omitted"),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
     service: PortfolioService = Depends(get_portfolio_service)
 ):
-    """Get projects with optional category filtering"""
+    """Get projects with optional category and technology filtering
+
+    When a limit is given and more projects match, the X-Next-Cursor response
+    header holds the cursor for the next page.
+    """
     try:
-        projects = await service.get_projects(category)
-        return projects
+        snapshot, body, next_cursor = await service.get_projects_page(category, technology, match, limit, cursor)
+        if not snapshot:
+            response = json_bytes_response(body)
+        else:
+            response = cached_json_response(request, snapshot, body)
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+        if not cursor:
+            # Later pages are the same view scrolled further
+            service.views.record_section("projects")
+        return response
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error(f"Error in get_projects: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/experience", response_model=List[Experience])
-async def get_experience(service: PortfolioService = Depends(get_portfolio_service)):
+async def get_experience(request: Request, service: PortfolioService = Depends(get_portfolio_service)):
     """Get work experience"""
     try:
-        experience = await service.get_experience()
-        return experience
+        snapshot = await service.get_snapshot(("experience",))
+        if not snapshot:
+            return json_bytes_response(b"[]")
+        response = cached_json_response(request, snapshot, snapshot.section_json("experience"))
+        service.views.record_section("experience")
+        return response
     except Exception as e:
         logger.error(f"Error in get_experience: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Most sections a batch can ask for; each name is one result
+MAX_BATCH_SECTIONS = 10
+
+@router.get("/batch", response_model=BatchResponse)
+async def get_batch(
+    request: Request,
+    section: List[str] = Query(..., description="Section to include (portfolio, personal, projects or experience); repeat for several"),
+    category: Optional[List[str]] = Query(None, description="Filter the projects result by category; repeat to match any of several"),
+    technology: Optional[List[str]] = Query(None, description="Filter the projects result by technology; repeat for several"),
+    match: str = Query("any", pattern="^(any|all)$", description="Whether projects need any or all of the technologies"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size for the projects result"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous projects result"),
+    service: PortfolioService = Depends(get_portfolio_service)
+):
+    """Several sections in one response, all read at the same portfolio version
+
+    Each result has its own status, so an unknown section or a bad cursor
+    fails only its own result. The response supports the same conditional
+    requests and compression as the single-section endpoints.
+    """
+    if len(section) > MAX_BATCH_SECTIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SECTIONS} sections per batch")
+    try:
+        snapshot, body = await service.get_batch(section, category, technology, match, limit, cursor)
+        if not snapshot:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        response = cached_json_response(request, snapshot, body)
+        for name in set(section):
+            if name in ("portfolio", "personal", "projects", "experience") and not (name == "projects" and cursor):
+                service.views.record_section(name)
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_batch: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+def edit_error(error: Exception) -> HTTPException:
+    """Map a failed partial update to its HTTP error"""
+    if isinstance(error, VersionConflict):
+        return HTTPException(
+            status_code=409,
+            detail={"message": "Portfolio was modified by another request", "current_version": error.current},
+            headers={"X-Portfolio-Version": str(error.current)}
+        )
+    if isinstance(error, EntryConflict):
+        return HTTPException(status_code=409, detail="Entry ids conflict with the current portfolio")
+    if isinstance(error, EntryNotFound):
+        return HTTPException(status_code=404, detail="Entry not found")
+    if isinstance(error, PortfolioNotFound):
+        return HTTPException(status_code=404, detail="Portfolio not found")
+    logger.error(f"Error editing portfolio: {error}")
+    return HTTPException(status_code=500, detail="Internal server error")
+
+def entry_response(snapshot, section: str, entry_id: int, status_code: int = 200) -> Response:
+    entry = next(e for e in snapshot.sections[section] if e.id == entry_id)
+    return Response(
+        content=entry.model_dump_json(),
+        status_code=status_code,
+        media_type="application/json",
+        headers={"X-Portfolio-Version": str(snapshot.version)}
+    )
+
+EXPECTED_VERSION = Query(None, ge=0, description="Fail with 409 unless the portfolio is still at this version")
+
+@router.post("/projects", response_model=Project, status_code=201)
+async def add_project(project: Project, expected_version: Optional[int] = EXPECTED_VERSION, service: PortfolioService = Depends(get_portfolio_service)):
+    """Add a project"""
+    try:
+        snapshot = await service.add_entry("projects", project, expected_version)
+        return entry_response(snapshot, "projects", project.id, 201)
+    except Exception as e:
+        raise edit_error(e)
+
+@router.put("/projects/order", response_model=List[Project])
+async def reorder_projects(order: EntryOrder, expected_version: Optional[int] = EXPECTED_VERSION, service: PortfolioService = Depends(get_portfolio_service)):
+    """Reorder projects; ids must list every project exactly once"""
+    try:
+        snapshot = await service.reorder_entries("projects", order.ids, expected_version)
+        return json_bytes_response(snapshot.section_json("projects"), {"X-Portfolio-Version": str(snapshot.version)})
+    except Exception as e:
+        raise edit_error(e)
+
+@router.patch("/projects/{project_id}", response_model=Project)
+async def update_project(project_id: int, changes: ProjectUpdate, expected_version: Optional[int] = EXPECTED_VERSION, service: PortfolioService = Depends(get_portfolio_service)):
+    """Update some fields of a project"""
+    try:
+        snapshot = await service.update_entry("projects", project_id, changes, expected_version)
+        return entry_response(snapshot, "projects", project_id)
+    except Exception as e:
+        raise edit_error(e)
+
+@router.delete("/projects/{project_id}", status_code=204)
+async def delete_project(project_id: int, expected_version: Optional[int] = EXPECTED_VERSION, service: PortfolioService = Depends(get_portfolio_service)):
+    """Delete a project"""
+    try:
+        snapshot = await service.delete_entry("projects", project_id, expected_version)
+        return Response(status_code=204, headers={"X-Portfolio-Version": str(snapshot.version)})
+    except Exception as e:
+        raise edit_error(e)
+
+@router.post("/experience", response_model=Experience, status_code=201)
+async def add_experience(experience: Experience, expected_version: Optional[int] = EXPECTED_VERSION, service: PortfolioService = Depends(get_portfolio_service)):
+    """Add an experience entry"""
+    try:
+        snapshot = await service.add_entry("experience", experience, expected_version)
+        return entry_response(snapshot, "experience", experience.id, 201)
+    except Exception as e:
+        raise edit_error(e)
+
+@router.put("/experience/order", response_model=List[Experience])
+async def reorder_experience(order: EntryOrder, expected_version: Optional[int] = EXPECTED_VERSION, service: PortfolioService = Depends(get_portfolio_service)):
+    """Reorder experience entries; ids must list every entry exactly once"""
+    try:
+        snapshot = await service.reorder_entries("experience", order.ids, expected_version)
+        return json_bytes_response(snapshot.section_json("experience"), {"X-Portfolio-Version": str(snapshot.version)})
+    except Exception as e:
+        raise edit_error(e)
+
+@router.patch("/experience/{experience_id}", response_model=Experience)
+async def update_experience(experience_id: int, changes: ExperienceUpdate, expected_version: Optional[int] = EXPECTED_VERSION, service: PortfolioService = Depends(get_portfolio_service)):
+    """Update some fields of an experience entry"""
+    try:
+        snapshot = await service.update_entry("experience", experience_id, changes, expected_version)
+        return entry_response(snapshot, "experience", experience_id)
+    except Exception as e:
+        raise edit_error(e)
+
+@router.delete("/experience/{experience_id}", status_code=204)
+async def delete_experience(experience_id: int, expected_version: Optional[int] = EXPECTED_VERSION, service: PortfolioService = Depends(get_portfolio_service)):
+    """Delete an experience entry"""
+    try:
+        snapshot = await service.delete_entry("experience", experience_id, expected_version)
+        return Response(status_code=204, headers={"X-Portfolio-Version": str(snapshot.version)})
+    except Exception as e:
+        raise edit_error(e)
+
+@router.get("/search", response_model=List[SearchResult])
+async def search_portfolio(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    kind: Optional[str] = Query(None, alias="type", pattern="^(project|experience)$", description="Restrict results to one entry type"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    service: PortfolioService = Depends(get_portfolio_service)
+):
+    """Search projects and experience by title, description, technologies, company and category"""
+    try:
+        return await service.search(q, limit, kind)
+    except Exception as e:
+        logger.error(f"Error in search_portfolio: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.get("/cache/stats")
+async def get_cache_stats(service: PortfolioService = Depends(get_portfolio_service)):
+    """Get portfolio snapshot cache counters"""
+    return service.cache_stats()
+
 @router.post("/contact", response_model=ContactMessage)
 async def create_contact_message(
     message_data: ContactMessageCreate,
@@ -76,19 +285,49 @@ async def create_contact_message(
     try:
         contact_message = await service.create_contact_message(message_data)
         return contact_message
+    except ContactBufferFull:
+        raise HTTPException(status_code=503, detail="Too many messages, please retry shortly", headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Error in create_contact_message: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/contact/export")
+async def export_contact_messages(
+    output: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="Export format"),
+    since: Optional[datetime] = Query(None, description="Only messages created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only messages created before this time"),
+    read: Optional[bool] = Query(None, description="Only export read (true) or unread (false) messages"),
+    service: PortfolioService = Depends(get_portfolio_service)
+):
+    """Stream every matching contact message, oldest first (admin only in production)"""
+    documents = service.iter_contact_messages(since, until, read)
+    media_type = "text/csv; charset=utf-8" if output == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_contact_stream(documents, output),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="contact_messages.{output}"'}
+    )
+
 @router.get("/contact", response_model=List[ContactMessage])
 async def get_contact_messages(
+    response: Response,
     limit: int = Query(50, ge=1, le=100, description="Limit number of messages"),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    read: Optional[bool] = Query(None, description="Only return read (true) or unread (false) messages"),
     service: PortfolioService = Depends(get_portfolio_service)
 ):
-    """Get contact messages (admin only in production)"""
+    """Get contact messages, newest first (admin only in production)
+
+    When more messages exist, the X-Next-Cursor response header holds the
+    cursor for the next page.
+    """
     try:
-        messages = await service.get_contact_messages(limit)
+        messages, next_cursor = await service.get_contact_messages_page(limit, cursor, read)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return messages
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error(f"Error in get_contact_messages: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
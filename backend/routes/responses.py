@@ -0,0 +1,79 @@
+from fastapi import Request, Response
+from services.portfolio_cache import PortfolioSnapshot
+from services.compression import COMPRESSION_MIN_SIZE, ENCODINGS, accepted_encoding
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import os
+
+# Browsers and CDNs may reuse a response for this long before revalidating
+CACHE_CONTROL = f"public, max-age={int(os.environ.get('PORTFOLIO_HTTP_MAX_AGE', '60'))}, must-revalidate"
+
+def json_bytes_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    """Send pre-encoded JSON as-is, bypassing response_model validation and encoding"""
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _without_coding(tag: str) -> str:
+    """Entity tag of the uncompressed body a (possibly compressed) representation's tag belongs to"""
+    for encoding in ENCODINGS:
+        suffix = f'-{encoding}"'
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an entity tag
+
+    Tags of the same body under any content coding match, so a client that
+    cached the gzip representation is not sent the body again for asking
+    with other Accept-Encoding values.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    etag = _without_coding(etag)
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(_without_coding(tag.removeprefix("W/")) == etag for tag in candidates)
+
+def not_modified_since(if_modified_since: str, snapshot: PortfolioSnapshot) -> bool:
+    last_modified = snapshot.last_modified_at
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+def cached_json_response(request: Request, snapshot: PortfolioSnapshot, body: bytes) -> Response:
+    """Pre-encoded JSON with validators, or 304 when the client copy is current
+
+    Bodies of at least COMPRESSION_MIN_SIZE bytes are sent in the coding the
+    client prefers, compressed once per snapshot rather than per request.
+    """
+    encoding = None
+    if len(body) >= COMPRESSION_MIN_SIZE:
+        encoding = accepted_encoding(request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": snapshot.etag(body, encoding),
+        "Cache-Control": CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+        "X-Portfolio-Version": str(snapshot.version),
+    }
+    if snapshot.last_modified:
+        headers["Last-Modified"] = snapshot.last_modified
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and not_modified_since(if_modified_since, snapshot):
+            return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        body = snapshot.compressed(body, encoding)
+    return json_bytes_response(body, headers)
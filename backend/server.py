@@ -1,44 +1,92 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from contextlib import asynccontextmanager
 import logging
+import os
+import time
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List
-import uuid
+from typing import List, Optional
 from datetime import datetime
 
 # Import routes
 from routes.portfolio_routes import router as portfolio_router
+from routes.analytics_routes import router as analytics_router
+from repositories.factory import create_repositories
+from middleware.compression import NegotiatedGZipMiddleware
+from middleware.metrics import MetricsMiddleware
+from middleware.profiling import ProfilingMiddleware, profiling_options
+from services.compression import COMPRESSION_MIN_SIZE, GZIP_DYNAMIC_LEVEL
+from services.metrics import CONTENT_TYPE, MetricsRegistry, instrument_repositories, observe_portfolio_service
+from services.errors import InvalidCursor
+from services.portfolio_service import PortfolioService
+from services.readiness import Readiness
+from services.status_service import StatusService
+from models.status import StatusCheck, StatusCheckCreate
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Process-wide metrics served at /api/metrics; METRICS_ENABLED=false removes
+# the middleware and storage timing entirely
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() not in ("0", "false", "no")
+metrics = MetricsRegistry()
+
+# Opt-in per-request profiling (see ProfilingMiddleware); off by default
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    logger.info("Portfolio API starting up...")
+    # One storage backend (and connection pool) and one service for the whole process
+    repositories = create_repositories()
+    if METRICS_ENABLED:
+        instrument_repositories(repositories, metrics)
+    app.state.repositories = repositories
+    app.state.portfolio_service = PortfolioService(repositories)
+    app.state.status_service = StatusService(repositories)
+    if METRICS_ENABLED:
+        observe_portfolio_service(app.state.portfolio_service, metrics)
+    # Connect, create indexes and warm the portfolio before serving; retried
+    # in the background if storage is unreachable, and reported by /api/health/ready
+    app.state.readiness = Readiness(
+        repositories,
+        app.state.portfolio_service,
+        connections=int(os.environ.get("WARMUP_CONNECTIONS", "10")),
+        ping_timeout=float(os.environ.get("READINESS_PING_TIMEOUT_MS", "1000")) / 1000,
+        retry_interval=float(os.environ.get("WARMUP_RETRY_INTERVAL", "1"))
+    )
+    await app.state.readiness.start()
+    await app.state.portfolio_service.start()
+    logger.info(f"Startup completed in {(time.perf_counter() - started) * 1000:.1f}ms")
+    yield
+    await app.state.readiness.stop()
+    # Flush buffered writes before the client goes away
+    await app.state.portfolio_service.close()
+    await repositories.close()
 
 # Create the main app without a prefix
 app = FastAPI(
     title="Portfolio API",
     description="Backend API for Surabhi Pilane's Portfolio Website",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Define Models for existing endpoints
-class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    client_name: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
-
-class StatusCheckCreate(BaseModel):
-    client_name: str
+async def get_status_service(request: Request) -> StatusService:
+    return request.app.state.status_service
 
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
@@ -46,27 +94,61 @@ async def root():
     return {"message": "Portfolio API is running!", "version": "1.0.0"}
 
 @api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate):
-    status_dict = input.dict()
-    status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
-    return status_obj
+async def create_status_check(input: StatusCheckCreate, service: StatusService = Depends(get_status_service)):
+    return await service.create_status_check(input)
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
-
-# Health check endpoint
+async def get_status_checks(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (default 1000); in NDJSON mode, stop after this many"),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    since: Optional[datetime] = Query(None, description="Only checks at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only checks before this time"),
+    output: str = Query("json", alias="format", pattern="^(json|ndjson)$", description="ndjson streams every matching check"),
+    service: StatusService = Depends(get_status_service)
+):
+    """List status checks, newest first
+
+    JSON responses are pages; the X-Next-Cursor header holds the cursor for
+    the next one. NDJSON responses stream every match in constant memory.
+    """
+    try:
+        if output == "ndjson":
+            stream = service.stream_status_checks(limit, cursor, since, until)
+            return StreamingResponse(stream, media_type="application/x-ndjson")
+        checks, next_cursor = await service.get_status_checks_page(limit or 1000, cursor, since, until)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return checks
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Liveness: the process is up and serving; never touches storage, so a slow
+# database does not get healthy workers restarted
 @api_router.get("/health")
+@api_router.get("/health/live")
 async def health_check():
     return {"status": "healthy", "service": "portfolio-api"}
 
+@api_router.get("/health/ready")
+async def readiness_check(request: Request):
+    """Readiness: 200 once warmed up and while storage answers pings, 503 otherwise"""
+    ready, report = await request.app.state.readiness.report()
+    return JSONResponse(report, status_code=200 if ready else 503)
+
+@api_router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request, storage and cache metrics in the Prometheus text format"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(metrics.expose(), media_type=CONTENT_TYPE)
+
 # Include the router in the main app
 app.include_router(api_router)
 
 # Include portfolio routes
 app.include_router(portfolio_router)
+app.include_router(analytics_router)
 
 app.add_middleware(
     CORSMiddleware,
@@ -74,27 +156,17 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paged listings return the next page's cursor in a header
+    expose_headers=["X-Next-Cursor"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+# Compresses responses not already compressed by their route (snapshot
+# bodies arrive pre-compressed and pass through untouched)
+app.add_middleware(NegotiatedGZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE, compresslevel=GZIP_DYNAMIC_LEVEL)
 
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Portfolio API starting up...")
-    # Initialize database collections if needed
-    try:
-        # Test database connection
-        await db.command("ping")
-        logger.info("Database connection successful")
-    except Exception as e:
-        logger.error(f"Database connection failed: {e}")
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
-    logger.info("Database connection closed")
\ No newline at end of file
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, **profiling_options())
+
+# Added last so it is the outermost middleware and times everything inside it
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics)
@@ -0,0 +1,60 @@
+from typing import Optional
+import gzip
+import os
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Bodies smaller than this are sent uncompressed: below roughly one packet
+# the saving is lost in header overhead
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+
+# Snapshot bodies are compressed once per portfolio version, so they can
+# afford the highest levels
+GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "9"))
+ZSTD_LEVEL = int(os.environ.get("COMPRESSION_ZSTD_LEVEL", "19"))
+
+# Other responses are compressed on every request, where the top levels cost
+# far more CPU than the few bytes they save
+GZIP_DYNAMIC_LEVEL = int(os.environ.get("COMPRESSION_GZIP_DYNAMIC_LEVEL", "6"))
+
+# Supported content codings, preferred first when a client accepts several equally
+ENCODINGS = ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+def accepted_encoding(accept_encoding: Optional[str], encodings: tuple = ENCODINGS) -> Optional[str]:
+    """The content coding among `encodings` a client prefers, or None for identity
+
+    Follows the q-values of Accept-Encoding: codings with q=0 are refused,
+    "*" stands for any coding not listed, and ties go to `encodings` order.
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, parameters = item.partition(";")
+        coding = coding.strip().lower()
+        weight = 1.0
+        parameter = parameters.strip().lower()
+        if parameter.startswith("q="):
+            try:
+                weight = float(parameter[2:])
+            except ValueError:
+                weight = 0.0
+        if coding:
+            weights[coding] = weight
+    best, best_weight = None, 0.0
+    for coding in encodings:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        # mtime=0 keeps the output identical across processes and restarts
+        return gzip.compress(body, GZIP_LEVEL, mtime=0)
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    raise ValueError(f"Unsupported content coding {encoding!r}")
@@ -0,0 +1,132 @@
+from typing import Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ContactBufferFull(Exception):
+    """Raised when the write-behind queue stays full for longer than the enqueue timeout"""
+
+class ContactWriteBuffer:
+    """Write-behind buffer for contact messages
+
+    Accepted documents are queued in memory and written with insert_many once
+    `batch_size` documents are waiting or `flush_interval` seconds have passed
+    since the first one arrived. The queue is bounded: when it is full,
+    `submit()` waits up to `enqueue_timeout` seconds and then raises
+    ContactBufferFull so callers can shed load. A failed batch is retried
+    whole; repositories skip messages an earlier attempt already stored.
+    `stop()` gives up on the queue after `drain_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        repository,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        enqueue_timeout: float = 1.0,
+        max_retries: int = 3,
+        drain_timeout: float = 10.0
+    ):
+        self.repository = repository
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self.drain_timeout = drain_timeout
+        self._task: Optional[asyncio.Task] = None
+        # Set by stop() so a partial batch is written at once rather than after the interval
+        self._stopping = asyncio.Event()
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, document: dict):
+        try:
+            await asyncio.wait_for(self.queue.put(document), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ContactBufferFull("Contact message queue is full")
+        self.accepted += 1
+
+    async def _next_batch(self) -> list:
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0 or self._stopping.is_set():
+                break
+            getter = asyncio.ensure_future(self.queue.get())
+            stopping = asyncio.ensure_future(self._stopping.wait())
+            done, _ = await asyncio.wait((getter, stopping), timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            stopping.cancel()
+            if getter not in done:
+                # A cancelled get leaves its item queued
+                getter.cancel()
+                break
+            batch.append(getter.result())
+        return batch
+
+    async def _write(self, batch: list):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await self.repository.insert_many(batch)
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except Exception as e:
+                logger.error(f"Contact batch insert failed (attempt {attempt}/{self.max_retries}): {e}")
+                await asyncio.sleep(0.1 * attempt)
+        self.failed += len(batch)
+        logger.error(f"Dropped {len(batch)} contact messages after {self.max_retries} attempts")
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def stop(self):
+        """Flush everything still queued and stop the writer"""
+        if self._task is None:
+            return
+        self._stopping.set()
+        try:
+            await asyncio.wait_for(self.queue.join(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            unwritten = self.accepted - self.written - self.failed
+            self.failed += unwritten
+            logger.error(f"Dropped {unwritten} contact messages still unwritten after {self.drain_timeout}s")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info(f"Contact write buffer flushed ({self.written} written, {self.failed} failed)")
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
@@ -0,0 +1,19 @@
+class PortfolioNotFound(Exception):
+    """No portfolio document exists yet"""
+
+class EntryNotFound(Exception):
+    """The project or experience entry does not exist"""
+
+class EntryConflict(Exception):
+    """An entry with the same id already exists, or a reorder does not match the current entries"""
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that was not issued by this API, or was altered"""
+
+class VersionConflict(Exception):
+    """The portfolio changed since the version the caller based its edit on"""
+
+    def __init__(self, expected: int, current: int):
+        super().__init__(f"Portfolio is at version {current}, expected {expected}")
+        self.expected = expected
+        self.current = current
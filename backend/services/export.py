@@ -0,0 +1,66 @@
+from models.portfolio import ContactMessage
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator
+import csv
+import io
+import json
+
+# Rows are grouped into chunks of about this many bytes before being sent
+CHUNK_SIZE = 64 * 1024
+
+CONTACT_FIELDS = list(ContactMessage.model_fields)
+
+_encode_json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+def _ndjson_line(document: dict) -> str:
+    row = {field: document.get(field) for field in CONTACT_FIELDS}
+    created_at = row["created_at"]
+    if isinstance(created_at, datetime):
+        row["created_at"] = created_at.isoformat()
+    return _encode_json(row) + "\n"
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        # Visitor-supplied text must not be evaluated as a spreadsheet formula
+        return "'" + value
+    return value
+
+async def _ndjson_chunks(documents: AsyncIterable[dict]) -> AsyncIterator[bytes]:
+    buffer = []
+    size = 0
+    async for document in documents:
+        line = _ndjson_line(document)
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode()
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+async def _csv_chunks(documents: AsyncIterable[dict]) -> AsyncIterator[bytes]:
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(CONTACT_FIELDS)
+    async for document in documents:
+        writer.writerow([_csv_value(document.get(field)) for field in CONTACT_FIELDS])
+        if out.tell() >= CHUNK_SIZE:
+            yield out.getvalue().encode()
+            out.seek(0)
+            out.truncate()
+    # Also sends the header when there are no rows
+    if out.tell():
+        yield out.getvalue().encode()
+
+def export_contact_messages(documents: AsyncIterable[dict], format: str = "ndjson") -> AsyncIterator[bytes]:
+    """Encode contact message documents as NDJSON or CSV, one chunk at a time
+
+    Documents are consumed as they arrive, so memory use does not depend on
+    how many messages are exported.
+    """
+    return _csv_chunks(documents) if format == "csv" else _ndjson_chunks(documents)
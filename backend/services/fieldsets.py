@@ -0,0 +1,100 @@
+from models.portfolio import Portfolio, PersonalInfo, Project, Experience
+from services.portfolio_cache import SECTIONS
+from pydantic import BaseModel, create_model
+from typing import Dict, List, Optional, Tuple, Type
+
+# Portfolio fields whose own fields can be selected, and their models
+NESTED_MODELS = {"personal": PersonalInfo, "projects": Project, "experience": Experience}
+
+# Nested fields holding a list of models rather than one
+LIST_FIELDS = ("projects", "experience")
+
+# Always read so responses keep their ETag and Last-Modified
+METADATA_FIELDS = ("id", "updated_at", "version")
+
+# Trimmed response models kept for reuse (fieldsets come from query strings)
+TRIMMED_MODEL_CACHE_SIZE = 256
+
+# (field, None for the whole field or the selected subfields), in model order
+Fieldset = Tuple[Tuple[str, Optional[Tuple[str, ...]]], ...]
+
+def parse_fields(spec: str) -> Fieldset:
+    """Validate a `fields=` value such as "projects.title,projects.category,personal.name"
+
+    Top-level names select whole Portfolio fields and dotted names select
+    fields of personal, projects or experience entries. Fields come back in
+    model order whatever order they were asked in, so equivalent specs share
+    cached bodies. Raises ValueError listing any unknown field.
+    """
+    selected: Dict[str, Optional[set]] = {}
+    unknown = []
+    for path in spec.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        name, _, subfield = path.partition(".")
+        model = NESTED_MODELS.get(name)
+        if name not in Portfolio.model_fields or (subfield and (model is None or subfield not in model.model_fields)):
+            unknown.append(path)
+        elif not subfield:
+            selected[name] = None
+        elif selected.get(name, ()) is not None:
+            selected.setdefault(name, set()).add(subfield)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    if not selected:
+        raise ValueError("No fields selected")
+    return tuple(
+        (name, None if selected[name] is None else tuple(f for f in NESTED_MODELS[name].model_fields if f in selected[name]))
+        for name in Portfolio.model_fields if name in selected
+    )
+
+def fieldset_sections(fieldset: Fieldset) -> tuple:
+    """The sections a fieldset needs loaded"""
+    names = {name for name, _ in fieldset}
+    return tuple(section for section in SECTIONS if section in names)
+
+def include_spec(fieldset: Fieldset) -> dict:
+    """pydantic `include` argument selecting a fieldset from a Portfolio"""
+    include = {}
+    for name, subfields in fieldset:
+        if subfields is None:
+            include[name] = True
+        elif name in LIST_FIELDS:
+            include[name] = {"__all__": set(subfields)}
+        else:
+            include[name] = set(subfields)
+    return include
+
+def fieldset_projection(fieldset: Fieldset) -> dict:
+    """MongoDB projection of the portfolio document reading only a fieldset (plus metadata)"""
+    projection = {"_id": 0, **{field: 1 for field in METADATA_FIELDS}}
+    for name, subfields in fieldset:
+        if subfields is None:
+            projection[name] = 1
+        else:
+            projection.update({f"{name}.{field}": 1 for field in subfields})
+    return projection
+
+_trimmed_models: Dict[Fieldset, Type[BaseModel]] = {}
+
+def trimmed_model(fieldset: Fieldset) -> Type[BaseModel]:
+    """Response model with only the fields of a fieldset, built once per fieldset"""
+    model = _trimmed_models.get(fieldset)
+    if model is None:
+        fields = {}
+        for name, subfields in fieldset:
+            if subfields is None:
+                fields[name] = (Portfolio.model_fields[name].annotation, Portfolio.model_fields[name])
+                continue
+            nested = NESTED_MODELS[name]
+            submodel = create_model(
+                f"{nested.__name__}Fields",
+                **{field: (nested.model_fields[field].annotation, nested.model_fields[field]) for field in subfields}
+            )
+            fields[name] = (List[submodel] if name in LIST_FIELDS else submodel, ...)
+        model = create_model("PortfolioFields", **fields)
+        if len(_trimmed_models) >= TRIMMED_MODEL_CACHE_SIZE:
+            del _trimmed_models[next(iter(_trimmed_models))]
+        _trimmed_models[fieldset] = model
+    return model
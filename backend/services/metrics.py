@@ -0,0 +1,252 @@
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+import inspect
+import math
+import time
+
+# Histogram bucket upper bounds in seconds, finer than the Prometheus defaults
+# because most requests here are served from memory in well under 5ms
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    pairs = list(pairs)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Value:
+    """One counter or gauge series"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+class HistogramSeries:
+    """Observation counts per bucket (not cumulative until exposed) and their sum"""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        # Buckets are upper-inclusive ("le"), the last one is +Inf
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+class Metric:
+    """A named metric with one series per combination of label values
+
+    Updates are plain attribute arithmetic on the event loop thread, so they
+    need no locking; look series up once with labels() and keep them when a
+    hot path updates the same series repeatedly.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.series = {}
+
+    def labels(self, *values):
+        key = tuple(str(value) for value in values)
+        series = self.series.get(key)
+        if series is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {key}")
+            series = self.series[key] = self._new_series()
+        return series
+
+    def _new_series(self):
+        return Value()
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, series in sorted(self.series.items()):
+            lines.extend(self._samples(list(zip(self.labelnames, key)), series))
+        return lines
+
+    def _samples(self, pairs, series) -> List[str]:
+        return [f"{self.name}{_labels(pairs)} {_number(series.value)}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+class Gauge(Metric):
+    kind = "gauge"
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self):
+        return HistogramSeries(self.buckets)
+
+    def _samples(self, pairs, series) -> List[str]:
+        lines, total = [], 0
+        for bound, count in zip((*self.buckets, math.inf), series.counts):
+            total += count
+            lines.append(f"{self.name}_bucket{_labels(pairs + [('le', _number(bound))])} {total}")
+        lines.append(f"{self.name}_sum{_labels(pairs)} {_number(series.sum)}")
+        lines.append(f"{self.name}_count{_labels(pairs)} {total}")
+        return lines
+
+class MetricsRegistry:
+    """Metrics exposed together in the Prometheus text format
+
+    Collectors are called before each exposition to copy counters that other
+    objects already keep (cache and buffer statistics) into metrics, so those
+    objects need no knowledge of metrics.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors: Dict[str, Callable[[], None]] = {}
+
+    def _register(self, metric: Metric):
+        """Register a metric, or return the one already registered under its name
+
+        The app's lifespan can run more than once per process (tests, the load
+        test), so instrumenting the same thing again reuses its series.
+        """
+        existing = self.metrics.get(metric.name)
+        if existing is None:
+            self.metrics[metric.name] = metric
+            return metric
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(f"Metric {metric.name} is already registered with another type or labels")
+        return existing
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def on_collect(self, name: str, collector: Callable[[], None]):
+        """Call collector before each exposition, replacing any collector of that name"""
+        self.collectors[name] = collector
+
+    def expose(self) -> bytes:
+        for collector in self.collectors.values():
+            collector()
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.expose())
+        return ("\n".join(lines) + "\n").encode()
+
+class TimedRepository:
+    """Repository proxy that records how long each awaited call takes
+
+    Only coroutine methods are timed; scans return iterators whose cost lands
+    on the consumer, so they pass through unchanged, as do attributes.
+    """
+
+    def __init__(self, repository, duration: Histogram, errors: Counter, backend: str, name: str):
+        self._repository = repository
+        self._duration = duration
+        self._errors = errors
+        self._backend = backend
+        self._name = name
+
+    def __getattr__(self, attribute: str):
+        value = getattr(self._repository, attribute)
+        if not inspect.iscoroutinefunction(value):
+            return value
+        series = self._duration.labels(self._backend, self._name, attribute)
+
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await value(*args, **kwargs)
+            except Exception as e:
+                # Includes expected outcomes such as VersionConflict, told apart by type
+                self._errors.labels(self._backend, self._name, attribute, type(e).__name__).inc()
+                raise
+            finally:
+                series.observe(time.perf_counter() - start)
+
+        # Later lookups find the wrapper directly and skip __getattr__
+        self.__dict__[attribute] = timed
+        return timed
+
+def instrument_repositories(repositories, registry: MetricsRegistry):
+    """Time every storage operation of a Repositories bundle"""
+    duration = registry.histogram(
+        "storage_operation_duration_seconds",
+        "Time spent in storage operations",
+        ("backend", "repository", "operation")
+    )
+    errors = registry.counter(
+        "storage_operation_errors_total",
+        "Storage operations that raised, by exception type",
+        ("backend", "repository", "operation", "error")
+    )
+    for name in ("portfolio", "contacts", "status_checks", "views"):
+        repository = getattr(repositories, name)
+        setattr(repositories, name, TimedRepository(repository, duration, errors, repositories.name, name))
+    return repositories
+
+def observe_portfolio_service(service, registry: MetricsRegistry):
+    """Expose the portfolio service's cache, load coalescing, view counter and contact buffer counters"""
+    lookups = registry.counter("portfolio_cache_lookups_total", "Snapshot cache lookups by result", ("result",))
+    hit_ratio = registry.gauge("portfolio_cache_hit_ratio", "Share of snapshot lookups served without a full read")
+    invalidations = registry.counter("portfolio_cache_invalidations_total", "Snapshot cache invalidations")
+    loads = registry.counter("portfolio_loads_total", "Portfolio reads started, or coalesced into one in flight", ("result",))
+    views = registry.gauge("view_counter", "View counter totals and views awaiting a flush", ("counter",))
+    checks = registry.counter("portfolio_version_checks_total", "Background portfolio version checks by outcome", ("result",))
+    if service.contact_buffer:
+        buffer = registry.gauge("contact_buffer", "Contact write buffer counters", ("counter",))
+
+    def collect():
+        stats = service.cache_stats()
+        lookups.labels("hit").set(stats["hits"])
+        lookups.labels("revalidated").set(stats["revalidations"])
+        lookups.labels("miss").set(stats["misses"])
+        hit_ratio.labels().set(stats["hit_ratio"])
+        invalidations.labels().set(stats["invalidations"])
+        loads.labels("started").set(service.loads.started)
+        loads.labels("coalesced").set(service.loads.coalesced)
+        coherence = stats["coherence"]
+        checks.labels("checked").set(coherence["checks"])
+        checks.labels("reloaded").set(coherence["reloads"])
+        checks.labels("failed").set(coherence["errors"])
+        for counter, value in service.views.stats().items():
+            views.labels(counter).set(value)
+        if service.contact_buffer:
+            for counter, value in service.contact_buffer.stats().items():
+                buffer.labels(counter).set(value)
+
+    registry.on_collect("portfolio_service", collect)
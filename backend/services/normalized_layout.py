@@ -0,0 +1,79 @@
+from services.project_index import normalize_key
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+from typing import Iterable, List, Optional
+import os
+
+# Where projects and experience are stored: as arrays inside the portfolio
+# document ("embedded", the default) or as one document per entry in their own
+# indexed collections ("normalized"), which lifts the 16 MB document limit and
+# lets /projects filter and page in the database.
+LAYOUTS = ("embedded", "normalized")
+
+# Portfolio sections that move to their own collections in the normalized layout
+ENTRY_SECTIONS = ("projects", "experience")
+
+# Fields stored only to serve queries; entry models ignore the position
+ENTRY_PROJECTION = {"_id": 0, "category_key": 0, "technology_keys": 0}
+
+def storage_layout() -> str:
+    """Storage layout selected by PORTFOLIO_STORAGE_LAYOUT"""
+    layout = os.environ.get("PORTFOLIO_STORAGE_LAYOUT", "embedded")
+    if layout not in LAYOUTS:
+        raise ValueError(f"PORTFOLIO_STORAGE_LAYOUT must be one of {', '.join(LAYOUTS)}, not {layout!r}")
+    return layout
+
+def query_keys(section: str, fields: dict) -> dict:
+    """Lower-cased copies of the filterable project fields present in fields"""
+    keys = {}
+    if section == "projects":
+        if "category" in fields:
+            keys["category_key"] = normalize_key(fields["category"])
+        if "technologies" in fields:
+            keys["technology_keys"] = sorted({normalize_key(t) for t in fields["technologies"]})
+    return keys
+
+def entry_document(section: str, entry: dict, position: int) -> dict:
+    return {**entry, "position": position, **query_keys(section, entry)}
+
+def project_filter(
+    categories: Optional[Iterable[str]] = None,
+    technologies: Optional[Iterable[str]] = None,
+    match: str = "any"
+) -> dict:
+    """MongoDB filter with the same semantics as ProjectIndex.select"""
+    query = {}
+    categories = {normalize_key(c) for c in categories or () if c.strip()}
+    if categories and "all" not in categories:
+        query["category_key"] = {"$in": sorted(categories)}
+    technologies = {normalize_key(t) for t in technologies or () if t.strip()}
+    if technologies:
+        query["technology_keys"] = {"$all" if match == "all" else "$in": sorted(technologies)}
+    return query
+
+async def read_entries(collection, projection: dict = ENTRY_PROJECTION) -> List[dict]:
+    """Every entry of a section, in portfolio order"""
+    return await collection.find({}, projection).sort("position", 1).to_list(None)
+
+async def write_entries(collection, section: str, entries: List[dict]):
+    """Make a section's collection hold exactly these entries, in this order
+
+    Idempotent, so an interrupted migration or a racing seed can simply be
+    run again.
+    """
+    ids = [entry["id"] for entry in entries]
+    if len(ids) != len(set(ids)):
+        raise ValueError(f"Duplicate {section} ids cannot be stored in the normalized layout")
+    operations = [
+        ReplaceOne({"id": entry["id"]}, entry_document(section, entry, position), upsert=True)
+        for position, entry in enumerate(entries)
+    ]
+    if operations:
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+            # Concurrent upserts of the same id; the retry replaces the winner's document
+            await collection.bulk_write(operations, ordered=False)
+    await collection.delete_many({"id": {"$nin": ids}})
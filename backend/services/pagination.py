@@ -0,0 +1,49 @@
+from datetime import datetime
+import base64
+import json
+
+from services.errors import InvalidCursor
+
+# Keyset pagination over (<timestamp field>, id), newest first. Cursors are
+# opaque to clients: base64 of the last returned item's sort key.
+
+def encode_cursor(timestamp: datetime, item_id: str) -> str:
+    payload = json.dumps([timestamp.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """Return (timestamp, id) from a cursor; raises InvalidCursor if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(timestamp), str(item_id)
+    except Exception as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+def keyset_sort(field: str) -> list:
+    return [(field, -1), ("id", -1)]
+
+def keyset_filter(field: str, cursor: str) -> dict:
+    """Filter for the items that come after the cursor in keyset_sort order"""
+    timestamp, item_id = decode_cursor(cursor)
+    return {"$or": [
+        {field: {"$lt": timestamp}},
+        {field: timestamp, "id": {"$lt": item_id}},
+    ]}
+
+# Portfolio entries are paged by their position in the portfolio instead
+
+def encode_position_cursor(position: int) -> str:
+    payload = json.dumps([position], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_position_cursor(cursor: str) -> int:
+    """Return the position from a cursor; raises InvalidCursor if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position, = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(position, int) or position < 0:
+            raise ValueError(position)
+        return position
+    except Exception as e:
+        raise InvalidCursor("Invalid cursor") from e
@@ -0,0 +1,286 @@
+from models.portfolio import Portfolio, PersonalInfo, Project, Experience
+from services.project_index import ProjectIndex
+from services.compression import compress
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Iterable, Optional
+import hashlib
+import time
+
+# Filtered project bodies and pages kept per snapshot (least recently used are evicted)
+FILTERED_PROJECTS_CACHE_SIZE = 128
+
+# Top-level Portfolio fields that can be loaded and validated independently
+SECTIONS = ("personal", "projects", "experience")
+
+def section_projection(sections: Iterable[str]) -> dict:
+    """MongoDB projection for the portfolio metadata plus the given sections"""
+    projection = {"_id": 0, "id": 1, "updated_at": 1, "version": 1}
+    projection.update({section: 1 for section in sections})
+    return projection
+
+def filter_key(categories=None, technologies=None, match: str = "any") -> tuple:
+    """Normalized cache key for a set of project filters"""
+    if isinstance(categories, str):
+        categories = [categories]
+    return (
+        frozenset(c.strip().lower() for c in categories or () if c.strip()),
+        frozenset(t.strip().lower() for t in technologies or () if t.strip()),
+        match
+    )
+
+def join_json(items) -> bytes:
+    """JSON array from already encoded items"""
+    return b"[" + b",".join(items) + b"]"
+
+def validate_section(section: str, value):
+    """Validate one raw section of a portfolio document"""
+    if section == "personal":
+        return PersonalInfo(**value)
+    if section == "projects":
+        return [Project(**project) for project in value]
+    if section == "experience":
+        return [Experience(**entry) for entry in value]
+    raise KeyError(section)
+
+class PortfolioSnapshot:
+    """A validated portfolio, or some of its sections, as loaded at a given version
+
+    Section endpoints only load and validate the sections they need; the
+    remaining sections are filled in later if the version is unchanged.
+    JSON bodies for each section are encoded at most once per snapshot and
+    reused for every response until the portfolio version changes, as are
+    their compressed variants.
+    """
+
+    def __init__(self, portfolio_id: str, updated_at: datetime, sections: dict, version: int):
+        self.id = portfolio_id
+        self.updated_at = updated_at
+        self.sections = sections
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self._portfolio = None
+        self._json = {}
+        self._project_json = None
+        self._project_index = None
+        self._filtered_json = OrderedDict()
+        self._etags = {}
+        self._compressed = {}
+        self.last_modified_at = updated_at.replace(tzinfo=timezone.utc) if updated_at.tzinfo is None else updated_at
+        self.last_modified = format_datetime(self.last_modified_at, usegmt=True)
+
+    @classmethod
+    def from_portfolio(cls, portfolio: Portfolio) -> "PortfolioSnapshot":
+        sections = {section: getattr(portfolio, section) for section in SECTIONS}
+        snapshot = cls(portfolio.id, portfolio.updated_at, sections, portfolio.version)
+        snapshot._portfolio = portfolio
+        return snapshot
+
+    @classmethod
+    def from_document(cls, document: dict, sections: Iterable[str]) -> "PortfolioSnapshot":
+        """Build a snapshot from a (possibly projected) portfolio document"""
+        validated = {section: validate_section(section, document[section]) for section in sections}
+        # Documents written before versioning was introduced count as version 0
+        return cls(document["id"], document["updated_at"], validated, document.get("version", 0))
+
+    def missing(self, sections: Iterable[str]) -> tuple:
+        return tuple(section for section in sections if section not in self.sections)
+
+    def fill(self, document: dict, sections: Iterable[str]):
+        """Add sections read from a document at the same version"""
+        for section in sections:
+            self.sections[section] = validate_section(section, document[section])
+
+    @property
+    def personal(self) -> PersonalInfo:
+        return self.sections["personal"]
+
+    @property
+    def projects(self) -> list:
+        return self.sections["projects"]
+
+    @property
+    def experience(self) -> list:
+        return self.sections["experience"]
+
+    @property
+    def portfolio(self) -> Portfolio:
+        """The complete portfolio; every section must be loaded"""
+        if self._portfolio is None:
+            # Sections are already validated, so skip a second validation pass
+            self._portfolio = Portfolio.model_construct(
+                id=self.id,
+                personal=self.personal,
+                projects=self.projects,
+                experience=self.experience,
+                updated_at=self.updated_at,
+                version=self.version
+            )
+        return self._portfolio
+
+    def etag(self, body: bytes, encoding: Optional[str] = None) -> str:
+        """Strong entity tag for an encoded body, sent with the given content coding
+
+        Bodies returned by this snapshot are long-lived objects whose hash is
+        cached by Python, so repeated lookups are constant time. Each content
+        coding is a different representation and gets its own tag, the
+        uncompressed body's tag with the coding appended.
+        """
+        tag = self._etags.get(body)
+        if tag is None:
+            tag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            if len(self._etags) >= 2 * FILTERED_PROJECTS_CACHE_SIZE:
+                # Drop the oldest tag; filtered bodies come and go with the LRU
+                del self._etags[next(iter(self._etags))]
+            self._etags[body] = tag
+        if encoding:
+            return f'{tag[:-1]}-{encoding}"'
+        return tag
+
+    def compressed(self, body: bytes, encoding: str) -> bytes:
+        """A body compressed with the given content coding, compressed once per snapshot"""
+        key = (encoding, body)
+        compressed = self._compressed.get(key)
+        if compressed is None:
+            compressed = compress(body, encoding)
+            if len(self._compressed) >= 2 * FILTERED_PROJECTS_CACHE_SIZE:
+                del self._compressed[next(iter(self._compressed))]
+            self._compressed[key] = compressed
+        return compressed
+
+    def section_json(self, section: str) -> bytes:
+        """Encoded response body for a whole section"""
+        body = self._json.get(section)
+        if body is None:
+            if section == "portfolio":
+                body = self.portfolio.model_dump_json().encode()
+            elif section == "personal":
+                body = self.personal.model_dump_json().encode()
+            elif section == "projects":
+                body = join_json(self._projects_json())
+            elif section == "experience":
+                body = join_json(e.model_dump_json().encode() for e in self.experience)
+            else:
+                raise KeyError(section)
+            self._json[section] = body
+        return body
+
+    @property
+    def project_index(self) -> ProjectIndex:
+        if self._project_index is None:
+            self._project_index = ProjectIndex(self.projects)
+        return self._project_index
+
+    def select_projects(self, categories=None, technologies=None, match: str = "any") -> list:
+        """Projects matching the filters, answered from the project index"""
+        projects = self.projects
+        return [projects[i] for i in self.project_index.select(categories, technologies, match)]
+
+    def projects_json(self, categories=None, technologies=None, match: str = "any") -> bytes:
+        """Encoded project list filtered by categories and technologies (case-insensitive)"""
+        key = filter_key(categories, technologies, match)
+        if not key[1] and (not key[0] or "all" in key[0]):
+            return self.section_json("projects")
+
+        body = self.cached(key)
+        if body is None:
+            encoded = self._projects_json()
+            body = self.remember(key, join_json(encoded[i] for i in self.project_index.select(categories, technologies, match)))
+        return body
+
+    def projects_page_json(self, categories=None, technologies=None, match: str = "any", after: int = -1, limit: Optional[int] = None) -> tuple:
+        """Encoded page of filtered projects after a position, and the last position if more follow"""
+        key = ("page", filter_key(categories, technologies, match), after, limit)
+        page = self.cached(key)
+        if page is None:
+            positions = self.project_index.select(categories, technologies, match)
+            start = bisect_right(positions, after)
+            selected = positions[start:start + limit] if limit else positions[start:]
+            more = limit is not None and start + limit < len(positions)
+            encoded = self._projects_json()
+            page = self.remember(key, (join_json(encoded[i] for i in selected), selected[-1] if more else None))
+        return page
+
+    def cached(self, key):
+        """A body (or page) previously remembered for this snapshot, if still held"""
+        value = self._filtered_json.get(key)
+        if value is not None:
+            self._filtered_json.move_to_end(key)
+        return value
+
+    def remember(self, key, value):
+        """Keep a derived body for the lifetime of this snapshot (bounded LRU)"""
+        self._filtered_json[key] = value
+        if len(self._filtered_json) > FILTERED_PROJECTS_CACHE_SIZE:
+            self._filtered_json.popitem(last=False)
+        return value
+
+    def _projects_json(self) -> list:
+        if self._project_json is None:
+            self._project_json = [p.model_dump_json().encode() for p in self.projects]
+        return self._project_json
+
+class PortfolioCache:
+    """Read-through cache holding the current portfolio snapshot
+
+    Snapshots are served without touching the database for `ttl` seconds.
+    After that the owner is expected to check the stored version and either
+    `touch()` the snapshot or replace it. A background version check can
+    `confirm()` the snapshot ahead of expiry so requests never wait on one.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.snapshot: Optional[PortfolioSnapshot] = None
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def is_fresh(self, snapshot: PortfolioSnapshot) -> bool:
+        """Whether the snapshot is within its TTL"""
+        return time.monotonic() - snapshot.loaded_at < self.ttl
+
+    def touch(self) -> PortfolioSnapshot:
+        """Mark the current snapshot as confirmed up to date"""
+        self.snapshot.loaded_at = time.monotonic()
+        self.revalidations += 1
+        return self.snapshot
+
+    def confirm(self, version: int) -> bool:
+        """Restart the TTL if the current snapshot is at the stored version"""
+        if self.snapshot is None or self.snapshot.version != version:
+            return False
+        self.snapshot.loaded_at = time.monotonic()
+        return True
+
+    def set(self, snapshot: PortfolioSnapshot) -> PortfolioSnapshot:
+        current = self.snapshot
+        # A slow read can finish after a newer snapshot was cached; keep the newer one
+        if self.enabled and (current is None or snapshot.version >= current.version):
+            self.snapshot = snapshot
+        return snapshot
+
+    def invalidate(self):
+        if self.snapshot is not None:
+            self.invalidations += 1
+        self.snapshot = None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.revalidations + self.misses
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": (self.hits + self.revalidations) / lookups if lookups else 0.0,
+            "version": self.snapshot.version if self.snapshot else None,
+        }
@@ -1,110 +1,488 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from models.portfolio import Portfolio, Project, Experience, ContactMessage, ContactMessageCreate
+from models.portfolio import Portfolio, Project, Experience, ContactMessage, ContactMessageCreate, ProjectUpdate, ExperienceUpdate
 from database.seed_data import get_portfolio_seed_data
-from typing import List, Optional
+from repositories.base import Repositories, utc_now
+from services.search_index import SearchIndex
+from services.singleflight import SingleFlight
+from services.contact_buffer import ContactWriteBuffer, ContactBufferFull
+from services.view_counter import ViewCounter
+from services.version_watcher import VersionWatcher
+from services.portfolio_cache import PortfolioCache, PortfolioSnapshot, SECTIONS, filter_key, join_json
+from services.fieldsets import Fieldset, fieldset_sections, include_spec, trimmed_model
+from services.compression import COMPRESSION_MIN_SIZE, ENCODINGS
+from services.errors import InvalidCursor, VersionConflict
+from services.pagination import decode_position_cursor, encode_cursor, encode_position_cursor
+from typing import List, Optional, Tuple
+from datetime import datetime
+import json
+import os
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Portfolio sections made of entries that can be edited individually
+ENTRY_MODELS = {
+    "projects": (Project, ProjectUpdate),
+    "experience": (Experience, ExperienceUpdate),
+}
+
 class PortfolioService:
-    def __init__(self, db):
-        self.db = db
-        self.portfolio_collection = db.portfolio
-        self.contact_collection = db.contact_messages
+    def __init__(self, storage, cache_ttl: Optional[float] = None, layout: Optional[str] = None):
+        """storage is a Repositories bundle, or a Motor database for the MongoDB backend"""
+        if not isinstance(storage, Repositories):
+            from repositories.mongo import MongoRepositories
+            storage = MongoRepositories(storage, layout)
+        self.repositories = storage
+        if cache_ttl is None:
+            cache_ttl = float(os.environ.get("PORTFOLIO_CACHE_TTL", "30"))
+        self.cache = PortfolioCache(cache_ttl)
+        self.search_index = SearchIndex()
+        self.loads = SingleFlight()
+        self.contact_buffer: Optional[ContactWriteBuffer] = None
+        if os.environ.get("CONTACT_WRITE_MODE", "direct") == "buffered":
+            self.contact_buffer = ContactWriteBuffer(
+                self.repositories.contacts,
+                max_queue=int(os.environ.get("CONTACT_BUFFER_MAX_QUEUE", "10000")),
+                batch_size=int(os.environ.get("CONTACT_BUFFER_BATCH_SIZE", "500")),
+                flush_interval=float(os.environ.get("CONTACT_BUFFER_FLUSH_MS", "50")) / 1000,
+                enqueue_timeout=float(os.environ.get("CONTACT_BUFFER_ENQUEUE_TIMEOUT_MS", "1000")) / 1000,
+                max_retries=int(os.environ.get("CONTACT_BUFFER_MAX_RETRIES", "3")),
+                drain_timeout=float(os.environ.get("CONTACT_BUFFER_DRAIN_TIMEOUT_MS", "10000")) / 1000
+            )
+        # Background version checks keep each worker's snapshot coherent with the others'
+        self.watcher = VersionWatcher(
+            self,
+            mode=os.environ.get("PORTFOLIO_CACHE_COHERENCE", "off").lower(),
+            interval=float(os.environ.get("PORTFOLIO_VERSION_CHECK_INTERVAL", "1"))
+        )
+        self.views = ViewCounter(
+            self.repositories.views,
+            flush_interval=float(os.environ.get("VIEW_FLUSH_INTERVAL", "10"))
+        )
+
+    async def start(self):
+        """Start background work; call once the event loop is running"""
+        self.views.start()
+        self.watcher.start()
+        if self.contact_buffer:
+            self.contact_buffer.start()
+            logger.info("Contact messages use buffered (write-behind) ingestion")
+
+    async def close(self):
+        """Flush buffered writes and stop background work"""
+        await self.watcher.stop()
+        await self.views.stop()
+        if self.contact_buffer:
+            await self.contact_buffer.stop()
 
     async def initialize_portfolio(self):
         """Initialize portfolio with seed data if not exists"""
+        snapshot = await self.initialize_snapshot()
+        return snapshot.portfolio
+
+    async def initialize_snapshot(self) -> PortfolioSnapshot:
+        """Initialize portfolio with seed data if not exists and return its snapshot
+
+        Concurrent callers in this process share one initialization, and the
+        repository's atomic create guarantees a single portfolio even when
+        several processes start against an empty database at once.
+        """
+        return await self.loads.do("initialize", self._initialize_snapshot)
+
+    async def _initialize_snapshot(self) -> PortfolioSnapshot:
         try:
-            existing_portfolio = await self.portfolio_collection.find_one()
-            if not existing_portfolio:
-                seed_data = get_portfolio_seed_data()
-                await self.portfolio_collection.insert_one(seed_data.dict())
-                logger.info("Portfolio initialized with seed data")
-                return seed_data
-            return Portfolio(**existing_portfolio)
+            seed_data = get_portfolio_seed_data()
+            if await self.repositories.portfolio.create(seed_data.dict()):
+                logger.info(f"Portfolio initialized with seed data ({self.repositories.name} backend)")
+            document = await self.repositories.portfolio.read(SECTIONS)
+            return self.cache.set(PortfolioSnapshot.from_document(document, SECTIONS))
         except Exception as e:
             logger.error(f"Error initializing portfolio: {e}")
             raise
 
+    async def warm_up(self) -> PortfolioSnapshot:
+        """Load (or seed) the portfolio and prepare what the first requests would build
+
+        Encodes, tags and compresses every section body, and builds the
+        project and search indexes, so no request pays for a cold snapshot.
+        """
+        snapshot = await self.initialize_snapshot()
+        for section in ("portfolio",) + SECTIONS:
+            body = snapshot.section_json(section)
+            snapshot.etag(body)
+            if len(body) >= COMPRESSION_MIN_SIZE:
+                for encoding in ENCODINGS:
+                    snapshot.compressed(body, encoding)
+        snapshot.project_index
+        if self.search_index.version != snapshot.version:
+            self.search_index.sync(snapshot.projects, snapshot.experience, snapshot.version)
+        return snapshot
+
+    async def get_snapshot(self, sections=SECTIONS) -> Optional[PortfolioSnapshot]:
+        """Get a portfolio snapshot with at least the given sections loaded
+
+        Served from the cache when possible. Only the requested sections are
+        read from storage and validated, and concurrent
+        misses for the same sections share one read.
+        """
+        try:
+            cache = self.cache
+            cached = cache.snapshot if cache.enabled else None
+            if cached:
+                missing = cached.missing(sections)
+                if not missing and cache.is_fresh(cached):
+                    cache.hits += 1
+                    return cached
+            return await self.loads.do(("snapshot", tuple(sections)), lambda: self._load_snapshot(tuple(sections)))
+        except Exception as e:
+            logger.error(f"Error getting portfolio: {e}")
+            raise
+
+    async def _load_snapshot(self, sections: tuple) -> Optional[PortfolioSnapshot]:
+        cache = self.cache
+        cached = cache.snapshot if cache.enabled else None
+        if cached:
+            missing = cached.missing(sections)
+            # Expired or partial: confirm the version, reading only what is missing
+            current = await self._read_portfolio(missing)
+            if current and current.get("version", 0) == cached.version:
+                cached.fill(current, missing)
+                # A reload may have dropped or replaced the snapshot during the read
+                if cache.snapshot is cached:
+                    cache.touch()
+                return cached
+            # Changed elsewhere; drop it so the snapshot read below replaces it whatever its version
+            cache.invalidate()
+        cache.misses += 1
+
+        portfolio_data = await self._read_portfolio(sections)
+        if portfolio_data:
+            return cache.set(PortfolioSnapshot.from_document(portfolio_data, sections))
+        cache.invalidate()
+        return None
+
+    async def reload_snapshot(self, sections: tuple) -> Optional[PortfolioSnapshot]:
+        """Replace the cached snapshot with a fresh read of the given sections
+
+        Requests arriving meanwhile wait for the new snapshot rather than
+        being served the old one.
+        """
+        self.cache.invalidate()
+        # Its own key, so it never joins a read that started before the change
+        return await self.loads.do(("reload", sections), lambda: self._load_snapshot(sections))
+
+    async def _read_portfolio(self, sections) -> Optional[dict]:
+        """Read the portfolio metadata plus the given sections from the repository"""
+        return await self.repositories.portfolio.read(sections)
+
     async def get_portfolio(self) -> Optional[Portfolio]:
         """Get complete portfolio data"""
+        snapshot = await self.get_snapshot()
+        return snapshot.portfolio if snapshot else None
+
+    async def get_portfolio_fields(self, fieldset: Fieldset) -> Tuple[Optional[PortfolioSnapshot], bytes]:
+        """The portfolio trimmed to a fieldset (see parse_fields), encoded
+
+        With the cache enabled, only the sections the fields touch are loaded
+        into the snapshot and the trimmed body is encoded once per snapshot.
+        Without it, the read itself is projected to those fields (in MongoDB)
+        and validated with a response model holding only them.
+        """
         try:
-            portfolio_data = await self.portfolio_collection.find_one()
-            if portfolio_data:
-                return Portfolio(**portfolio_data)
-            return None
+            if self.cache.enabled:
+                snapshot = await self.get_snapshot(fieldset_sections(fieldset))
+                if not snapshot:
+                    return None, b""
+                key = ("fields", fieldset)
+                body = snapshot.cached(key)
+                if body is None:
+                    selected = Portfolio.model_construct(
+                        id=snapshot.id,
+                        updated_at=snapshot.updated_at,
+                        version=snapshot.version,
+                        **{section: snapshot.sections[section] for section in fieldset_sections(fieldset)}
+                    )
+                    body = snapshot.remember(key, selected.model_dump_json(include=include_spec(fieldset)).encode())
+                return snapshot, body
+            document = await self.repositories.portfolio.read_fields(fieldset)
+            if not document:
+                return None, b""
+            snapshot = PortfolioSnapshot(document["id"], document["updated_at"], {}, document.get("version", 0))
+            return snapshot, trimmed_model(fieldset)(**document).model_dump_json().encode()
         except Exception as e:
-            logger.error(f"Error getting portfolio: {e}")
+            logger.error(f"Error getting portfolio fields: {e}")
             raise
 
     async def get_personal_info(self) -> Optional[dict]:
         """Get personal information only"""
         try:
-            portfolio = await self.get_portfolio()
-            if portfolio:
-                return portfolio.personal.dict()
+            snapshot = await self.get_snapshot(("personal",))
+            if snapshot:
+                return snapshot.personal.dict()
             return None
         except Exception as e:
             logger.error(f"Error getting personal info: {e}")
             raise
 
-    async def get_projects(self, category: Optional[str] = None) -> List[Project]:
-        """Get projects with optional category filtering"""
+    async def get_projects(
+        self,
+        category=None,
+        technologies: Optional[List[str]] = None,
+        match: str = "any"
+    ) -> List[Project]:
+        """Get projects filtered by one or more categories and technologies"""
         try:
-            portfolio = await self.get_portfolio()
-            if not portfolio:
+            snapshot = await self.get_snapshot(("projects",))
+            if not snapshot:
                 return []
-            
-            projects = portfolio.projects
-            if category and category.lower() != "all":
-                projects = [p for p in projects if p.category.lower() == category.lower()]
-            
-            return projects
+            if isinstance(category, str):
+                category = [category]
+            return snapshot.select_projects(category, technologies, match)
+        except Exception as e:
+            logger.error(f"Error getting projects: {e}")
+            raise
+
+    async def get_projects_page(
+        self,
+        category=None,
+        technologies: Optional[List[str]] = None,
+        match: str = "any",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[Optional[PortfolioSnapshot], bytes, Optional[str]]:
+        """Encoded page of filtered projects in portfolio order, and the cursor for the next page
+
+        Without a limit every matching project is returned. Most storage
+        answers from the cached snapshot; repositories that can query projects
+        (the normalized MongoDB layout) filter in storage, and the encoded page
+        is kept on the snapshot until the portfolio version changes. Raises
+        InvalidCursor for a bad cursor.
+        """
+        try:
+            after = decode_position_cursor(cursor) if cursor else -1
+            if not self.repositories.portfolio.queries_projects:
+                snapshot = await self.get_snapshot(("projects",))
+                if not snapshot:
+                    return None, b"[]", None
+                if limit is None and cursor is None:
+                    return snapshot, snapshot.projects_json(category, technologies, match), None
+                body, last = snapshot.projects_page_json(category, technologies, match, after, limit)
+            else:
+                snapshot = await self.get_snapshot(())
+                if not snapshot:
+                    return None, b"[]", None
+                key = ("query", filter_key(category, technologies, match), after, limit)
+                page = snapshot.cached(key)
+                if page is None:
+                    page = snapshot.remember(key, await self._query_projects(category, technologies, match, after, limit))
+                body, last = page
+            return snapshot, body, encode_position_cursor(last) if last is not None else None
+        except InvalidCursor:
+            raise
         except Exception as e:
             logger.error(f"Error getting projects: {e}")
             raise
 
+    async def get_batch(
+        self,
+        sections: List[str],
+        category=None,
+        technologies: Optional[List[str]] = None,
+        match: str = "any",
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[Optional[PortfolioSnapshot], bytes]:
+        """Several sections encoded in one response, answered from one snapshot
+
+        Every requested section is read in a single load (or none, when the
+        snapshot is cached), so all results are at the same version. The
+        project filters apply to "projects". Each result carries its own
+        status: 400 for an unknown section or a bad cursor. The encoded
+        response is kept on the snapshot like any other body.
+        """
+        wanted = set(SECTIONS) if "portfolio" in sections else set(sections)
+        snapshot = await self.get_snapshot(tuple(section for section in SECTIONS if section in wanted))
+        if not snapshot:
+            return None, b""
+        key = ("batch", tuple(sections), filter_key(category, technologies, match), limit, cursor)
+        body = snapshot.cached(key)
+        if body is None:
+            results = [self._batch_result(snapshot, section, category, technologies, match, limit, cursor) for section in sections]
+            body = snapshot.remember(key, b'{"version":%d,"results":[%s]}' % (snapshot.version, b",".join(results)))
+        return snapshot, body
+
+    @staticmethod
+    def _batch_result(snapshot: PortfolioSnapshot, section: str, category, technologies, match: str, limit: Optional[int], cursor: Optional[str]) -> bytes:
+        name = json.dumps(section).encode()
+        next_cursor = None
+        if section in ("portfolio", "personal", "experience"):
+            body = snapshot.section_json(section)
+        elif section == "projects":
+            if isinstance(category, str):
+                category = [category]
+            if limit is None and cursor is None:
+                body = snapshot.projects_json(category, technologies, match)
+            else:
+                try:
+                    after = decode_position_cursor(cursor) if cursor else -1
+                except InvalidCursor:
+                    return b'{"section":%s,"status":400,"body":{"detail":"Invalid cursor"}}' % name
+                body, last = snapshot.projects_page_json(category, technologies, match, after, limit)
+                if last is not None:
+                    next_cursor = encode_position_cursor(last)
+        else:
+            return b'{"section":%s,"status":400,"body":{"detail":"Unknown section"}}' % name
+        result = b'{"section":%s,"status":200,"body":%s' % (name, body)
+        if next_cursor:
+            result += b',"next_cursor":%s' % json.dumps(next_cursor).encode()
+        return result + b"}"
+
+    async def _query_projects(self, category, technologies, match: str, after: int, limit: Optional[int]) -> tuple:
+        """Filter and page projects in storage, encoded as a JSON array"""
+        if isinstance(category, str):
+            category = [category]
+        documents, last = await self.repositories.portfolio.query_projects(category, technologies, match, after, limit)
+        return join_json(Project(**document).model_dump_json().encode() for document in documents), last
+
     async def get_experience(self) -> List[Experience]:
         """Get work experience"""
         try:
-            portfolio = await self.get_portfolio()
-            if portfolio:
-                return portfolio.experience
+            snapshot = await self.get_snapshot(("experience",))
+            if snapshot:
+                return snapshot.experience
             return []
         except Exception as e:
             logger.error(f"Error getting experience: {e}")
             raise
 
+    async def search(self, query: str, limit: int = 20, kind: Optional[str] = None) -> List[dict]:
+        """Full-text search over projects and experience"""
+        try:
+            snapshot = await self.get_snapshot(("projects", "experience"))
+            if not snapshot:
+                return []
+            if self.search_index.version != snapshot.version:
+                changes = self.search_index.sync(snapshot.projects, snapshot.experience, snapshot.version)
+                logger.info(f"Search index synced: {changes}")
+            return self.search_index.search(query, limit, kind)
+        except Exception as e:
+            logger.error(f"Error searching portfolio: {e}")
+            raise
+
     async def create_contact_message(self, message_data: ContactMessageCreate) -> ContactMessage:
         """Create a new contact message"""
         try:
             contact_message = ContactMessage(**message_data.dict())
-            await self.contact_collection.insert_one(contact_message.dict())
+            if self.contact_buffer:
+                # Acknowledged once queued; written with the next insert_many batch
+                await self.contact_buffer.submit(contact_message.dict())
+            else:
+                await self.repositories.contacts.insert(contact_message.dict())
             logger.info(f"New contact message from {message_data.email}")
             return contact_message
+        except ContactBufferFull:
+            raise
         except Exception as e:
             logger.error(f"Error creating contact message: {e}")
             raise
 
     async def get_contact_messages(self, limit: int = 50) -> List[ContactMessage]:
         """Get contact messages"""
+        messages, _ = await self.get_contact_messages_page(limit)
+        return messages
+
+    async def get_contact_messages_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        read: Optional[bool] = None
+    ) -> Tuple[List[ContactMessage], Optional[str]]:
+        """Get a page of contact messages, newest first, and the cursor for the next page
+
+        Keyset pagination on (created_at, id) is served by the contact message
+        indexes, so each page costs the same however deep it is.
+        """
         try:
-            messages = await self.contact_collection.find().sort("created_at", -1).limit(limit).to_list(limit)
-            return [ContactMessage(**msg) for msg in messages]
+            documents = await self.repositories.contacts.page(limit + 1, cursor, read)
+            messages = [ContactMessage(**msg) for msg in documents[:limit]]
+            next_cursor = None
+            if len(documents) > limit:
+                last = messages[-1]
+                next_cursor = encode_cursor(last.created_at, last.id)
+            return messages, next_cursor
+        except InvalidCursor:
+            raise
         except Exception as e:
             logger.error(f"Error getting contact messages: {e}")
             raise
 
+    def iter_contact_messages(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        read: Optional[bool] = None,
+        batch_size: int = 1000
+    ):
+        """Async iterator over contact messages, oldest first, for streaming exports"""
+        return self.repositories.contacts.scan(since, until, read, batch_size)
+
+    async def ensure_indexes(self):
+        """Create the storage backend's indexes or tables"""
+        await self.repositories.prepare()
+
     async def update_portfolio(self, portfolio_data: Portfolio) -> Portfolio:
-        """Update portfolio data"""
+        """Replace the portfolio if it is still at portfolio_data.version
+
+        Raises VersionConflict when another write got there first.
+        """
         try:
-            await self.portfolio_collection.replace_one(
-                {"id": portfolio_data.id},
-                portfolio_data.dict(),
-                upsert=True
-            )
+            expected_version = portfolio_data.version
+            portfolio_data = portfolio_data.copy(update={"updated_at": utc_now(), "version": expected_version + 1})
+            await self.repositories.portfolio.replace(portfolio_data.dict(), expected_version)
+            self.cache.set(PortfolioSnapshot.from_portfolio(portfolio_data))
             logger.info("Portfolio updated successfully")
             return portfolio_data
+        except VersionConflict:
+            self.cache.invalidate()
+            raise
         except Exception as e:
+            self.cache.invalidate()
             logger.error(f"Error updating portfolio: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _cache_edit(self, document: dict) -> PortfolioSnapshot:
+        """Cache the portfolio as a repository returned it after an edit"""
+        sections = tuple(section for section in SECTIONS if section in document)
+        return self.cache.set(PortfolioSnapshot.from_document(document, sections))
+
+    async def add_entry(self, section: str, entry, expected_version: Optional[int] = None) -> PortfolioSnapshot:
+        """Append a project or experience entry"""
+        document = await self.repositories.portfolio.add_entry(section, entry.dict(), expected_version)
+        snapshot = self._cache_edit(document)
+        logger.info(f"Added {section} entry {entry.id}")
+        return snapshot
+
+    async def update_entry(self, section: str, entry_id: int, changes, expected_version: Optional[int] = None) -> PortfolioSnapshot:
+        """Change some fields of one entry"""
+        fields = changes.dict(exclude_unset=True, exclude_none=True)
+        document = await self.repositories.portfolio.update_entry(section, entry_id, fields, expected_version)
+        snapshot = self._cache_edit(document)
+        logger.info(f"Updated {section} entry {entry_id}: {sorted(fields)}")
+        return snapshot
+
+    async def delete_entry(self, section: str, entry_id: int, expected_version: Optional[int] = None) -> PortfolioSnapshot:
+        """Remove one entry"""
+        document = await self.repositories.portfolio.delete_entry(section, entry_id, expected_version)
+        snapshot = self._cache_edit(document)
+        logger.info(f"Deleted {section} entry {entry_id}")
+        return snapshot
+
+    async def reorder_entries(self, section: str, ids: List[int], expected_version: Optional[int] = None) -> PortfolioSnapshot:
+        """Reorder a section's entries; ids must list every current entry once"""
+        document = await self.repositories.portfolio.reorder_entries(section, ids, expected_version)
+        snapshot = self._cache_edit(document)
+        logger.info(f"Reordered {section}")
+        return snapshot
+
+    def cache_stats(self) -> dict:
+        """Snapshot cache hit/miss counters and cross-worker coherence checks"""
+        return {**self.cache.stats(), "coherence": self.watcher.stats()}
\ No newline at end of file
@@ -0,0 +1,58 @@
+from typing import Iterable, List, Optional
+
+def normalize_key(value: str) -> str:
+    return value.strip().lower()
+
+class ProjectIndex:
+    """Case-insensitive category and technology lookup for a list of projects
+
+    Built once per portfolio version. Keys map to the positions of matching
+    projects in the list, so filtered results keep the portfolio's own order
+    and tolerate duplicate project ids.
+    """
+
+    def __init__(self, projects: list):
+        self.size = len(projects)
+        self.all = frozenset(range(self.size))
+        by_category = {}
+        by_technology = {}
+        for position, project in enumerate(projects):
+            by_category.setdefault(normalize_key(project.category), set()).add(position)
+            for technology in project.technologies:
+                by_technology.setdefault(normalize_key(technology), set()).add(position)
+        self.by_category = {key: frozenset(value) for key, value in by_category.items()}
+        self.by_technology = {key: frozenset(value) for key, value in by_technology.items()}
+
+    def select(
+        self,
+        categories: Optional[Iterable[str]] = None,
+        technologies: Optional[Iterable[str]] = None,
+        match: str = "any"
+    ) -> List[int]:
+        """Positions of projects matching the filters, in portfolio order
+
+        A project has a single category, so categories are always OR-ed.
+        Technologies are OR-ed for match="any" and AND-ed for match="all".
+        The category and technology filters are AND-ed together; "all" as a
+        category means no category filter.
+        """
+        selected = self.all
+        categories = {normalize_key(c) for c in categories or () if c.strip()}
+        if categories and "all" not in categories:
+            selected = selected & frozenset().union(*(self.by_category.get(c, frozenset()) for c in categories))
+
+        technologies = {normalize_key(t) for t in technologies or () if t.strip()}
+        if technologies:
+            postings = [self.by_technology.get(t, frozenset()) for t in technologies]
+            if match == "all":
+                # Intersect smallest first so misses short-circuit quickly
+                for posting in sorted(postings, key=len):
+                    selected = selected & posting
+                    if not selected:
+                        break
+            else:
+                selected = selected & frozenset().union(*postings)
+
+        if len(selected) == self.size:
+            return list(range(self.size))
+        return sorted(selected)
@@ -0,0 +1,103 @@
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between warm-up attempts while storage stays unreachable
+MAX_RETRY_INTERVAL = 30.0
+
+class Readiness:
+    """Startup warm-up and the readiness probe of one worker process
+
+    Warm-up opens pooled storage connections, creates indexes or tables,
+    loads (or seeds) the portfolio and prepares its encoded bodies, so the
+    first requests routed to the worker find everything warm. The first
+    attempt runs during startup; if storage is unreachable the worker starts
+    anyway and keeps retrying in the background, with backoff, while the
+    probe reports it not ready.
+
+    Once warm, each report pings storage (bounded by `ping_timeout`) and
+    includes the round trip and the connection pool's state; a failed ping
+    makes the worker not ready until one succeeds again.
+    """
+
+    def __init__(self, repositories, service, connections: int = 10, ping_timeout: float = 1.0, retry_interval: float = 1.0):
+        self.repositories = repositories
+        self.service = service
+        self.connections = connections
+        self.ping_timeout = ping_timeout
+        self.retry_interval = retry_interval
+        self.warm = False
+        self.attempts = 0
+        self.error: Optional[str] = None
+        self.steps: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Warm up once; on failure keep retrying in the background"""
+        if not await self.warm_up():
+            self._task = asyncio.create_task(self._retry())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def warm_up(self) -> bool:
+        """One warm-up attempt; True once the worker is warm"""
+        self.attempts += 1
+        steps = {}
+        started = time.perf_counter()
+        try:
+            for name, step in (
+                ("connections", lambda: self.repositories.connect(self.connections)),
+                ("indexes", self.repositories.prepare),
+                ("portfolio", self.service.warm_up),
+            ):
+                step_started = time.perf_counter()
+                await step()
+                steps[name] = round((time.perf_counter() - step_started) * 1000, 1)
+        except Exception as e:
+            self.error = str(e) or type(e).__name__
+            logger.error(f"Warm-up attempt {self.attempts} failed: {self.error}")
+            return False
+        self.steps = steps
+        self.warm = True
+        self.error = None
+        logger.info(f"Warm-up completed in {(time.perf_counter() - started) * 1000:.1f}ms: {steps}")
+        return True
+
+    async def _retry(self):
+        delay = self.retry_interval
+        while True:
+            await asyncio.sleep(delay)
+            if await self.warm_up():
+                return
+            delay = min(delay * 2, MAX_RETRY_INTERVAL)
+
+    async def report(self) -> Tuple[bool, dict]:
+        """Whether the worker should receive traffic, and why"""
+        report = {
+            "backend": self.repositories.name,
+            "warm_up": {"complete": self.warm, "attempts": self.attempts, "steps_ms": self.steps, "error": self.error},
+        }
+        if not self.warm:
+            return False, {"status": "warming_up", **report}
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.repositories.ping(), self.ping_timeout)
+        except Exception as e:
+            error = "ping timed out" if isinstance(e, asyncio.TimeoutError) else str(e) or type(e).__name__
+            return False, {"status": "unavailable", **report, "storage": {"reachable": False, "error": error}}
+        storage = {
+            "reachable": True,
+            "ping_ms": round((time.perf_counter() - started) * 1000, 2),
+            "pool": self.repositories.pool_stats(),
+        }
+        return True, {"status": "ready", **report, "storage": storage}
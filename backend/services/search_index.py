@@ -0,0 +1,163 @@
+from collections import Counter
+from typing import Iterable, List, Optional
+import heapq
+import math
+import re
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Per-field weights applied to term frequencies (a light BM25F)
+PROJECT_FIELDS = {"title": 3.0, "category": 2.0, "technologies": 2.0, "description": 1.0}
+EXPERIENCE_FIELDS = {"title": 3.0, "company": 2.0, "technologies": 2.0, "description": 1.0}
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+def _weighted_terms(item, fields: dict) -> Counter:
+    terms = Counter()
+    for field, weight in fields.items():
+        value = getattr(item, field)
+        if isinstance(value, list):
+            value = " ".join(value)
+        for token in tokenize(value):
+            terms[token] += weight
+    return terms
+
+class SearchIndex:
+    """In-memory inverted index over projects and experience entries
+
+    `sync()` diffs the entries of a new portfolio version against what is
+    indexed and only re-indexes entries that were added, changed or removed.
+    Queries are answered from the postings alone with BM25 ranking: each
+    term's postings are scored once per version into an impact-ordered list,
+    and multi-term queries stop early with the threshold algorithm once no
+    unseen entry can reach the current top `limit`.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.postings = {}
+        self.doc_terms = {}
+        self.doc_length = {}
+        self.doc_fingerprint = {}
+        self.doc_info = {}
+        self.total_length = 0.0
+        self._impacts = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def sync(self, projects: Iterable, experience: Iterable, version=None) -> dict:
+        """Bring the index up to date with the given entries"""
+        wanted = {}
+        for kind, items, fields in (
+            ("project", projects, PROJECT_FIELDS),
+            ("experience", experience, EXPERIENCE_FIELDS),
+        ):
+            seen = Counter()
+            for item in items:
+                # Ids are not guaranteed unique, so disambiguate repeats
+                key = (kind, item.id, seen[item.id])
+                seen[item.id] += 1
+                wanted[key] = (item, fields)
+
+        removed = [key for key in self.doc_terms if key not in wanted]
+        for key in removed:
+            self._remove(key)
+
+        added = updated = 0
+        for key, (item, fields) in wanted.items():
+            fingerprint = hash(tuple(
+                tuple(value) if isinstance(value, list) else value
+                for value in (getattr(item, field) for field in fields)
+            ))
+            if self.doc_fingerprint.get(key) == fingerprint:
+                continue
+            if key in self.doc_terms:
+                self._remove(key)
+                updated += 1
+            else:
+                added += 1
+            self._add(key, item, fields, fingerprint)
+
+        self.version = version
+        # Corpus statistics changed, so every term's scores must be recomputed
+        self._impacts.clear()
+        return {"added": added, "updated": updated, "removed": len(removed)}
+
+    def _add(self, key, item, fields: dict, fingerprint: int):
+        terms = _weighted_terms(item, fields)
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, {})[key] = frequency
+        length = sum(terms.values())
+        self.doc_terms[key] = terms
+        self.doc_length[key] = length
+        self.doc_fingerprint[key] = fingerprint
+        self.doc_info[key] = {"type": key[0], "id": item.id, "title": item.title}
+        self.total_length += length
+
+    def _remove(self, key):
+        for term in self.doc_terms.pop(key):
+            posting = self.postings[term]
+            del posting[key]
+            if not posting:
+                del self.postings[term]
+        self.total_length -= self.doc_length.pop(key)
+        del self.doc_fingerprint[key]
+        del self.doc_info[key]
+
+    def _impact(self, term: str):
+        """BM25 contribution of a term to each entry, highest first"""
+        impact = self._impacts.get(term)
+        if impact is None:
+            posting = self.postings.get(term)
+            if not posting:
+                return None
+            count = len(self.doc_terms)
+            average_length = self.total_length / count
+            idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+            scores = {
+                key: idf * frequency * (K1 + 1) / (frequency + K1 * (1 - B + B * self.doc_length[key] / average_length))
+                for key, frequency in posting.items()
+            }
+            ordered = sorted(scores.items(), key=lambda entry: entry[1], reverse=True)
+            impact = (ordered, scores)
+            self._impacts[term] = impact
+        return impact
+
+    def search(self, query: str, limit: int = 20, kind: Optional[str] = None) -> List[dict]:
+        """Ranked matches for a free-text query"""
+        impacts = [impact for impact in map(self._impact, set(tokenize(query))) if impact]
+        if not impacts:
+            return []
+
+        best = []
+        seen = set()
+        depth = 0
+        longest = max(len(ordered) for ordered, _ in impacts)
+        while depth < longest:
+            threshold = 0.0
+            for ordered, _ in impacts:
+                if depth >= len(ordered):
+                    continue
+                key, score = ordered[depth]
+                threshold += score
+                if key in seen or (kind and key[0] != kind):
+                    continue
+                seen.add(key)
+                total = sum(scores.get(key, 0.0) for _, scores in impacts)
+                if len(best) < limit:
+                    heapq.heappush(best, (total, key))
+                elif total > best[0][0]:
+                    heapq.heapreplace(best, (total, key))
+            depth += 1
+            # No entry below this depth can score more than the threshold
+            if len(best) >= limit and best[0][0] >= threshold:
+                break
+
+        best.sort(reverse=True)
+        return [dict(self.doc_info[key], score=round(score, 4)) for score, key in best]
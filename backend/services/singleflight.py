@@ -0,0 +1,34 @@
+from typing import Awaitable, Callable, Hashable
+import asyncio
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight load
+
+    The first caller for a key starts the load; callers that arrive while it
+    is running await the same result (or exception) instead of repeating the
+    work. The load is shielded, so one waiter being cancelled does not cancel
+    it for the others.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable]):
+        future = self._calls.get(key)
+        if future is None:
+            self.started += 1
+            future = asyncio.ensure_future(load())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _forget(self, key, future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved even if every waiter was cancelled
+            future.exception()
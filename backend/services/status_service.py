@@ -0,0 +1,68 @@
+from models.status import StatusCheck, StatusCheckCreate
+from repositories.base import Repositories
+from services.errors import InvalidCursor
+from services.pagination import decode_cursor, encode_cursor
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Documents fetched per round trip while streaming
+STREAM_BATCH_SIZE = 500
+
+class StatusService:
+    def __init__(self, storage):
+        """storage is a Repositories bundle, or a Motor database for the MongoDB backend"""
+        if not isinstance(storage, Repositories):
+            from repositories.mongo import MongoRepositories
+            storage = MongoRepositories(storage)
+        self.status_checks = storage.status_checks
+
+    async def create_status_check(self, status_data: StatusCheckCreate) -> StatusCheck:
+        status_obj = StatusCheck(**status_data.dict())
+        await self.status_checks.insert(status_obj.dict())
+        return status_obj
+
+    async def get_status_checks_page(
+        self,
+        limit: int = 1000,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Tuple[List[StatusCheck], Optional[str]]:
+        """Get a page of status checks, newest first, and the cursor for the next page"""
+        try:
+            documents = await self.status_checks.page(limit + 1, cursor, since, until)
+            checks = [StatusCheck(**document) for document in documents[:limit]]
+            next_cursor = None
+            if len(documents) > limit:
+                last = checks[-1]
+                next_cursor = encode_cursor(last.timestamp, last.id)
+            return checks, next_cursor
+        except InvalidCursor:
+            raise
+        except Exception as e:
+            logger.error(f"Error getting status checks: {e}")
+            raise
+
+    def stream_status_checks(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> AsyncIterator[bytes]:
+        """Status checks as NDJSON lines read batch by batch from storage
+
+        Only one batch is held in memory at a time, whatever the size of the
+        collection. The cursor argument is validated before streaming starts,
+        so a bad one raises InvalidCursor here rather than mid-response.
+        """
+        if cursor:
+            decode_cursor(cursor)
+        return self._stream(self.status_checks.scan(limit, cursor, since, until, STREAM_BATCH_SIZE))
+
+    async def _stream(self, documents: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+        async for document in documents:
+            yield StatusCheck(**document).model_dump_json().encode() + b"\n"
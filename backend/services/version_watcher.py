@@ -0,0 +1,113 @@
+from typing import Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "poll", "watch")
+
+class VersionWatcher:
+    """Keeps one worker's cached portfolio snapshot in step with storage
+
+    Each worker process caches its own snapshot. Without a watcher, an edit
+    made through another worker is only noticed when the snapshot's TTL runs
+    out and a request checks the stored version. With one, the stored version
+    is checked in the background every `interval` seconds ("poll"), and also
+    as soon as MongoDB reports a write to the portfolio ("watch", which needs
+    a replica set and falls back to polling without one).
+
+    A check confirms the snapshot when the version matches, so requests
+    never wait on revalidation while checks keep succeeding, and when it
+    differs it reloads the sections the snapshot held. Other workers'
+    edits therefore show up within one interval (or at once when watching).
+    If checks fail, the TTL still bounds staleness as before.
+    """
+
+    def __init__(self, service, mode: str = "poll", interval: float = 1.0):
+        if mode not in MODES:
+            raise ValueError(f"Cache coherence mode must be one of {', '.join(MODES)}, not {mode!r}")
+        self.service = service
+        self.mode = mode
+        self.interval = interval
+        self._tasks = []
+        self._changed = asyncio.Event()
+        # "watch" falls back to "poll" when change streams turn out to be unavailable
+        self.effective_mode = mode
+        self.checks = 0
+        self.reloads = 0
+        self.errors = 0
+        self.last_check: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off" and self.service.cache.enabled
+
+    def start(self):
+        if not self.enabled or self._tasks:
+            return
+        self._tasks.append(asyncio.create_task(self._run()))
+        if self.mode == "watch":
+            self._tasks.append(asyncio.create_task(self._watch()))
+        logger.info(f"Portfolio cache coherence: {self.mode}, checking every {self.interval}s")
+        if self.interval >= self.service.cache.ttl:
+            logger.warning("PORTFOLIO_VERSION_CHECK_INTERVAL is not below PORTFOLIO_CACHE_TTL; requests will still revalidate")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def check(self):
+        """Compare the stored version with the cached snapshot; reload it if they differ"""
+        cache = self.service.cache
+        cached = cache.snapshot
+        version = await self.service.repositories.portfolio.version()
+        self.checks += 1
+        self.last_check = time.monotonic()
+        if cached is None or cache.confirm(version):
+            return
+        self.reloads += 1
+        logger.info(f"Portfolio changed in storage (version {cached.version} -> {version}), reloading")
+        await self.service.reload_snapshot(tuple(cached.sections))
+
+    async def _run(self):
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Portfolio version check failed: {e}")
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+
+    async def _watch(self):
+        repository = self.service.repositories.portfolio
+        if not repository.watches_changes:
+            logger.warning(f"The {self.service.repositories.name} backend cannot watch for changes; polling instead")
+            self.effective_mode = "poll"
+            return
+        try:
+            async for _ in repository.watch():
+                self._changed.set()
+        except Exception as e:
+            logger.warning(f"Change stream unavailable ({e}); polling every {self.interval}s instead")
+        self.effective_mode = "poll"
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.effective_mode if self.enabled else "off",
+            "interval_seconds": self.interval,
+            "checks": self.checks,
+            "reloads": self.reloads,
+            "errors": self.errors,
+            "last_check_age_seconds": time.monotonic() - self.last_check if self.last_check is not None else None,
+        }
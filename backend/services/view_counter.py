@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("hour", "day")
+
+def section_counter(section: str) -> str:
+    return f"section:{section}"
+
+def project_counter(project_id: int) -> str:
+    return f"project:{project_id}"
+
+def bucket_start(granularity: str, moment: datetime) -> datetime:
+    start = moment.replace(minute=0, second=0, microsecond=0)
+    return start.replace(hour=0) if granularity == "day" else start
+
+class ViewCounter:
+    """Portfolio view counts, kept in memory and written in periodic batches
+
+    Recording a view increments a dictionary entry, with no I/O, no await
+    and no clock read, so reads stay reads. Every `flush_interval` seconds,
+    and at every hour boundary, the pending counts are swapped out and added
+    to the hourly and daily buckets of the hour they were recorded in, in one
+    repository call (a single bulk_write of $inc upserts on MongoDB). Each
+    worker process counts on its own and the additions commute, so workers
+    never coordinate.
+
+    A flush that fails puts its counts back to be retried with the next
+    one; a crash loses at most the views of one interval.
+    """
+
+    def __init__(self, repository, flush_interval: float = 10.0):
+        self.repository = repository
+        self.flush_interval = flush_interval
+        # counter -> views not yet written, all recorded during `self.hour`
+        self.pending: Dict[str, int] = {}
+        self.hour = self._current_hour()
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    @staticmethod
+    def _current_hour() -> datetime:
+        return datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+
+    def record(self, counter: str):
+        self.pending[counter] = self.pending.get(counter, 0) + 1
+        self.recorded += 1
+
+    def record_section(self, section: str):
+        self.record(section_counter(section))
+
+    def record_project(self, project_id: int):
+        self.record(project_counter(project_id))
+
+    async def flush(self):
+        """Write every pending count; on failure they stay pending"""
+        hour, self.hour = self.hour, self._current_hour()
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        try:
+            await self.repository.add([(granularity, bucket_start(granularity, hour), pending) for granularity in GRANULARITIES])
+        except Exception as e:
+            self.failed_flushes += 1
+            logger.error(f"View count flush failed, retrying with the next one: {e}")
+            # Put the counts back, along with views recorded meanwhile; they
+            # will be written to the hour of the retry
+            for counter, count in pending.items():
+                self.pending[counter] = self.pending.get(counter, 0) + count
+            return
+        self.written += sum(pending.values())
+        self.flushes += 1
+
+    async def _run(self):
+        while True:
+            until_next_hour = (self.hour + timedelta(hours=1) - datetime.utcnow()).total_seconds()
+            await asyncio.sleep(max(min(self.flush_interval, until_next_hour), 0))
+            await self.flush()
+
+    async def stop(self):
+        """Stop the periodic flush and write what is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        logger.info(f"View counts flushed ({self.written} written, {self.pending_views()} unwritten)")
+
+    def pending_views(self) -> int:
+        return sum(self.pending.values())
+
+    async def report(self, granularity: str, since: datetime, until: datetime) -> dict:
+        """Written view counts per bucket in [since, until), with totals per section and project"""
+        buckets = []
+        sections: Dict[str, int] = {}
+        projects: Dict[str, int] = {}
+        for bucket in await self.repository.buckets(granularity, since, until):
+            bucket_sections, bucket_projects = {}, {}
+            for counter, count in bucket["counts"].items():
+                kind, _, name = counter.partition(":")
+                if kind == "section":
+                    bucket_sections[name] = count
+                    sections[name] = sections.get(name, 0) + count
+                elif kind == "project":
+                    bucket_projects[name] = count
+                    projects[name] = projects.get(name, 0) + count
+            buckets.append({
+                "start": bucket["start"],
+                "views": sum(bucket_sections.values()),
+                "sections": bucket_sections,
+                "projects": bucket_projects,
+            })
+        return {
+            "granularity": granularity,
+            "since": since,
+            "until": until,
+            "views": sum(sections.values()),
+            "sections": sections,
+            "projects": projects,
+            "buckets": buckets,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending_views(),
+            "recorded": self.recorded,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+        }
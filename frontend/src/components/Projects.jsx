@@ -4,6 +4,7 @@ import { Badge } from './ui/badge';
 import { Button } from './ui/button';
 import { ExternalLink, Github, Filter } from 'lucide-react';
 import { useProjects } from '../hooks/usePortfolioData';
+import { portfolioService } from '../services/api';
 import LoadingSpinner from './LoadingSpinner';
 import ErrorMessage from './ErrorMessage';
 
@@ -114,7 +115,10 @@ const Projects = () => {
                   </Button>
                   <Button
                     size="sm"
-                    onClick={() => window.open(project.github, '_blank')}
+                    onClick={() => {
+                      portfolioService.recordProjectView(project.id);
+                      window.open(project.github, '_blank');
+                    }}
                     className="flex-1"
                   >
                     <ExternalLink className="mr-2 h-4 w-4" />
@@ -37,7 +37,7 @@ export const usePersonalInfo = () => {
       try {
         setLoading(true);
         setError(null);
-        const data = await portfolioService.getPersonalInfo();
+        const data = await portfolioService.getPageSection('personal');
         setPersonalInfo(data);
       } catch (err) {
         setError(err.message || 'Failed to fetch personal information');
@@ -63,7 +63,9 @@ export const useProjects = (category = null) => {
       try {
         setLoading(true);
         setError(null);
-        const data = await portfolioService.getProjects(category);
+        const data = category
+          ? await portfolioService.getProjects(category)
+          : await portfolioService.getPageSection('projects');
         setProjects(data);
       } catch (err) {
         setError(err.message || 'Failed to fetch projects');
@@ -89,7 +91,7 @@ export const useExperience = () => {
       try {
         setLoading(true);
         setError(null);
-        const data = await portfolioService.getExperience();
+        const data = await portfolioService.getPageSection('experience');
         setExperience(data);
       } catch (err) {
         setError(err.message || 'Failed to fetch experience');
@@ -36,8 +36,43 @@ api.interceptors.response.use(
   }
 );
 
+// Sections every page shows, fetched together by getPageSection()
+const PAGE_SECTIONS = ['personal', 'projects', 'experience'];
+// The batch request in flight, if any; cleared once it settles so later calls fetch fresh data
+let pageData = null;
+
 // Portfolio API service
 export const portfolioService = {
+  // Get several sections in one request; each result has its own status
+  async getBatch(sections) {
+    try {
+      const response = await api.get('/portfolio/batch', {
+        params: { section: sections },
+        // section=personal&section=projects, as the API expects
+        paramsSerializer: { indexes: null },
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching portfolio sections:', error);
+      throw error;
+    }
+  },
+
+  // Get one of the page's sections; components mounting together share one batch request
+  async getPageSection(section) {
+    if (!pageData) {
+      pageData = this.getBatch(PAGE_SECTIONS).finally(() => {
+        pageData = null;
+      });
+    }
+    const data = await pageData;
+    const result = data.results.find((item) => item.section === section);
+    if (!result || result.status !== 200) {
+      throw new Error(result?.body?.detail || `Failed to fetch ${section}`);
+    }
+    return result.body;
+  },
+
   // Get complete portfolio data
   async getPortfolio() {
     try {
@@ -103,6 +138,15 @@ export const portfolioService = {
       console.error('Error fetching contact messages:', error);
       throw error;
     }
+  },
+
+  // Count a project view; failures are logged and never shown to the visitor
+  async recordProjectView(projectId) {
+    try {
+      await api.post('/analytics/views', { project_id: projectId });
+    } catch (error) {
+      console.error('Error recording project view:', error);
+    }
   }
 };
 
@@ -0,0 +1,69 @@
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from tests.support import MONGO_URL, run
+
+@pytest.fixture
+def portfolio_client():
+    """Factory for (service, TestClient) on an app serving the portfolio routes from memory storage
+
+    Extra routers (e.g. analytics) can be mounted alongside. The app has no
+    lifespan, so background work only runs when a test starts it.
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from repositories.memory import MemoryRepositories
+    from routes.portfolio_routes import router
+    from services.portfolio_service import PortfolioService
+
+    def connect(cache_ttl=None, routers=()):
+        app = FastAPI()
+        for included in (router, *routers):
+            app.include_router(included)
+        service = app.state.portfolio_service = PortfolioService(MemoryRepositories(), cache_ttl=cache_ttl)
+        return service, TestClient(app)
+
+    return connect
+
+@pytest.fixture
+def mongo_db():
+    """Factory for a throwaway database on a real MongoDB; skips when none is reachable"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    name = f"portfolio_test_{uuid.uuid4().hex[:8]}"
+
+    async def ping():
+        client = AsyncIOMotorClient(MONGO_URL, serverSelectionTimeoutMS=500)
+        try:
+            await client.admin.command("ping")
+        finally:
+            client.close()
+
+    try:
+        run(ping())
+    except Exception:
+        pytest.skip(f"MongoDB not reachable at {MONGO_URL}")
+
+    clients = []
+
+    def connect():
+        client = AsyncIOMotorClient(MONGO_URL)
+        clients.append(client)
+        return client[name]
+
+    yield connect
+
+    async def drop():
+        client = AsyncIOMotorClient(MONGO_URL)
+        await client.drop_database(name)
+        client.close()
+
+    run(drop())
+    for client in clients:
+        client.close()
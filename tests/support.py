@@ -0,0 +1,8 @@
+import asyncio
+import os
+
+MONGO_URL = os.environ.get("TEST_MONGO_URL", "mongodb://localhost:27017")
+
+def run(coro):
+    """Run a coroutine on a fresh event loop (Motor clients are loop-bound)"""
+    return asyncio.run(coro)
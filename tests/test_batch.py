@@ -0,0 +1,65 @@
+from tests.support import run
+
+def _count_reads(service) -> list:
+    reads = []
+    repository = service.repositories.portfolio
+    read = repository.read
+
+    async def counting_read(sections):
+        reads.append(tuple(sections))
+        return await read(sections)
+
+    repository.read = counting_read
+    return reads
+
+def test_batch_matches_the_section_endpoints_from_one_read(portfolio_client):
+    service, client = portfolio_client(cache_ttl=0)
+    run(service.initialize_snapshot())
+    reads = _count_reads(service)
+
+    response = client.get("/api/portfolio/batch", params={"section": ["personal", "projects", "experience"]})
+    assert response.status_code == 200
+    assert len(reads) == 1 and set(reads[0]) == {"personal", "projects", "experience"}
+
+    batch = response.json()
+    assert batch["version"] == 0
+    assert [(result["section"], result["status"]) for result in batch["results"]] == [
+        ("personal", 200), ("projects", 200), ("experience", 200)
+    ]
+    for result in batch["results"]:
+        assert result["body"] == client.get(f"/api/portfolio/{result['section']}").json()
+
+def test_results_fail_individually(portfolio_client):
+    service, client = portfolio_client()
+    run(service.initialize_snapshot())
+    params = {"section": ["personal", "blog", "projects"], "limit": 2, "cursor": "not-a-cursor"}
+    results = client.get("/api/portfolio/batch", params=params).json()["results"]
+
+    assert [result["status"] for result in results] == [200, 400, 400]
+    assert results[1]["body"] == {"detail": "Unknown section"}
+    assert results[2]["body"] == {"detail": "Invalid cursor"}
+
+def test_project_filters_and_pages(portfolio_client):
+    service, client = portfolio_client()
+    run(service.initialize_snapshot())
+    first = client.get("/api/portfolio/batch", params={"section": "projects", "technology": "python", "limit": 1}).json()
+    projects = first["results"][0]
+    expected = client.get("/api/portfolio/projects", params={"technology": "python"}).json()
+    assert projects["body"] == expected[:1]
+
+    params = {"section": "projects", "technology": "python", "limit": 1, "cursor": projects["next_cursor"]}
+    second = client.get("/api/portfolio/batch", params=params).json()["results"][0]
+    assert second["body"] == expected[1:2]
+
+def test_batch_supports_conditional_requests_and_limits_its_size(portfolio_client):
+    service, client = portfolio_client()
+    assert client.get("/api/portfolio/batch", params={"section": "personal"}).status_code == 404
+
+    run(service.initialize_snapshot())
+    response = client.get("/api/portfolio/batch", params={"section": ["portfolio", "personal"]})
+    again = client.get(
+        "/api/portfolio/batch", params={"section": ["portfolio", "personal"]},
+        headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert again.status_code == 304
+    assert client.get("/api/portfolio/batch", params={"section": ["personal"] * 11}).status_code == 400
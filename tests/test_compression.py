@@ -0,0 +1,80 @@
+import gzip
+
+from tests.support import run
+
+from middleware.compression import NegotiatedGZipMiddleware
+from models.portfolio import ProjectUpdate
+from services.compression import ENCODINGS, accepted_encoding
+
+def test_accept_encoding_negotiation():
+    assert accepted_encoding(None) is None
+    assert accepted_encoding("gzip, deflate, br") == "gzip"
+    assert accepted_encoding("GZIP;q=0.5") == "gzip"
+    assert accepted_encoding("gzip;q=0") is None
+    assert accepted_encoding("br, identity") is None
+    assert accepted_encoding("*") is not None
+    # Any coding but gzip: zstd where it is available, otherwise none
+    assert accepted_encoding("*, gzip;q=0") == ("zstd" if "zstd" in ENCODINGS else None)
+    assert accepted_encoding("zstd, gzip;q=0.5", ("gzip",)) == "gzip"
+
+def test_dynamic_responses_follow_q_values():
+    from fastapi import FastAPI
+    from fastapi.responses import PlainTextResponse
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    app.add_middleware(NegotiatedGZipMiddleware, minimum_size=100)
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse("dynamic " * 100)
+
+    client = TestClient(app)
+    for accept_encoding, expected in [
+        ("gzip", "gzip"),
+        ("zstd, gzip;q=0.5", "gzip"),
+        ("gzip;q=0", None),
+        ("*, gzip;q=0", None),
+        ("identity", None),
+    ]:
+        response = client.get("/text", headers={"Accept-Encoding": accept_encoding})
+        assert response.headers.get("content-encoding") == expected, accept_encoding
+        assert response.text == "dynamic " * 100
+
+def test_portfolio_is_sent_compressed_with_its_own_etag(portfolio_client):
+    service, client = portfolio_client()
+    compressed = client.get("/api/portfolio/", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/api/portfolio/", headers={"Accept-Encoding": "identity"})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.json() == plain.json()
+    assert int(compressed.headers["content-length"]) < len(plain.content)
+    assert compressed.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+    # A tag cached under either coding revalidates the other
+    revalidated = client.get("/api/portfolio/", headers={"Accept-Encoding": "identity", "If-None-Match": compressed.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == plain.headers["etag"]
+
+def test_small_bodies_are_not_compressed(portfolio_client):
+    service, client = portfolio_client()
+    client.get("/api/portfolio/")
+    response = client.get("/api/portfolio/personal", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert not response.headers["etag"].endswith('-gzip"')
+
+def test_compressed_bodies_are_reused_until_the_version_changes(portfolio_client):
+    service, client = portfolio_client()
+    snapshot = run(service.initialize_snapshot())
+    client.get("/api/portfolio/projects", headers={"Accept-Encoding": "gzip"})
+    body = snapshot.section_json("projects")
+    first = snapshot.compressed(body, "gzip")
+    assert snapshot.compressed(body, "gzip") is first
+    assert gzip.decompress(first) == body
+
+    run(service.update_entry("projects", 1, ProjectUpdate(title="Renamed")))
+    response = client.get("/api/portfolio/projects", headers={"Accept-Encoding": "gzip"})
+    assert response.json()[0]["title"] == "Renamed"
+    assert response.headers["x-portfolio-version"] == str(snapshot.version + 1)
@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+import pytest
+
+from tests.support import run
+
+from services.contact_buffer import ContactBufferFull, ContactWriteBuffer
+
+class RecordingRepository:
+    """Contact storage recording each insert_many batch; the first `failures` calls raise"""
+
+    def __init__(self, failures: int = 0):
+        self.batches = []
+        self.failures = failures
+        self.attempts = 0
+
+    async def insert_many(self, documents):
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("storage unreachable")
+        self.batches.append(list(documents))
+
+def _message(i: int) -> dict:
+    return {"id": str(i), "name": "Sender", "email": "sender@example.com", "message": "Hello"}
+
+async def _wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.005)
+
+def test_a_full_batch_is_written_without_waiting_for_the_interval():
+    async def scenario():
+        repository = RecordingRepository()
+        buffer = ContactWriteBuffer(repository, batch_size=3, flush_interval=10)
+        buffer.start()
+        for i in range(4):
+            await buffer.submit(_message(i))
+        await _wait_for(lambda: repository.batches)
+        first = [len(batch) for batch in repository.batches]
+        await buffer.stop()
+        return first, repository.batches, buffer.stats()
+
+    first, batches, stats = run(scenario())
+    assert first == [3]
+    assert [len(batch) for batch in batches] == [3, 1]
+    assert (stats["written"], stats["batches"], stats["queued"]) == (4, 2, 0)
+
+def test_a_partial_batch_is_written_after_the_interval():
+    async def scenario():
+        repository = RecordingRepository()
+        buffer = ContactWriteBuffer(repository, batch_size=100, flush_interval=0.05)
+        buffer.start()
+        started = time.monotonic()
+        await buffer.submit(_message(1))
+        await buffer.submit(_message(2))
+        await _wait_for(lambda: repository.batches)
+        elapsed = time.monotonic() - started
+        await buffer.stop()
+        return repository.batches, elapsed
+
+    batches, elapsed = run(scenario())
+    assert [[m["id"] for m in batch] for batch in batches] == [["1", "2"]]
+    assert 0.04 <= elapsed < 1
+
+def test_a_full_queue_rejects_submissions():
+    async def scenario():
+        # Not started, so nothing drains the queue
+        buffer = ContactWriteBuffer(RecordingRepository(), max_queue=1, enqueue_timeout=0.01)
+        await buffer.submit(_message(1))
+        with pytest.raises(ContactBufferFull):
+            await buffer.submit(_message(2))
+        return buffer.stats()
+
+    stats = run(scenario())
+    assert (stats["accepted"], stats["rejected"], stats["queued"]) == (1, 1, 1)
+
+def test_the_contact_route_sheds_load_when_the_queue_is_full(portfolio_client, monkeypatch):
+    monkeypatch.setenv("CONTACT_WRITE_MODE", "buffered")
+    monkeypatch.setenv("CONTACT_BUFFER_MAX_QUEUE", "1")
+    monkeypatch.setenv("CONTACT_BUFFER_ENQUEUE_TIMEOUT_MS", "10")
+    _, client = portfolio_client()
+    message = {"name": "Sender", "email": "sender@example.com", "message": "Hello"}
+
+    assert client.post("/api/portfolio/contact", json=message).status_code == 200
+    response = client.post("/api/portfolio/contact", json=message)
+    assert response.status_code == 503 and response.headers["retry-after"] == "1"
+
+def test_failed_writes_are_retried_up_to_the_limit():
+    async def scenario(failures):
+        repository = RecordingRepository(failures)
+        buffer = ContactWriteBuffer(repository, flush_interval=0.001, max_retries=3)
+        buffer.start()
+        await buffer.submit(_message(1))
+        await buffer.stop()
+        return repository, buffer.stats()
+
+    recovered, stats = run(scenario(2))
+    assert recovered.attempts == 3 and len(recovered.batches) == 1
+    assert (stats["written"], stats["failed"]) == (1, 0)
+
+    dropped, stats = run(scenario(5))
+    assert dropped.attempts == 3 and not dropped.batches
+    assert (stats["written"], stats["failed"]) == (0, 1)
+
+def test_stop_drains_every_pending_message_at_once():
+    async def scenario():
+        repository = RecordingRepository()
+        buffer = ContactWriteBuffer(repository, batch_size=4, flush_interval=10)
+        buffer.start()
+        for i in range(10):
+            await buffer.submit(_message(i))
+        started = time.monotonic()
+        await buffer.stop()
+        return repository.batches, time.monotonic() - started
+
+    batches, elapsed = run(scenario())
+    assert [m["id"] for batch in batches for m in batch] == [str(i) for i in range(10)]
+    # The partial last batch does not wait out the 10 s interval
+    assert elapsed < 1
+
+def test_stop_gives_up_when_storage_stays_down():
+    async def scenario():
+        repository = RecordingRepository(failures=1000)
+        buffer = ContactWriteBuffer(repository, flush_interval=0.001, max_retries=1000, drain_timeout=0.05)
+        buffer.start()
+        for i in range(3):
+            await buffer.submit(_message(i))
+        started = time.monotonic()
+        await buffer.stop()
+        return time.monotonic() - started, buffer.stats()
+
+    elapsed, stats = run(scenario())
+    assert elapsed < 1
+    assert (stats["written"], stats["failed"]) == (0, 3)
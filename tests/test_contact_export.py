@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+import resource
+from datetime import datetime, timedelta
+
+from tests.support import run
+
+from services.export import CHUNK_SIZE, export_contact_messages
+
+ROWS = 1_000_000
+
+async def _inbox(count):
+    """Stand-in for a Motor cursor: yields documents one at a time"""
+    start = datetime(2024, 1, 1)
+    second = timedelta(seconds=1)
+    for i in range(count):
+        yield {
+            "id": "%08d" % i,
+            "name": "Sender",
+            "email": "sender@example.com",
+            "message": "Hello, I'd like to talk about a \"data\" role.\nThanks",
+            "created_at": start + i * second,
+            "read": not i % 2,
+        }
+
+async def _consume(stream):
+    rows = 0
+    largest = 0
+    tail = b""
+    async for chunk in stream:
+        rows += chunk.count(b"\n")
+        largest = max(largest, len(chunk))
+        tail = chunk
+    return rows, largest, tail
+
+def _peak_rss_bytes():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _measure(output):
+    # Warm up so one-off allocations are not counted as growth
+    run(_consume(export_contact_messages(_inbox(10_000), output)))
+    before = _peak_rss_bytes()
+    result = run(_consume(export_contact_messages(_inbox(ROWS), output)))
+    return result, _peak_rss_bytes() - before
+
+def test_ndjson_export_of_a_million_rows_uses_constant_memory():
+    (lines, largest, tail), growth = _measure("ndjson")
+    assert lines == ROWS
+    assert largest < 2 * CHUNK_SIZE
+    assert json.loads(tail.splitlines()[-1])["id"] == f"{ROWS - 1:08d}"
+    # The full export is well over 100 MB; streaming must not come close
+    assert growth < 16 * 1024 * 1024
+
+def test_csv_export_of_a_million_rows_uses_constant_memory():
+    (lines, largest, _), growth = _measure("csv")
+    # One header line plus two physical lines per row (the message has a newline)
+    assert lines == 1 + 2 * ROWS
+    assert largest < 2 * CHUNK_SIZE
+    assert growth < 16 * 1024 * 1024
+
+def test_export_formats():
+    async def collect(output, count):
+        return b"".join([chunk async for chunk in export_contact_messages(_inbox(count), output)]).decode()
+
+    ndjson = [json.loads(line) for line in run(collect("ndjson", 3)).splitlines()]
+    assert list(ndjson[0]) == ["id", "name", "email", "message", "created_at", "read"]
+    assert ndjson[1]["created_at"] == "2024-01-01T00:00:01"
+
+    rows = list(csv.DictReader(io.StringIO(run(collect("csv", 3)))))
+    assert len(rows) == 3
+    assert rows[0]["message"].endswith("role.\nThanks")
+    assert rows[0]["read"] == "true"
+
+    assert run(collect("csv", 0)) == "id,name,email,message,created_at,read\n"
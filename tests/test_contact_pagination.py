@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+
+from tests.support import run
+
+from database.indexes import plan_stages
+from services.pagination import keyset_filter, keyset_sort
+from services.portfolio_service import PortfolioService
+
+def _messages(count, start=datetime(2024, 1, 1)):
+    return [
+        {
+            "id": f"{i:08d}",
+            "name": f"Sender {i}",
+            "email": f"sender{i}@example.com",
+            "message": "Hello",
+            # Pairs share a timestamp so the id tie-breaker is exercised
+            "created_at": start + timedelta(minutes=i // 2),
+            "read": i % 3 == 0,
+        }
+        for i in range(count)
+    ]
+
+def test_pages_cover_every_message_once(mongo_db):
+    async def scenario():
+        service = PortfolioService(mongo_db())
+        await service.ensure_indexes()
+        await service.repositories.contacts.insert_many(_messages(53))
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = await service.get_contact_messages_page(limit=10, cursor=cursor)
+            seen.extend(message.id for message in page)
+            if not cursor:
+                break
+        return seen
+
+    seen = run(scenario())
+    assert seen == sorted((f"{i:08d}" for i in range(53)), reverse=True)
+
+def test_read_filter(mongo_db):
+    async def scenario():
+        service = PortfolioService(mongo_db())
+        await service.ensure_indexes()
+        await service.repositories.contacts.insert_many(_messages(30))
+        unread, _ = await service.get_contact_messages_page(limit=100, read=False)
+        read, _ = await service.get_contact_messages_page(limit=100, read=True)
+        return unread, read
+
+    unread, read = run(scenario())
+    assert len(unread) == 20 and not any(m.read for m in unread)
+    assert len(read) == 10 and all(m.read for m in read)
+
+def test_pagination_queries_use_indexes(mongo_db):
+    async def scenario():
+        service = PortfolioService(mongo_db())
+        await service.ensure_indexes()
+        await service.repositories.contacts.insert_many(_messages(200))
+        _, cursor = await service.get_contact_messages_page(limit=10)
+
+        plans = []
+        for query in (
+            {},
+            keyset_filter("created_at", cursor),
+            {"read": False},
+            {"read": True, **keyset_filter("created_at", cursor)},
+        ):
+            explain = await service.repositories.contacts.collection.find(query) \
+                .sort(keyset_sort("created_at")).limit(11).explain()
+            plans.append(explain["queryPlanner"]["winningPlan"])
+        return plans
+
+    for plan in run(scenario()):
+        stages = plan_stages(plan)
+        assert "COLLSCAN" not in stages
+        assert "SORT" not in stages
+        assert "IXSCAN" in stages
+
+def test_contact_route_pages_and_reports_bad_cursors(portfolio_client):
+    service, client = portfolio_client()
+    run(service.repositories.contacts.insert_many(_messages(5)))
+
+    first = client.get("/api/portfolio/contact", params={"limit": 3})
+    assert [m["id"] for m in first.json()] == ["00000004", "00000003", "00000002"]
+    second = client.get("/api/portfolio/contact", params={"limit": 3, "cursor": first.headers["x-next-cursor"]})
+    assert [m["id"] for m in second.json()] == ["00000001", "00000000"]
+    assert "x-next-cursor" not in second.headers
+
+    assert client.get("/api/portfolio/contact", params={"cursor": "not-a-cursor"}).json() == {"detail": "Invalid cursor"}
+
+def test_a_malformed_stored_message_is_not_reported_as_a_bad_cursor(portfolio_client):
+    service, client = portfolio_client()
+    broken = {**_messages(1)[0], "email": None}
+    run(service.repositories.contacts.insert(broken))
+    assert client.get("/api/portfolio/contact").status_code == 500
+
+def test_browsers_can_read_the_cursor_header(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    import server
+
+    with TestClient(server.app) as client:
+        response = client.get("/api/portfolio/contact", headers={"Origin": "https://example.com"})
+    assert "x-next-cursor" in response.headers["access-control-expose-headers"].lower()
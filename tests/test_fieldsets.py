@@ -0,0 +1,70 @@
+import pytest
+
+from tests.support import run
+
+from services.fieldsets import fieldset_projection, include_spec, parse_fields, trimmed_model
+
+def _trim(portfolio: dict, fields: dict) -> dict:
+    """Expected response: the full portfolio with only the selected fields kept"""
+    trimmed = {}
+    for name, subfields in fields.items():
+        value = portfolio[name]
+        if subfields is None:
+            trimmed[name] = value
+        elif isinstance(value, list):
+            trimmed[name] = [{field: entry[field] for field in subfields} for entry in value]
+        else:
+            trimmed[name] = {field: value[field] for field in subfields}
+    return trimmed
+
+def test_parse_fields_orders_and_merges_paths():
+    fieldset = parse_fields(" personal.name, projects.category,projects.title,,version ")
+    assert fieldset == (("personal", ("name",)), ("projects", ("title", "category")), ("version", None))
+    # A whole field wins over some of its fields, in either order
+    assert parse_fields("projects.title,projects") == parse_fields("projects,projects.title") == (("projects", None),)
+
+    assert include_spec(fieldset) == {"personal": {"name"}, "projects": {"__all__": {"title", "category"}}, "version": True}
+    assert fieldset_projection(fieldset) == {
+        "_id": 0, "id": 1, "updated_at": 1, "version": 1, "personal.name": 1, "projects.title": 1, "projects.category": 1
+    }
+    assert trimmed_model(fieldset) is trimmed_model(parse_fields("version,projects.category,projects.title,personal.name"))
+
+@pytest.mark.parametrize("spec", ["projects.nope", "blog", "version.major", "projects.title.x", "", " , "])
+def test_parse_fields_rejects_unknown_fields(spec):
+    with pytest.raises(ValueError):
+        parse_fields(spec)
+
+@pytest.mark.parametrize("cache_ttl", [None, 0])
+def test_fields_trim_the_portfolio(portfolio_client, cache_ttl):
+    service, client = portfolio_client(cache_ttl)
+    full = client.get("/api/portfolio/").json()
+
+    response = client.get("/api/portfolio/", params={"fields": "projects.title,projects.category,personal.name"})
+    assert response.status_code == 200
+    assert response.json() == _trim(full, {"personal": ["name"], "projects": ["title", "category"]})
+    assert response.headers["etag"] != client.get("/api/portfolio/").headers["etag"]
+
+    response = client.get("/api/portfolio/", params={"fields": "experience,updated_at"})
+    assert response.json() == _trim(full, {"experience": None, "updated_at": None})
+
+def test_fields_on_an_empty_database_seed_the_portfolio(portfolio_client):
+    _, client = portfolio_client(cache_ttl=0)
+    response = client.get("/api/portfolio/", params={"fields": "personal.name"})
+    assert response.status_code == 200
+    assert response.json() == {"personal": {"name": client.get("/api/portfolio/personal").json()["name"]}}
+
+def test_fields_load_only_the_sections_they_use(portfolio_client):
+    service, client = portfolio_client()
+    run(service.initialize_snapshot())
+    service.cache.invalidate()
+
+    response = client.get("/api/portfolio/", params={"fields": "projects.title"})
+    assert set(service.cache.snapshot.sections) == {"projects"}
+    again = client.get("/api/portfolio/", params={"fields": "projects.title"}, headers={"If-None-Match": response.headers["etag"]})
+    assert again.status_code == 304
+
+def test_unknown_fields_are_rejected(portfolio_client):
+    _, client = portfolio_client()
+    response = client.get("/api/portfolio/", params={"fields": "projects.title,projects.secret,blog"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: projects.secret, blog"
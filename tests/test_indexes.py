@@ -0,0 +1,34 @@
+from tests.support import run
+
+from database.indexes import INDEXES, apply_indexes, check_query_plans, index_report
+
+def test_apply_indexes_is_idempotent(mongo_db):
+    async def scenario():
+        db = mongo_db()
+        await apply_indexes(db)
+        await apply_indexes(db)
+        return await index_report(db)
+
+    report = run(scenario())
+    assert set(report) == set(INDEXES)
+    assert all(not drift["missing"] and not drift["extra"] for drift in report.values())
+
+def test_index_report_flags_drift(mongo_db):
+    async def scenario():
+        db = mongo_db()
+        await apply_indexes(db)
+        await db.contact_messages.drop_index("read_created_at_id")
+        await db.contact_messages.create_index("email", name="email_1")
+        return await index_report(db)
+
+    drift = run(scenario())["contact_messages"]
+    assert drift == {"missing": ["read_created_at_id"], "extra": ["email_1"]}
+
+def test_query_shapes_hit_indexes(mongo_db):
+    async def scenario():
+        db = mongo_db()
+        await apply_indexes(db)
+        return await check_query_plans(db)
+
+    for result in run(scenario()):
+        assert result["indexed"], result
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from tests.support import run
+
+from database.seed_data import get_portfolio_seed_data
+from models.portfolio import PORTFOLIO_ID, ProjectUpdate
+from services.portfolio_service import PortfolioService
+from services.singleflight import SingleFlight
+
+def test_singleflight_coalesces_concurrent_calls():
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("key", load) for _ in range(50)))
+        return flight, results
+
+    flight, results = run(scenario())
+    assert results == [1] * 50
+    assert (flight.started, flight.coalesced) == (1, 49)
+
+def test_singleflight_shares_errors_and_forgets_finished_calls():
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("key", fail) for _ in range(5)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.started == 1
+        # A later call starts a fresh load
+        with pytest.raises(RuntimeError):
+            await flight.do("key", fail)
+        return flight.started
+
+    assert run(scenario()) == 2
+
+def test_singleflight_waiter_cancellation_does_not_cancel_load():
+    async def load():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def scenario():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("key", load))
+        second = asyncio.ensure_future(flight.do("key", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert run(scenario()) == "done"
+
+def test_concurrent_cold_start_creates_one_portfolio(mongo_db):
+    async def scenario():
+        db = mongo_db()
+        # Several services stand in for separate worker processes
+        services = [PortfolioService(db) for _ in range(4)]
+        await services[0].ensure_indexes()
+        snapshots = await asyncio.gather(*(
+            service.initialize_snapshot() for service in services for _ in range(25)
+        ))
+        count = await db.portfolio.count_documents({})
+        return services, snapshots, count
+
+    services, snapshots, count = run(scenario())
+    assert count == 1
+    assert {snapshot.id for snapshot in snapshots} == {PORTFOLIO_ID}
+    assert all(service.loads.started == 1 for service in services)
+
+def test_initialization_adopts_legacy_portfolio(mongo_db):
+    async def scenario():
+        db = mongo_db()
+        service = PortfolioService(db)
+        await service.ensure_indexes()
+        legacy = get_portfolio_seed_data().dict()
+        legacy["id"] = "legacy-id"
+        legacy["personal"]["name"] = "Legacy Owner"
+        await db.portfolio.insert_one(legacy)
+        snapshot = await service.initialize_snapshot()
+        return snapshot, await db.portfolio.count_documents({})
+
+    snapshot, count = run(scenario())
+    assert count == 1
+    assert snapshot.id == PORTFOLIO_ID
+    assert snapshot.personal.name == "Legacy Owner"
+
+def _unversioned_legacy_portfolio(portfolio_id: str) -> dict:
+    """A portfolio as releases before versioning stored it"""
+    legacy = get_portfolio_seed_data().dict()
+    legacy["id"] = portfolio_id
+    del legacy["version"]
+    return legacy
+
+def test_edits_succeed_on_an_adopted_unversioned_portfolio(mongo_db):
+    async def scenario():
+        db = mongo_db()
+        service = PortfolioService(db)
+        await db.portfolio.insert_one(_unversioned_legacy_portfolio("legacy-id"))
+        await service.ensure_indexes()
+        snapshot = await service.initialize_snapshot()
+        assert snapshot.version == 0
+        edited = await service.update_entry("projects", 1, ProjectUpdate(title="Renamed"), expected_version=0)
+        ids = [project.id for project in edited.projects]
+        reordered = await service.reorder_entries("projects", ids[::-1], expected_version=1)
+        portfolio = reordered.portfolio.copy(update={"version": 2})
+        replaced = await service.update_portfolio(portfolio)
+        return edited, reordered, replaced
+
+    edited, reordered, replaced = run(scenario())
+    assert edited.version == 1 and edited.projects[0].title == "Renamed"
+    assert reordered.version == 2 and reordered.projects[-1].title == "Renamed"
+    assert replaced.version == 3
+
+def test_replace_succeeds_on_an_unversioned_portfolio_under_the_fixed_id(mongo_db):
+    async def scenario():
+        db = mongo_db()
+        service = PortfolioService(db)
+        await db.portfolio.insert_one(_unversioned_legacy_portfolio(PORTFOLIO_ID))
+        # prepare() backfills even when nothing needs adopting
+        await service.ensure_indexes()
+        portfolio = (await service.initialize_snapshot()).portfolio
+        return await service.update_portfolio(portfolio), await db.portfolio.find_one({}, {"_id": 0, "version": 1})
+
+    replaced, stored = run(scenario())
+    assert replaced.version == 1 and stored == {"version": 1}
@@ -0,0 +1,42 @@
+import json
+
+from tests.support import MONGO_URL
+
+from benchmarks.load_benchmark import Endpoint, compare, main, percentile, summarize
+
+def test_summary_percentiles():
+    latencies = [i / 1000 for i in range(1, 101)]
+    result = summarize(Endpoint("portfolio", "GET", "/api/portfolio/"), 10, latencies, 2, 0.5)
+    assert percentile(sorted(latencies), 0.5) == 0.051
+    assert (result["requests"], result["errors"], result["rps"]) == (100, 2, 200.0)
+    assert (result["p50_ms"], result["p95_ms"], result["p99_ms"], result["max_ms"]) == (51.0, 96.0, 100.0, 100.0)
+
+def test_compare_matches_endpoint_and_concurrency():
+    baseline = {"results": [
+        {"endpoint": "portfolio", "concurrency": 10, "rps": 1000.0, "p95_ms": 2.0},
+        {"endpoint": "portfolio", "concurrency": 50, "rps": 900.0, "p95_ms": 5.0},
+    ]}
+    results = [
+        {"endpoint": "portfolio", "concurrency": 10, "rps": 800.0, "p95_ms": 3.0},
+        {"endpoint": "search", "concurrency": 10, "rps": 500.0, "p95_ms": 4.0},
+    ]
+    assert compare(results, baseline) == [
+        {"endpoint": "portfolio", "concurrency": 10, "rps_change": -0.2, "p95_change": 0.5},
+    ]
+
+def test_load_test_drives_every_route(mongo_db, monkeypatch, tmp_path):
+    mongo_db()  # skips unless MongoDB is reachable
+    monkeypatch.setenv("MONGO_URL", MONGO_URL)
+    output = tmp_path / "results.json"
+    report = main(["--requests", "6", "--concurrency", "1", "3", "--warmup", "1", "--output", str(output)])
+    assert json.loads(output.read_text()) == report
+    assert {r["endpoint"] for r in report["results"]} >= {"portfolio", "contact_create", "status_create", "project_patch"}
+    assert all(r["errors"] == 0 and r["requests"] == 6 for r in report["results"]), report["results"]
+
+def test_load_test_runs_on_the_memory_backend(monkeypatch):
+    for name in ("STORAGE_BACKEND", "DB_NAME", "SQLITE_PATH"):
+        monkeypatch.setenv(name, "")  # main() overwrites these; undone after the test
+    report = main(["--storage", "memory", "--requests", "4", "--concurrency", "2", "--warmup", "1"])
+    assert report["meta"]["storage"] == "memory"
+    assert {r["endpoint"] for r in report["results"]} >= {"portfolio", "project_patch", "contact_export", "status_stream"}
+    assert all(r["errors"] == 0 and r["requests"] == 4 for r in report["results"]), report["results"]
@@ -0,0 +1,87 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from tests.support import run
+
+from database.seed_data import get_portfolio_seed_data
+from middleware.metrics import MetricsMiddleware
+from repositories.memory import MemoryRepositories
+from services.errors import EntryNotFound
+from services.metrics import MetricsRegistry, instrument_repositories
+
+def _samples(registry):
+    """Sample lines of an exposition, keyed by name and labels"""
+    samples = {}
+    for line in registry.expose().decode().splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+def test_histogram_buckets_are_cumulative_and_upper_inclusive():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.labels("/a").observe(value)
+    registry.counter("hits_total", "Hits").labels().inc(3)
+
+    samples = _samples(registry)
+    assert samples['latency_seconds_bucket{route="/a",le="0.1"}'] == 2
+    assert samples['latency_seconds_bucket{route="/a",le="1"}'] == 3
+    assert samples['latency_seconds_bucket{route="/a",le="+Inf"}'] == 4
+    assert samples['latency_seconds_count{route="/a"}'] == 4
+    assert samples['latency_seconds_sum{route="/a"}'] == pytest.approx(2.65)
+    assert samples["hits_total"] == 3
+    assert "# TYPE latency_seconds histogram" in registry.expose().decode()
+
+def test_registering_again_reuses_the_metric():
+    registry = MetricsRegistry()
+    first = registry.counter("requests_total", "Requests", ("route",))
+    assert registry.counter("requests_total", "Requests", ("route",)) is first
+    with pytest.raises(ValueError):
+        registry.gauge("requests_total", "Requests", ("route",))
+
+def test_middleware_labels_requests_by_route_template():
+    registry = MetricsRegistry()
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware, registry=registry)
+    with TestClient(app) as client:
+        for path in ("/items/1", "/items/2", "/items/0", "/missing"):
+            client.get(path)
+        for method in ("PURGE", "FOO1", "FOO2"):
+            client.request(method, "/items/1")
+
+    samples = _samples(registry)
+    assert samples['http_requests_total{method="GET",route="/items/{item_id}",status="200"}'] == 2
+    assert samples['http_requests_total{method="GET",route="/items/{item_id}",status="404"}'] == 1
+    assert samples['http_requests_total{method="GET",route="unmatched",status="404"}'] == 1
+    assert samples['http_request_duration_seconds_count{method="GET",route="/items/{item_id}"}'] == 3
+    assert samples['http_requests_in_progress{method="GET"}'] == 0
+    # Arbitrary methods share one series
+    assert samples['http_requests_total{method="other",route="/items/{item_id}",status="405"}'] == 3
+    assert not any("PURGE" in name or "FOO" in name for name in samples)
+
+def test_storage_operations_are_timed_and_errors_counted():
+    registry = MetricsRegistry()
+    repositories = instrument_repositories(MemoryRepositories(), registry)
+
+    async def scenario():
+        await repositories.portfolio.create(get_portfolio_seed_data().model_dump())
+        await repositories.portfolio.read(("personal",))
+        with pytest.raises(EntryNotFound):
+            await repositories.portfolio.delete_entry("projects", 999)
+
+    run(scenario())
+    samples = _samples(registry)
+    labels = 'backend="memory",repository="portfolio"'
+    assert samples[f'storage_operation_duration_seconds_count{{{labels},operation="read"}}'] == 1
+    assert samples[f'storage_operation_duration_seconds_count{{{labels},operation="delete_entry"}}'] == 1
+    assert samples[f'storage_operation_errors_total{{{labels},operation="delete_entry",error="EntryNotFound"}}'] == 1
@@ -0,0 +1,93 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("uvicorn")
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+CHECK_INTERVAL = 0.2
+# Generous bound for slow machines: one check interval plus a reload and a request
+MAX_DELAY = CHECK_INTERVAL + 2.0
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@contextmanager
+def _workers(tmp_path, coherence_modes):
+    """Separate uvicorn processes sharing one SQLite database, like `uvicorn --workers`
+
+    Each gets its own port so the test can tell which worker answers.
+    """
+    processes, urls = [], []
+    for mode in coherence_modes:
+        port = _free_port()
+        env = {
+            **os.environ,
+            "STORAGE_BACKEND": "sqlite",
+            "SQLITE_PATH": str(tmp_path / "portfolio.sqlite3"),
+            # Long enough that only the version checks can explain convergence
+            "PORTFOLIO_CACHE_TTL": "300",
+            "PORTFOLIO_CACHE_COHERENCE": mode,
+            "PORTFOLIO_VERSION_CHECK_INTERVAL": str(CHECK_INTERVAL),
+        }
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env
+        ))
+        urls.append(f"http://127.0.0.1:{port}")
+    try:
+        deadline = time.monotonic() + 30
+        for url in urls:
+            while True:
+                try:
+                    if httpx.get(f"{url}/api/health/ready").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                assert time.monotonic() < deadline, "workers did not start"
+                time.sleep(0.1)
+        yield urls
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(10)
+
+def _first_title(url: str) -> str:
+    return httpx.get(f"{url}/api/portfolio/projects").json()[0]["title"]
+
+def test_workers_converge_on_edits_made_through_another(tmp_path):
+    # SQLite cannot push changes, so "watch" exercises the fallback to polling
+    with _workers(tmp_path, ["poll", "watch", "poll", "off"]) as urls:
+        # Seed once, then warm every worker's snapshot
+        assert httpx.get(f"{urls[0]}/api/portfolio/").status_code == 200
+        original = {_first_title(url) for url in urls}
+        assert len(original) == 1
+
+        response = httpx.patch(f"{urls[0]}/api/portfolio/projects/1", json={"title": "Renamed elsewhere"})
+        assert response.status_code == 200
+        edited = time.monotonic()
+
+        delays = {}
+        while len(delays) < 2 and time.monotonic() - edited < 10:
+            for url in urls[1:3]:
+                if url not in delays and _first_title(url) == "Renamed elsewhere":
+                    delays[url] = time.monotonic() - edited
+            time.sleep(0.02)
+
+        assert _first_title(urls[0]) == "Renamed elsewhere"
+        assert len(delays) == 2 and max(delays.values()) < MAX_DELAY, delays
+        # Without version checks a worker keeps serving its snapshot until the TTL runs out
+        assert _first_title(urls[3]) == original.pop()
+        stats = httpx.get(f"{urls[1]}/api/portfolio/cache/stats").json()["coherence"]
+        assert stats["mode"] == "poll" and stats["reloads"] == 1
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from tests.support import run
+
+from models.portfolio import Project, ProjectUpdate
+from services.errors import EntryConflict, VersionConflict
+from services.portfolio_service import PortfolioService
+
+def _project(project_id, title="Project"):
+    return Project(
+        id=project_id, title=title, description="Description", image="https://example.com/image.png",
+        github="https://github.com/example", technologies=["Python"], category="Data Analytics"
+    )
+
+def test_targeted_updates_bump_version(mongo_db):
+    async def scenario():
+        service = PortfolioService(mongo_db())
+        await service.ensure_indexes()
+        start = (await service.initialize_snapshot()).version
+        await service.add_entry("projects", _project(100))
+        await service.update_entry("projects", 100, ProjectUpdate(title="Renamed"), expected_version=start + 1)
+        await service.reorder_entries("projects", [100, 1, 2, 3, 4, 5])
+        snapshot = await service.delete_entry("projects", 3)
+        return start, snapshot
+
+    start, snapshot = run(scenario())
+    assert snapshot.version == start + 4
+    assert [p.id for p in snapshot.projects] == [100, 1, 2, 4, 5]
+    assert snapshot.projects[0].title == "Renamed"
+
+def test_stale_version_is_rejected(mongo_db):
+    async def scenario():
+        service = PortfolioService(mongo_db())
+        await service.ensure_indexes()
+        version = (await service.initialize_snapshot()).version
+        await service.update_entry("projects", 1, ProjectUpdate(title="First"), expected_version=version)
+        with pytest.raises(VersionConflict) as conflict:
+            await service.update_entry("projects", 1, ProjectUpdate(title="Second"), expected_version=version)
+        with pytest.raises(EntryConflict):
+            await service.add_entry("projects", _project(1))
+        return conflict.value
+
+    conflict = run(scenario())
+    assert conflict.current == conflict.expected + 1
+
+def test_concurrent_edits_at_same_version_have_one_winner(mongo_db):
+    async def scenario():
+        db = mongo_db()
+        service = PortfolioService(db)
+        await service.ensure_indexes()
+        version = (await service.initialize_snapshot()).version
+        # Separate services stand in for separate workers
+        editors = [PortfolioService(db) for _ in range(10)]
+        results = await asyncio.gather(
+            *(editor.update_entry("projects", 2, ProjectUpdate(title=f"Edit {i}"), expected_version=version)
+              for i, editor in enumerate(editors)),
+            return_exceptions=True
+        )
+        return results
+
+    results = run(scenario())
+    assert sum(not isinstance(r, Exception) for r in results) == 1
+    assert all(isinstance(r, VersionConflict) for r in results if isinstance(r, Exception))
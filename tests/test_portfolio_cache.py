@@ -0,0 +1,158 @@
+import asyncio
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from tests.support import run
+
+from database.seed_data import get_portfolio_seed_data
+from models.portfolio import ProjectUpdate
+from repositories.memory import MemoryRepositories
+from services import portfolio_cache
+from services.errors import VersionConflict
+from services.portfolio_cache import SECTIONS, PortfolioCache, PortfolioSnapshot
+from services.portfolio_service import PortfolioService
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(portfolio_cache, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+def _snapshot(version: int) -> PortfolioSnapshot:
+    return PortfolioSnapshot("portfolio", datetime(2024, 1, 1), {}, version)
+
+def test_snapshots_are_served_until_the_ttl_expires(clock):
+    async def scenario():
+        repositories = MemoryRepositories()
+        service = PortfolioService(repositories, cache_ttl=30)
+        first = await service.initialize_snapshot()
+
+        clock.now += 29
+        assert await service.get_snapshot() is first
+        # A write from another worker goes unseen until the TTL runs out
+        repositories.portfolio.document["version"] += 1
+        assert await service.get_snapshot() is first
+
+        clock.now += 1
+        second = await service.get_snapshot()
+        assert second is not first and second.version == first.version + 1
+
+        clock.now += 30
+        # Expired but unchanged: the version check restarts the TTL on the same snapshot
+        assert await service.get_snapshot() is second
+        assert second.loaded_at == clock.now
+        return service.cache.stats()
+
+    stats = run(scenario())
+    assert (stats["hits"], stats["misses"], stats["revalidations"], stats["invalidations"]) == (2, 1, 1, 1)
+
+def test_set_keeps_the_newer_snapshot(clock):
+    cache = PortfolioCache(ttl=30)
+    newer, older = _snapshot(5), _snapshot(4)
+    assert cache.set(newer) is newer
+    # A slow read finishing after a write returns its own snapshot but does not replace the newer one
+    assert cache.set(older) is older
+    assert cache.snapshot is newer
+    same = _snapshot(5)
+    cache.set(same)
+    assert cache.snapshot is same
+
+    assert not cache.confirm(4)
+    clock.now += 40
+    assert not cache.is_fresh(same)
+    assert cache.confirm(5) and cache.is_fresh(same)
+
+    disabled = PortfolioCache(ttl=0)
+    disabled.set(newer)
+    assert disabled.snapshot is None and not disabled.enabled
+
+def test_writes_replace_or_invalidate_the_cached_snapshot(clock):
+    async def scenario():
+        service = PortfolioService(MemoryRepositories(), cache_ttl=30)
+        start = await service.initialize_snapshot()
+
+        edited = await service.update_entry("projects", start.projects[0].id, ProjectUpdate(title="Renamed"))
+        # The edit caches the written portfolio, so the next read is a hit at the new version
+        assert edited.version == start.version + 1
+        assert await service.get_snapshot() is edited
+        assert edited.projects[0].title == "Renamed"
+
+        with pytest.raises(VersionConflict):
+            await service.update_portfolio(start.portfolio)
+        assert service.cache.snapshot is None
+
+        reloaded = await service.get_snapshot()
+        assert reloaded.version == edited.version and reloaded.projects[0].title == "Renamed"
+        return service.cache.stats()
+
+    stats = run(scenario())
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 1, 1)
+    assert stats["version"] == 1
+
+def test_stats_report_the_hit_ratio(clock):
+    cache = PortfolioCache(ttl=30)
+    assert cache.stats() == {
+        "enabled": True, "ttl_seconds": 30, "hits": 0, "revalidations": 0, "misses": 0,
+        "invalidations": 0, "hit_ratio": 0.0, "version": None
+    }
+    cache.set(_snapshot(3))
+    cache.hits, cache.misses = 6, 2
+    cache.touch()
+    stats = cache.stats()
+    assert stats["hit_ratio"] == 7 / 9 and stats["version"] == 3
+    cache.invalidate()
+    cache.invalidate()
+    assert cache.stats()["invalidations"] == 1 and cache.stats()["version"] is None
+
+@pytest.mark.parametrize("section", ["portfolio", "personal", "projects", "experience"])
+def test_encoded_sections_match_the_model_dump(section):
+    portfolio = get_portfolio_seed_data()
+    snapshot = PortfolioSnapshot.from_document(portfolio.model_dump(), SECTIONS)
+    expected = portfolio.model_dump(mode="json")
+    if section != "portfolio":
+        expected = expected[section]
+    assert json.loads(snapshot.section_json(section)) == expected
+
+def test_filtered_project_bodies_match_the_model_dump():
+    portfolio = get_portfolio_seed_data()
+    snapshot = PortfolioSnapshot.from_portfolio(portfolio)
+    category = portfolio.projects[0].category
+    expected = [project.model_dump(mode="json") for project in portfolio.projects if project.category == category]
+    assert json.loads(snapshot.projects_json([category])) == expected
+    body, _ = snapshot.projects_page_json([category], limit=1)
+    assert json.loads(body) == expected[:1]
+
+def test_a_reload_during_a_partial_read_still_returns_the_filled_snapshot(clock):
+    async def scenario():
+        repositories = MemoryRepositories()
+        service = PortfolioService(repositories, cache_ttl=30)
+        await service.initialize_snapshot()
+        service.cache.invalidate()
+        partial = await service.get_snapshot(("personal",))
+
+        read = repositories.portfolio.read
+
+        async def slow_read(sections):
+            await asyncio.sleep(0.01)
+            return await read(sections)
+
+        repositories.portfolio.read = slow_read
+        filling = asyncio.create_task(service.get_snapshot(("projects",)))
+        await asyncio.sleep(0.005)
+        # The reload drops the snapshot while the projects are being read for it
+        reloaded = await service.reload_snapshot(("personal",))
+        return partial, await filling, reloaded
+
+    partial, filled, reloaded = run(scenario())
+    assert filled is partial and filled.projects
+    assert reloaded is not partial and reloaded.version == partial.version
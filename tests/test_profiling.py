@@ -0,0 +1,76 @@
+import cProfile
+import os
+import pstats
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from middleware.profiling import ProfilingMiddleware, collapsed_stacks
+
+def _leaf():
+    total = 0
+    for n in range(20000):
+        total += n * n
+    return total
+
+def _branch():
+    return _leaf() + _leaf()
+
+def _app(tmp_path, **options):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id, "work": _branch()}
+
+    middleware = ProfilingMiddleware(app, directory=str(tmp_path), **options)
+    return middleware, TestClient(middleware)
+
+def _profiles(directory):
+    return sorted(path.name for path in directory.iterdir())
+
+def test_collapsed_stacks_nest_callees_under_callers():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    _branch()
+    profiler.disable()
+    stats = pstats.Stats(profiler)
+
+    lines = collapsed_stacks(stats)
+    stacks = {line.rsplit(" ", 1)[0]: int(line.rsplit(" ", 1)[1]) for line in lines}
+    leaf = [stack for stack in stacks if stack.endswith(":_leaf:11")]
+    assert leaf and all(":_branch:17;" in stack for stack in leaf)
+    # Every microsecond of own time lands in some stack
+    assert abs(sum(stacks.values()) - stats.total_tt * 1e6) <= len(stacks)
+
+def test_secret_header_profiles_the_request(tmp_path):
+    middleware, client = _app(tmp_path, secret="s3cret")
+    response = client.get("/items/7", headers={"X-Profile": "s3cret"})
+
+    assert response.status_code == 200
+    name = response.headers["x-profile-id"]
+    assert "-GET-items_7-" in name
+    assert _profiles(tmp_path) == [f"{name}.collapsed", f"{name}.pstats"]
+    collapsed = (tmp_path / f"{name}.collapsed").read_text()
+    assert ":_leaf:11 " in collapsed
+    assert pstats.Stats(str(tmp_path / f"{name}.pstats")).total_tt > 0
+
+def test_requests_without_the_secret_are_not_profiled(tmp_path):
+    middleware, client = _app(tmp_path, secret="s3cret")
+    assert "x-profile-id" not in client.get("/items/1").headers
+    assert "x-profile-id" not in client.get("/items/1", headers={"X-Profile": "guess"}).headers
+    assert middleware.written == 0
+    assert _profiles(tmp_path) == []
+
+def test_sampled_requests_are_profiled_and_retention_is_bounded(tmp_path):
+    middleware, client = _app(tmp_path, sample_rate=1.0, output="collapsed", max_profiles=2)
+    names = []
+    for n in range(4):
+        names.append(client.get(f"/items/{n}").headers["x-profile-id"])
+        # Distinct, increasing modification times older than the next write
+        stamp = time.time() - 100 + n
+        os.utime(tmp_path / f"{names[-1]}.collapsed", (stamp, stamp))
+
+    assert middleware.written == 4
+    assert _profiles(tmp_path) == sorted(f"{name}.collapsed" for name in names[-2:])
@@ -0,0 +1,92 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from tests.support import run
+
+from repositories.memory import MemoryRepositories
+from services.portfolio_cache import SECTIONS
+from services.portfolio_service import PortfolioService
+from services.readiness import Readiness
+
+class FlakyRepositories(MemoryRepositories):
+    """Memory storage that is unreachable for its first `failures` pings, then slow if asked"""
+
+    def __init__(self, failures: int = 0):
+        super().__init__()
+        self.failures = failures
+        self.delay = 0.0
+
+    async def ping(self):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("storage unreachable")
+        await asyncio.sleep(self.delay)
+
+def _readiness(repositories, **options):
+    service = PortfolioService(repositories)
+    return service, Readiness(repositories, service, **options)
+
+def test_warm_up_seeds_and_primes_the_portfolio():
+    async def scenario():
+        service, readiness = _readiness(MemoryRepositories())
+        await readiness.start()
+        return service, readiness, await readiness.report()
+
+    service, readiness, (ready, report) = run(scenario())
+    assert ready and report["status"] == "ready"
+    assert set(report["warm_up"]["steps_ms"]) == {"connections", "indexes", "portfolio"}
+    assert report["storage"]["reachable"] and report["storage"]["pool"] is None
+
+    snapshot = service.cache.snapshot
+    assert set(snapshot.sections) == set(SECTIONS)
+    # Every section body is encoded, and the big ones compressed, before any request
+    assert set(snapshot._json) == {"portfolio", *SECTIONS}
+    assert snapshot._compressed and snapshot._project_index is not None
+    assert service.search_index.version == snapshot.version
+
+def test_not_ready_until_a_retried_warm_up_succeeds():
+    async def scenario():
+        _, readiness = _readiness(FlakyRepositories(failures=2), retry_interval=0.01)
+        await readiness.start()
+        before = await readiness.report()
+        for _ in range(100):
+            if readiness.warm:
+                break
+            await asyncio.sleep(0.01)
+        after = await readiness.report()
+        await readiness.stop()
+        return before, after, readiness.attempts
+
+    (ready, report), (ready_after, _), attempts = run(scenario())
+    assert not ready and report["status"] == "warming_up"
+    assert report["warm_up"]["error"] == "storage unreachable"
+    assert ready_after and attempts == 3
+
+def test_a_slow_or_failing_ping_makes_a_warm_worker_unready():
+    async def scenario():
+        repositories = FlakyRepositories()
+        _, readiness = _readiness(repositories, ping_timeout=0.05)
+        await readiness.start()
+        repositories.delay = 1
+        slow = await readiness.report()
+        repositories.delay, repositories.failures = 0, 1
+        failing = await readiness.report()
+        return slow, failing, await readiness.report()
+
+    (slow_ready, slow), (failing_ready, failing), (ready, report) = run(scenario())
+    assert not slow_ready and slow["storage"] == {"reachable": False, "error": "ping timed out"}
+    assert not failing_ready and failing["storage"]["error"] == "storage unreachable"
+    assert ready and report["storage"]["ping_ms"] >= 0
+
+def test_probe_endpoints(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    import server
+
+    with TestClient(server.app) as client:
+        assert client.get("/api/health/live").json() == client.get("/api/health").json() == {"status": "healthy", "service": "portfolio-api"}
+        response = client.get("/api/health/ready")
+        assert response.status_code == 200 and response.json()["backend"] == "memory"
+
+        server.app.state.readiness.warm = False
+        assert client.get("/api/health/ready").status_code == 503
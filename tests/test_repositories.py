@@ -0,0 +1,247 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from tests.support import run
+
+from database.seed_data import get_portfolio_seed_data
+from models.portfolio import PORTFOLIO_ID, Project, ProjectUpdate
+from repositories.memory import MemoryRepositories
+from repositories.sqlite import SQLiteRepositories
+from services.fieldsets import parse_fields
+from services.errors import EntryConflict, EntryNotFound, PortfolioNotFound, VersionConflict
+from services.pagination import encode_cursor
+from services.portfolio_service import PortfolioService
+
+START = datetime(2024, 1, 1)
+
+@pytest.fixture(params=["memory", "sqlite", "mongo"])
+def storage(request, tmp_path):
+    """Factory for empty repositories on each backend; call it inside the scenario's event loop"""
+    opened = []
+
+    def connect():
+        if request.param == "memory":
+            repositories = MemoryRepositories()
+        elif request.param == "sqlite":
+            repositories = SQLiteRepositories(str(tmp_path / "portfolio.sqlite3"))
+            opened.append(repositories)
+        else:
+            from repositories.mongo import MongoRepositories
+            repositories = MongoRepositories(mongo_db())
+        return repositories
+
+    if request.param == "mongo":
+        mongo_db = request.getfixturevalue("mongo_db")
+    yield connect
+    for repositories in opened:
+        run(repositories.close())
+
+async def _prepared(storage):
+    repositories = storage()
+    await repositories.prepare()
+    return repositories
+
+def _project(project_id):
+    return Project(
+        id=project_id, title=f"Project {project_id}", description="Description", image="https://example.com/image.png",
+        github="https://github.com/example", technologies=["Python"], category="Data Analytics"
+    ).model_dump()
+
+def _messages(count):
+    return [
+        {
+            "id": f"{i:08d}", "name": f"Sender {i}", "email": f"sender{i}@example.com", "message": "Hello",
+            # Pairs share a timestamp so the id tie-breaker is exercised
+            "created_at": START + timedelta(minutes=i // 2), "read": i % 3 == 0,
+        }
+        for i in range(count)
+    ]
+
+def _checks(count):
+    return [
+        {"id": f"{i:08d}", "client_name": f"client-{i}", "timestamp": START + timedelta(seconds=i // 2)}
+        for i in range(count)
+    ]
+
+def test_create_is_atomic_and_reads_only_requested_sections(storage):
+    async def scenario():
+        repositories = await _prepared(storage)
+        seed = get_portfolio_seed_data().model_dump()
+        empty = await repositories.portfolio.read(("personal",))
+        created = [await repositories.portfolio.create(seed), await repositories.portfolio.create(seed)]
+        return empty, created, await repositories.portfolio.read(("personal",))
+
+    empty, created, document = run(scenario())
+    assert empty is None
+    assert created == [True, False]
+    assert document["id"] == "portfolio" and document["version"] == 0
+    assert document["personal"]["name"] == get_portfolio_seed_data().personal.name
+    assert "projects" not in document and "experience" not in document
+
+def test_replace_checks_the_version(storage):
+    async def scenario():
+        repositories = await _prepared(storage)
+        seed = get_portfolio_seed_data()
+        await repositories.portfolio.create(seed.model_dump())
+        await repositories.portfolio.replace(seed.model_copy(update={"version": 1, "projects": []}).model_dump(), 0)
+        with pytest.raises(VersionConflict) as conflict:
+            await repositories.portfolio.replace(seed.model_copy(update={"version": 1}).model_dump(), 0)
+        return conflict.value, await repositories.portfolio.read(("projects",))
+
+    conflict, document = run(scenario())
+    assert (conflict.expected, conflict.current) == (0, 1)
+    assert document["version"] == 1 and document["projects"] == []
+
+def test_sqlite_uses_only_the_portfolio_row_under_the_fixed_id(tmp_path):
+    async def scenario():
+        repositories = SQLiteRepositories(str(tmp_path / "portfolio.sqlite3"))
+        await repositories.prepare()
+        seed = get_portfolio_seed_data()
+        # A replace under another id stores a second row, ahead of the real one
+        await repositories.portfolio.replace(seed.model_copy(update={"id": "other", "projects": []}).model_dump(), 0)
+        created = await repositories.portfolio.create(seed.model_dump())
+        edited = await repositories.portfolio.delete_entry("projects", 1)
+        other = await repositories.database.run(
+            lambda connection: connection.execute("SELECT version FROM portfolio WHERE id = 'other'").fetchone()["version"]
+        )
+        await repositories.close()
+        return created, edited, other
+
+    created, edited, other = run(scenario())
+    assert created
+    assert edited["id"] == PORTFOLIO_ID and edited["version"] == 1
+    assert [project["id"] for project in edited["projects"]] == [2, 3, 4, 5]
+    assert other == 0
+
+def test_entry_edits_bump_the_version_and_explain_failures(storage):
+    async def scenario():
+        repositories = await _prepared(storage)
+        portfolio = repositories.portfolio
+        with pytest.raises(PortfolioNotFound):
+            await portfolio.add_entry("projects", _project(100))
+        await portfolio.create(get_portfolio_seed_data().model_dump())
+        await portfolio.add_entry("projects", _project(100), expected_version=0)
+        await portfolio.update_entry("projects", 100, {"title": "Renamed"}, expected_version=1)
+        await portfolio.reorder_entries("projects", [100, 1, 2, 3, 4, 5])
+        document = await portfolio.delete_entry("projects", 3)
+        with pytest.raises(EntryConflict):
+            await portfolio.add_entry("projects", _project(1))
+        with pytest.raises(EntryNotFound):
+            await portfolio.update_entry("projects", 3, {"title": "Gone"})
+        with pytest.raises(EntryNotFound):
+            await portfolio.delete_entry("projects", 3)
+        with pytest.raises(EntryConflict):
+            await portfolio.reorder_entries("projects", [100, 1, 2])
+        with pytest.raises(VersionConflict):
+            await portfolio.update_entry("projects", 1, {"title": "Stale"}, expected_version=1)
+        return document, await portfolio.read(("projects",))
+
+    edited, stored = run(scenario())
+    assert edited["version"] == stored["version"] == 4
+    assert [p["id"] for p in edited["projects"]] == [p["id"] for p in stored["projects"]] == [100, 1, 2, 4, 5]
+    assert stored["projects"][0]["title"] == "Renamed"
+
+def test_contact_pages_follow_the_keyset(storage):
+    async def scenario():
+        repositories = await _prepared(storage)
+        await repositories.contacts.insert_many(_messages(25))
+        await repositories.contacts.insert(_messages(26)[-1])
+        pages, cursor = [], None
+        while True:
+            page = await repositories.contacts.page(10, cursor)
+            pages.append([message["id"] for message in page])
+            if len(page) < 10:
+                break
+            cursor = encode_cursor(page[-1]["created_at"], page[-1]["id"])
+        unread = await repositories.contacts.page(100, read=False)
+        with pytest.raises(ValueError):
+            await repositories.contacts.page(10, "not a cursor")
+        return pages, unread
+
+    pages, unread = run(scenario())
+    assert [len(page) for page in pages] == [10, 10, 6]
+    assert sum(pages, []) == [f"{i:08d}" for i in reversed(range(26))]
+    assert [m["id"] for m in unread] == [f"{i:08d}" for i in reversed(range(26)) if i % 3]
+    assert all(isinstance(m["created_at"], datetime) and m["read"] is False for m in unread)
+
+def test_retried_contact_batches_store_each_message_once(storage):
+    async def scenario():
+        repositories = await _prepared(storage)
+        # A retry resends a batch that was partly stored
+        await repositories.contacts.insert_many(_messages(5))
+        await repositories.contacts.insert_many(_messages(8))
+        return await repositories.contacts.page(100)
+
+    page = run(scenario())
+    assert sorted(message["id"] for message in page) == [f"{i:08d}" for i in range(8)]
+
+def test_contact_scan_is_oldest_first_within_bounds(storage):
+    async def scenario():
+        repositories = await _prepared(storage)
+        await repositories.contacts.insert_many(_messages(40))
+        scan = repositories.contacts.scan(
+            since=START + timedelta(minutes=5), until=START + timedelta(minutes=15), read=True, batch_size=2
+        )
+        return [message["id"] async for message in scan]
+
+    assert run(scenario()) == [f"{i:08d}" for i in range(10, 30) if i % 3 == 0]
+
+def test_status_pages_and_scans(storage):
+    async def scenario():
+        repositories = await _prepared(storage)
+        for check in _checks(30):
+            await repositories.status_checks.insert(check)
+        since, until = START + timedelta(seconds=2), START + timedelta(seconds=12)
+        first = await repositories.status_checks.page(7, since=since, until=until)
+        cursor = encode_cursor(first[-1]["timestamp"], first[-1]["id"])
+        rest = await repositories.status_checks.page(100, cursor, since, until)
+        scan = repositories.status_checks.scan(limit=5, cursor=cursor, since=since, batch_size=2)
+        return first + rest, [check["id"] async for check in scan]
+
+    paged, scanned = run(scenario())
+    assert [check["id"] for check in paged] == [f"{i:08d}" for i in reversed(range(4, 24))]
+    assert scanned == [f"{i:08d}" for i in reversed(range(12, 17))]
+
+def test_view_counts_add_up_per_bucket(storage):
+    async def scenario():
+        repositories = await _prepared(storage)
+        hour = START + timedelta(hours=5)
+        await repositories.views.add([("hour", hour, {"section:projects": 2, "project:3": 1}), ("day", START, {"section:projects": 2})])
+        await repositories.views.add([("hour", hour, {"section:projects": 3}), ("hour", hour + timedelta(hours=1), {"project:3": 4})])
+        hours = await repositories.views.buckets("hour", START, START + timedelta(days=1))
+        later = await repositories.views.buckets("hour", hour + timedelta(minutes=1), START + timedelta(days=1))
+        return hours, later, await repositories.views.buckets("day", START, START + timedelta(days=1))
+
+    hours, later, days = run(scenario())
+    assert [(bucket["start"], bucket["counts"]) for bucket in hours] == [
+        (START + timedelta(hours=5), {"section:projects": 5, "project:3": 1}),
+        (START + timedelta(hours=6), {"project:3": 4}),
+    ]
+    assert [bucket["start"] for bucket in later] == [START + timedelta(hours=6)]
+    assert [bucket["counts"] for bucket in days] == [{"section:projects": 2}]
+
+def test_service_runs_on_every_backend(storage):
+    async def scenario():
+        service = PortfolioService(await _prepared(storage), cache_ttl=0)
+        version = (await service.initialize_snapshot()).version
+        await service.update_entry("projects", 1, ProjectUpdate(title="Renamed"), expected_version=version)
+        _, body, next_cursor = await service.get_projects_page(technologies=["python"], limit=1)
+        return await service.get_portfolio(), body, next_cursor
+
+    portfolio, body, next_cursor = run(scenario())
+    assert portfolio.version == 1 and portfolio.projects[0].title == "Renamed"
+    assert body.startswith(b"[{") and next_cursor
+
+def test_read_fields_returns_the_selected_fields(storage):
+    async def scenario():
+        repositories = await _prepared(storage)
+        await repositories.portfolio.create(get_portfolio_seed_data().model_dump())
+        fieldset = parse_fields("personal.name,projects.title,version")
+        document = await repositories.portfolio.read_fields(fieldset)
+        assert document["id"] and document["updated_at"] and document["version"] == 0
+        # Backends may return more than was selected, but never less
+        assert document["personal"]["name"] and "experience" not in document
+        assert [project["title"] for project in document["projects"]] == [p.title for p in get_portfolio_seed_data().projects]
+
+    run(scenario())
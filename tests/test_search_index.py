@@ -0,0 +1,96 @@
+import random
+
+from models.portfolio import Experience, Project
+from services.search_index import SearchIndex, tokenize
+
+def _project(project_id, title="Project", description="Description", technologies=("Python",), category="Web"):
+    return Project(
+        id=project_id, title=title, description=description, image="https://example.com/image.png",
+        github="https://github.com/example", technologies=list(technologies), category=category
+    )
+
+def _experience(experience_id, title="Engineer", company="Company", description="Description"):
+    return Experience(
+        id=experience_id, title=title, company=company, duration="2020 - 2022",
+        description=description, technologies=["Python"]
+    )
+
+def _full_scan(index: SearchIndex, query: str, limit: int) -> list:
+    """Scores of the top `limit` entries, summing every query term over every entry"""
+    impacts = [index._impact(term) for term in set(tokenize(query))]
+    totals = {}
+    for _, scores in filter(None, impacts):
+        for key, score in scores.items():
+            totals[key] = totals.get(key, 0.0) + score
+    return sorted((round(score, 4) for score in totals.values()), reverse=True)[:limit]
+
+def test_title_matches_outrank_description_matches():
+    index = SearchIndex()
+    index.sync([
+        _project(1, title="Command Tool", description="Written in rust helper"),
+        _project(2, title="Rust Tool", description="A command line helper"),
+        _project(3, title="Other Tool", description="Nothing relevant here"),
+    ], [])
+
+    results = index.search("rust")
+    assert [result["id"] for result in results] == [2, 1]
+    assert results[0]["score"] > results[1]["score"] > 0
+    # Scores add up across query terms, and unknown terms are ignored
+    assert [result["id"] for result in index.search("rust nothing")] == [3, 2, 1]
+    assert index.search("unknown words") == []
+
+def test_early_termination_matches_a_full_scan():
+    vocabulary = ["api", "cache", "data", "graph", "mongo", "python", "react", "rust", "search", "stream"]
+    generator = random.Random(7)
+
+    def text(words):
+        return " ".join(generator.choice(vocabulary) for _ in range(words))
+
+    index = SearchIndex()
+    index.sync(
+        [_project(i, title=text(2), description=text(12), technologies=[text(1)], category=text(1)) for i in range(80)],
+        [_experience(i, title=text(2), company=text(1), description=text(10)) for i in range(20)],
+    )
+
+    for query in ("rust", "python data", "cache graph stream", "api mongo react search"):
+        for limit in (1, 3, 10, 200):
+            found = [result["score"] for result in index.search(query, limit)]
+            assert found == _full_scan(index, query, limit), (query, limit)
+
+def test_sync_reindexes_only_what_changed():
+    index = SearchIndex()
+    projects = [_project(1, title="Kafka Pipeline"), _project(2, title="Portfolio Site")]
+    assert index.sync(projects, [_experience(1)], version=1) == {"added": 3, "updated": 0, "removed": 0}
+    assert index.sync(projects, [_experience(1)], version=2) == {"added": 0, "updated": 0, "removed": 0}
+    assert index.version == 2
+
+    edited = [_project(1, title="Spark Pipeline"), _project(2, title="Portfolio Site"), _project(3, title="Kafka Monitor")]
+    assert index.sync(edited, [], version=3) == {"added": 1, "updated": 1, "removed": 1}
+    assert len(index) == 3
+    assert [result["id"] for result in index.search("spark")] == [1]
+    assert [result["id"] for result in index.search("kafka")] == [3]
+    assert index.search("engineer") == []
+
+    assert index.sync([], [], version=4) == {"added": 0, "updated": 0, "removed": 3}
+    assert len(index) == 0 and index.postings == {} and index.total_length == 0
+    assert index.search("portfolio") == []
+
+def test_repeated_ids_are_indexed_separately():
+    index = SearchIndex()
+    index.sync([_project(1, title="Alpha"), _project(1, title="Beta")], [])
+    assert len(index) == 2
+    assert [result["title"] for result in index.search("beta")] == ["Beta"]
+
+def test_kind_limits_results_to_one_entry_type():
+    index = SearchIndex()
+    index.sync(
+        [_project(1, title="Analytics Dashboard"), _project(2, title="Analytics Pipeline")],
+        [_experience(1, title="Analytics Engineer")],
+    )
+
+    assert {result["type"] for result in index.search("analytics")} == {"project", "experience"}
+    assert [result["id"] for result in index.search("analytics", kind="experience")] == [1]
+    projects = index.search("analytics", kind="project")
+    assert {result["id"] for result in projects} == {1, 2}
+    assert {result["type"] for result in projects} == {"project"}
+    assert len(index.search("analytics", limit=1, kind="project")) == 1
@@ -0,0 +1,55 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+START = datetime(2024, 1, 1)
+
+@pytest.fixture
+def status_client(monkeypatch):
+    """The full app on memory storage, with ten checks a minute apart (pairs share a timestamp)"""
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    import server
+
+    with TestClient(server.app) as client:
+        checks = server.app.state.repositories.status_checks
+        for i in range(10):
+            document = {"id": f"{i:08d}", "client_name": f"client-{i}", "timestamp": START + timedelta(minutes=i // 2)}
+            client.portal.call(checks.insert, document)
+        yield client
+
+def _ids(response) -> list:
+    return [check["id"] for check in response.json()]
+
+def test_pages_follow_the_cursor_newest_first(status_client):
+    ids, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = status_client.get("/api/status", params=params)
+        assert response.status_code == 200
+        ids.extend(_ids(response))
+        pages += 1
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert pages == 4
+    assert ids == [f"{i:08d}" for i in reversed(range(10))]
+
+def test_since_and_until_bound_the_listing(status_client):
+    params = {"since": (START + timedelta(minutes=1)).isoformat(), "until": (START + timedelta(minutes=3)).isoformat()}
+    assert _ids(status_client.get("/api/status", params=params)) == ["00000005", "00000004", "00000003", "00000002"]
+
+def test_ndjson_streams_every_match(status_client):
+    params = {"format": "ndjson", "since": (START + timedelta(minutes=3)).isoformat()}
+    response = status_client.get("/api/status", params=params)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == ["00000009", "00000008", "00000007", "00000006"]
+    limited = status_client.get("/api/status", params={"format": "ndjson", "limit": 2}).text.splitlines()
+    assert len(limited) == 2
+
+@pytest.mark.parametrize("output", ["json", "ndjson"])
+def test_bad_cursors_are_rejected_before_streaming(status_client, output):
+    response = status_client.get("/api/status", params={"cursor": "not-a-cursor", "format": output})
+    assert response.status_code == 400 and response.json() == {"detail": "Invalid cursor"}
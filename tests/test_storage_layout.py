@@ -0,0 +1,158 @@
+import asyncio
+import json
+
+import pytest
+
+from tests.support import run
+
+from database.indexes import apply_indexes
+from database.migrate_layout import migrate_layout
+from database.seed_data import get_portfolio_seed_data
+from models.portfolio import Project, ProjectUpdate
+from services.errors import EntryConflict, InvalidCursor, VersionConflict
+from services.pagination import decode_position_cursor, encode_position_cursor
+from services.portfolio_cache import PortfolioSnapshot
+from services.portfolio_service import PortfolioService
+
+FILTERS = [
+    {},
+    {"technologies": ["python"]},
+    {"technologies": ["Python", "SQL"], "match": "all"},
+    {"category": ["Machine Learning", "data analytics"]},
+    {"category": ["all"], "technologies": ["power bi", "excel"]},
+]
+
+def _project(project_id, category="Data Analytics", technologies=("Python",)):
+    return Project(
+        id=project_id, title=f"Project {project_id}", description="Description", image="https://example.com/image.png",
+        github="https://github.com/example", technologies=list(technologies), category=category
+    )
+
+def _portfolio(size):
+    categories = ["Data Analytics", "Machine Learning", "Visualization"]
+    technologies = ["Python", "SQL", "Power BI", "Excel", "TensorFlow"]
+    projects = [
+        _project(i, categories[i % 3], [technologies[i % 5], technologies[(i * 7) % 5]])
+        for i in range(size)
+    ]
+    return get_portfolio_seed_data().model_copy(update={"projects": projects})
+
+async def _pages(service, limit, **filters):
+    pages, cursor = [], None
+    while True:
+        _, body, cursor = await service.get_projects_page(limit=limit, cursor=cursor, **filters)
+        pages.append(body)
+        if not cursor:
+            return pages
+
+def test_position_cursor_round_trip():
+    assert decode_position_cursor(encode_position_cursor(41)) == 41
+    for bad in ("bogus", encode_position_cursor(-1), "W10"):
+        with pytest.raises(InvalidCursor):
+            decode_position_cursor(bad)
+
+def test_projects_route_tells_bad_cursors_from_bad_data(portfolio_client):
+    service, client = portfolio_client(cache_ttl=0)
+    assert client.get("/api/portfolio/projects", params={"limit": 2, "cursor": "bogus"}).status_code == 400
+
+    broken = get_portfolio_seed_data().model_dump()
+    broken["projects"][0]["technologies"] = "not a list"
+    run(service.repositories.portfolio.create(broken))
+    # A stored project that fails validation is a server error, not a bad cursor
+    assert client.get("/api/portfolio/projects", params={"limit": 2}).status_code == 500
+
+def test_snapshot_pages_cover_filtered_projects():
+    snapshot = PortfolioSnapshot.from_portfolio(_portfolio(50))
+    for filters in FILTERS:
+        category, technologies = filters.get("category"), filters.get("technologies")
+        match = filters.get("match", "any")
+        expected = [p["id"] for p in json.loads(snapshot.projects_json(category, technologies, match))]
+        ids, after = [], -1
+        while True:
+            body, last = snapshot.projects_page_json(category, technologies, match, after, 7)
+            ids.extend(p["id"] for p in json.loads(body))
+            if last is None:
+                break
+            after = last
+        assert ids == expected
+
+def test_layouts_return_the_same_projects(mongo_db):
+    async def scenario():
+        results = {}
+        for layout in ("embedded", "normalized"):
+            db = mongo_db()
+            await apply_indexes(db)
+            service = PortfolioService(db, cache_ttl=0, layout=layout)
+            await service.update_portfolio(_portfolio(120))
+            results[layout] = [
+                (await service.get_projects_page(**filters))[1] for filters in FILTERS
+            ] + [await _pages(service, 25, **filters) for filters in FILTERS]
+        return results
+
+    results = run(scenario())
+    assert results["embedded"] == results["normalized"]
+
+def test_normalized_edits_bump_version(mongo_db):
+    async def scenario():
+        db = mongo_db()
+        await apply_indexes(db)
+        service = PortfolioService(db, layout="normalized")
+        start = (await service.initialize_snapshot()).version
+        await service.add_entry("projects", _project(100, technologies=["Rust"]))
+        with pytest.raises(EntryConflict):
+            await service.add_entry("projects", _project(100))
+        await service.update_entry("projects", 100, ProjectUpdate(technologies=["Go"]), expected_version=start + 1)
+        with pytest.raises(VersionConflict):
+            await service.update_entry("projects", 100, ProjectUpdate(title="Stale"), expected_version=start + 1)
+        await service.reorder_entries("projects", [100, 1, 2, 3, 4, 5])
+        snapshot = await service.delete_entry("projects", 3)
+        _, go, _ = await service.get_projects_page(technologies=["go"])
+        return start, snapshot, go
+
+    start, snapshot, go = run(scenario())
+    assert snapshot.version == start + 4
+    assert [p.id for p in snapshot.projects] == [100, 1, 2, 4, 5]
+    assert [p["id"] for p in json.loads(go)] == [100]
+
+def test_concurrent_normalized_edits_from_one_version_conflict(mongo_db):
+    async def scenario():
+        db = mongo_db()
+        await apply_indexes(db)
+        service = PortfolioService(db, cache_ttl=0, layout="normalized")
+        start = (await service.initialize_snapshot()).version
+        edits = [
+            service.update_entry("projects", 1, ProjectUpdate(title="First"), expected_version=start),
+            service.update_entry("projects", 2, ProjectUpdate(title="Second"), expected_version=start),
+            service.add_entry("projects", _project(100), expected_version=start),
+        ]
+        results = await asyncio.gather(*edits, return_exceptions=True)
+        # A failed write gives its claim back, so the next edit is not refused
+        current = (await service.get_snapshot()).version
+        await service.delete_entry("projects", 1, expected_version=current)
+        return start, results, current
+
+    start, results, current = run(scenario())
+    assert sum(isinstance(result, VersionConflict) for result in results) == 2
+    assert current == start + 1
+
+def test_migration_round_trip_preserves_portfolio(mongo_db):
+    async def scenario():
+        db = mongo_db()
+        await apply_indexes(db)
+        embedded = PortfolioService(db, cache_ttl=0, layout="embedded")
+        normalized = PortfolioService(db, cache_ttl=0, layout="normalized")
+        before = (await embedded.initialize_snapshot()).portfolio
+        await migrate_layout(db, "normalized")
+        await migrate_layout(db, "normalized")
+        middle = (await normalized.get_snapshot()).portfolio
+        stored = await db.portfolio.find_one({}, {"_id": 0, "projects": 1, "layout": 1})
+        await migrate_layout(db, "embedded")
+        after = (await embedded.get_snapshot()).portfolio
+        return before, middle, after, stored, await db.projects.count_documents({})
+
+    before, middle, after, stored, leftover = run(scenario())
+    unversioned = lambda p: p.dict(exclude={"updated_at", "version"})
+    assert unversioned(before) == unversioned(middle) == unversioned(after)
+    assert stored == {"layout": "normalized"}
+    assert (middle.version, after.version) == (before.version + 1, before.version + 2)
+    assert leftover == 0
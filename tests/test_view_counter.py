@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from tests.support import run
+
+from repositories.memory import MemoryViewRepository
+from routes import portfolio_routes
+from routes.analytics_routes import router as analytics_router
+from services.view_counter import ViewCounter
+
+class FailingViewRepository(MemoryViewRepository):
+    def __init__(self):
+        super().__init__()
+        self.failures = 1
+
+    async def add(self, increments):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        await super().add(increments)
+
+def test_views_are_written_to_hourly_and_daily_buckets():
+    repository = MemoryViewRepository()
+    counter = ViewCounter(repository)
+    for _ in range(3):
+        counter.record_section("projects")
+    counter.record_project(2)
+
+    run(counter.flush())
+    assert counter.stats() == {"pending": 0, "recorded": 4, "written": 4, "flushes": 1, "failed_flushes": 0}
+    now = datetime.utcnow()
+    hour = now.replace(minute=0, second=0, microsecond=0)
+    assert repository.counts[("hour", hour)] == {"section:projects": 3, "project:2": 1}
+    assert repository.counts[("day", hour.replace(hour=0))] == {"section:projects": 3, "project:2": 1}
+
+def test_failed_flush_keeps_counts_for_the_next_one():
+    repository = FailingViewRepository()
+    counter = ViewCounter(repository)
+    counter.record_section("personal")
+    run(counter.flush())
+    counter.record_section("personal")
+    assert counter.stats()["pending"] == 2 and counter.stats()["failed_flushes"] == 1
+
+    run(counter.flush())
+    assert counter.stats()["pending"] == 0
+    assert sum(counts["section:personal"] for (granularity, _), counts in repository.counts.items() if granularity == "day") == 2
+
+def test_analytics_endpoint_reports_flushed_views(portfolio_client):
+    service, client = portfolio_client(routers=[analytics_router])
+
+    client.get("/api/portfolio/")
+    client.get("/api/portfolio/projects")
+    client.get("/api/portfolio/projects", params={"category": "Machine Learning"})
+    assert client.post("/api/analytics/views", json={"project_id": 1}).status_code == 202
+    assert client.post("/api/analytics/views", json={"project_id": 999}).status_code == 404
+    assert client.get("/api/analytics/views").json()["views"] == 0
+
+    run(service.views.flush())
+    report = client.get("/api/analytics/views").json()
+    assert report["views"] == 3
+    assert report["sections"] == {"portfolio": 1, "projects": 2}
+    assert report["projects"] == {"1": 1}
+    assert len(report["buckets"]) == 1 and report["buckets"][0]["views"] == 3
+
+    hourly = client.get("/api/analytics/views", params={"granularity": "hour"}).json()
+    assert hourly["buckets"][0]["sections"] == {"portfolio": 1, "projects": 2}
+    since = datetime.utcnow().isoformat()
+    until = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    assert client.get("/api/analytics/views", params={"since": since, "until": until}).status_code == 400
+
+def test_failed_requests_are_not_counted(portfolio_client, monkeypatch):
+    service, client = portfolio_client()
+    # Nothing stored yet
+    assert client.get("/api/portfolio/personal").status_code == 404
+    assert client.get("/api/portfolio/batch", params={"section": "personal"}).status_code == 404
+
+    run(service.initialize_snapshot())
+    assert client.get("/api/portfolio/projects", params={"cursor": "bogus"}).status_code == 400
+
+    def broken_response(*args):
+        raise RuntimeError("response could not be built")
+
+    monkeypatch.setattr(portfolio_routes, "cached_json_response", broken_response)
+    for path in ("/api/portfolio/", "/api/portfolio/personal", "/api/portfolio/projects", "/api/portfolio/experience"):
+        assert client.get(path).status_code == 500, path
+    assert client.get("/api/portfolio/batch", params={"section": ["personal", "projects"]}).status_code == 500
+    assert service.views.stats()["recorded"] == 0